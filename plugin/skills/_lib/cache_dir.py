@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+
+import os
+
+
+def tool_cache_dir(tool: str, *parts: str) -> str:
+    base = os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    path = os.path.join(base, tool, *parts)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
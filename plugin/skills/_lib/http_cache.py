@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import zlib
+import json
+import time
+import sqlite3
+import threading
+import http.client
+from typing import Dict, Optional, Any, List, Tuple
+from cache_dir import tool_cache_dir
+
+DEFAULT_MAX_MB = 200
+
+
+def cache_root() -> str:
+    return tool_cache_dir('skills-http')
+
+
+def build_headers(items: List[Tuple[str, str]]) -> http.client.HTTPMessage:
+    headers = http.client.HTTPMessage()
+    for name, value in items:
+        headers[name] = value
+    return headers
+
+
+def body_version(body: bytes, content_type: str) -> Optional[int]:
+    if 'json' not in content_type:
+        return None
+    try:
+        version = json.loads(body).get('version')
+    except (ValueError, AttributeError):
+        return None
+    return version.get('number') if isinstance(version, dict) else None
+
+
+class CachedResponse:
+    def __init__(self, url: str, etag: Optional[str], last_modified: Optional[str], version: Optional[int],
+                 headers: List[Tuple[str, str]], body: bytes):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    def __init__(self, namespace: str, max_bytes: Optional[int] = None):
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', namespace.lower())
+        self.path = os.path.join(cache_root(), f"{safe_name}.sqlite")
+        self.max_bytes = max_bytes or int(float(os.getenv('HTTP_CACHE_MAX_MB') or DEFAULT_MAX_MB) * 1024 * 1024)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                version INTEGER,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.db.commit()
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT etag, last_modified, version, headers, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, version, headers, body = row
+        return CachedResponse(url, etag, last_modified, version, [tuple(h) for h in json.loads(headers)],
+                              zlib.decompress(body))
+
+    def touch(self, url: str):
+        with self.lock:
+            self.db.execute("UPDATE responses SET accessed = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+
+    def store(self, url: str, headers: http.client.HTTPMessage, body: bytes):
+        if 'no-store' in (headers.get('Cache-Control') or '').lower():
+            return
+
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        version = body_version(body, headers.get('Content-Type') or '')
+
+        if not etag and not last_modified and version is None:
+            return
+
+        items = [(name, value) for name, value in headers.items()
+                 if name.lower() not in ('content-encoding', 'content-length', 'transfer-encoding', 'set-cookie')]
+        blob = zlib.compress(body)
+
+        if len(blob) > self.max_bytes:
+            return
+
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, version, json.dumps(items), blob, len(blob), time.time())
+            )
+            self._evict()
+            self.db.commit()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Trim to 90% so a full cache does not evict on every store
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for url, size in self.db.execute("SELECT url, size FROM responses ORDER BY accessed").fetchall():
+            victims.append((url,))
+            freed += size
+            if freed >= target:
+                break
+        self.db.executemany("DELETE FROM responses WHERE url = ?", victims)
+
+    def remove(self, url: str):
+        with self.lock:
+            self.db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self.db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            count, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {'path': self.path, 'entries': count, 'bytes': size, 'max_bytes': self.max_bytes}
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM responses")
+            self.db.commit()
+            self.db.execute("VACUUM")
+
+
+def open_cache(namespace: str) -> Optional[HttpCache]:
+    if os.getenv('HTTP_CACHE', '1').lower() in ('0', 'false', 'no', 'off'):
+        return None
+    try:
+        return HttpCache(namespace)
+    except (OSError, sqlite3.Error):
+        return None
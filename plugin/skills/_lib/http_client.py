@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+
+import os
+import ssl
+import zlib
+import json
+import time
+import socket
+import uuid
+import threading
+import http.client
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+from email.utils import parsedate_to_datetime
+from datetime import datetime
+from typing import Dict, Optional, Any, Tuple, List, BinaryIO, Iterator, Union
+from http_cache import HttpCache, build_headers
+
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+DEFAULT_POOL_SIZE = 8
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_RETRY_WAIT = 60
+MAX_REDIRECTS = 5
+MAX_BACKOFF = 30
+CHUNK_SIZE = 1024 * 1024
+DECREASE_FACTOR = 0.5
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+THROTTLE_CODES = (429, 503)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError
+)
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, reason: str, url: str, headers: http.client.HTTPMessage, body: bytes):
+        super().__init__(f"HTTP {status} {reason}")
+        self.status = status
+        self.reason = reason
+        self.url = url
+        self.headers = headers
+        self.body = body
+
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+
+class TransportError(Exception):
+    # sent is False when the request was never completely written, i.e. the server cannot have acted on it
+    def __init__(self, reason: str, url: str, sent: bool = True):
+        super().__init__(reason)
+        self.reason = reason
+        self.url = url
+        self.sent = sent
+
+
+class HttpResponse:
+    def __init__(self, status: int, reason: str, url: str, headers: http.client.HTTPMessage, body: bytes):
+        self.status = status
+        self.reason = reason
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.throttle_delay: Optional[float] = None
+        self.from_cache = False
+
+    def info(self) -> http.client.HTTPMessage:
+        return self.headers
+
+    def text(self) -> str:
+        return self.body.decode('utf-8')
+
+    def json(self) -> Any:
+        text = self.text()
+        return json.loads(text) if text else {}
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    try:
+        return float(value) if value else default
+    except ValueError:
+        return default
+
+
+def parse_http_time(value: str) -> Optional[float]:
+    value = value.strip()
+    try:
+        number = float(value)
+    except ValueError:
+        pass
+    else:
+        return number if number > 1e9 else time.time() + number
+
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def retry_after(headers: Optional[http.client.HTTPMessage]) -> Optional[float]:
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+    until = parse_http_time(value)
+    return None if until is None else max(until - time.time(), 0)
+
+
+def rate_limit_reset(headers: Optional[http.client.HTTPMessage]) -> Optional[float]:
+    if not headers:
+        return None
+    remaining = headers.get('X-RateLimit-Remaining')
+    reset = headers.get('X-RateLimit-Reset')
+    try:
+        if remaining is None or float(remaining) > 0 or not reset:
+            return None
+    except ValueError:
+        return None
+    until = parse_http_time(reset)
+    return None if until is None else max(until - time.time(), 0)
+
+
+class MultipartFile:
+    # Re-iterable multipart/form-data body that reads the file in chunks, so retries and redirects can resend it
+    def __init__(self, path: str, field: str = 'file', filename: Optional[str] = None,
+                 content_type: str = 'application/octet-stream', fields: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+
+        preamble = []
+        for name, value in (fields or {}).items():
+            preamble.append(f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n')
+        filename = (filename or os.path.basename(path)).replace('"', '%22')
+        preamble.append(f'--{self.boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                        f'Content-Type: {content_type}\r\n\r\n')
+
+        self.head = ''.join(preamble).encode('utf-8')
+        self.tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+        self.length = len(self.head) + os.path.getsize(path) + len(self.tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self.head
+        with open(self.path, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        yield self.tail
+
+    def headers(self) -> Dict[str, str]:
+        return {'Content-Type': self.content_type, 'Content-Length': str(self.length)}
+
+
+def decode_body(body: bytes, encoding: Optional[str]) -> bytes:
+    encoding = (encoding or '').strip().lower()
+
+    if encoding in ('gzip', 'x-gzip'):
+        return zlib.decompress(body, zlib.MAX_WBITS | 16)
+
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+
+    return body
+
+
+class AdaptiveLimit:
+    # AIMD: +1/limit per response while the limit is saturated, halve on throttling (once per backoff window)
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.backoff_until = 0.0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                wait = self.paused_until - time.time()
+                if wait > 0:
+                    self.cond.wait(wait)
+                elif self.in_flight >= int(self.limit):
+                    self.cond.wait()
+                else:
+                    break
+            self.in_flight += 1
+
+    def release(self):
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    def record(self, status: int, headers: http.client.HTTPMessage, attempt: int = 0) -> Optional[float]:
+        now = time.time()
+        delay = retry_after(headers)
+
+        with self.cond:
+            if status == 429 or (status == 503 and delay is not None):
+                if delay is None:
+                    delay = min(2 ** attempt, MAX_BACKOFF)
+                if now >= self.backoff_until:
+                    self.limit = max(1.0, self.limit * DECREASE_FACTOR)
+                    self.backoff_until = now + max(delay, 0.1)
+                self.paused_until = max(self.paused_until, now + delay)
+                self.cond.notify_all()
+                return delay
+
+            reset = rate_limit_reset(headers)
+            if reset is not None:
+                self.paused_until = max(self.paused_until, now + reset)
+            elif (status < 500 and now >= self.backoff_until and self.in_flight >= int(self.limit)
+                  and headers.get('X-RateLimit-NearLimit', '').lower() != 'true'):
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self.cond.notify_all()
+
+        return None
+
+
+class ConnectionPool:
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE):
+        self.pool_size = pool_size
+        self.lock = threading.Lock()
+        self.idle: Dict[Tuple, List[http.client.HTTPConnection]] = {}
+        self.slots: Dict[Tuple, AdaptiveLimit] = {}
+        self.ssl_context = ssl.create_default_context()
+
+    def _slot(self, key: Tuple) -> AdaptiveLimit:
+        with self.lock:
+            if key not in self.slots:
+                self.slots[key] = AdaptiveLimit(self.pool_size)
+            return self.slots[key]
+
+    def record(self, key: Tuple, status: int, headers: http.client.HTTPMessage, attempt: int = 0) -> Optional[float]:
+        return self._slot(key).record(status, headers, attempt)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            slots = dict(self.slots)
+        return {
+            f"{scheme}://{host}:{port}": {'limit': round(slot.limit, 2), 'in_flight': slot.in_flight}
+            for (scheme, host, port), slot in slots.items()
+        }
+
+    def _proxy_for(self, scheme: str, host: str) -> Optional[urllib.parse.SplitResult]:
+        proxy = urllib.request.getproxies().get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        return urllib.parse.urlsplit(proxy if '://' in proxy else f"http://{proxy}")
+
+    def _create(self, key: Tuple, connect_timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        proxy = self._proxy_for(scheme, host)
+
+        if proxy is None:
+            if scheme == 'https':
+                return http.client.HTTPSConnection(host, port, timeout=connect_timeout, context=self.ssl_context)
+            return http.client.HTTPConnection(host, port, timeout=connect_timeout)
+
+        proxy_port = proxy.port or 8080
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(proxy.hostname, proxy_port, timeout=connect_timeout,
+                                               context=self.ssl_context)
+            conn.set_tunnel(host, port)
+            return conn
+
+        conn = http.client.HTTPConnection(proxy.hostname, proxy_port, timeout=connect_timeout)
+        conn.via_proxy = True
+        return conn
+
+    def acquire(self, key: Tuple, connect_timeout: float, read_timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        self._slot(key).acquire()
+
+        with self.lock:
+            idle = self.idle.get(key)
+            conn = idle.pop() if idle else None
+
+        if conn is not None:
+            conn.sock.settimeout(read_timeout)
+            return conn, True
+
+        try:
+            conn = self._create(key, connect_timeout)
+            conn.connect()
+            conn.sock.settimeout(read_timeout)
+        except BaseException:
+            self._slot(key).release()
+            raise
+
+        return conn, False
+
+    def release(self, key: Tuple, conn: http.client.HTTPConnection, reusable: bool):
+        if reusable and conn.sock is not None:
+            with self.lock:
+                self.idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
+
+        self._slot(key).release()
+
+    def close(self):
+        with self.lock:
+            for connections in self.idle.values():
+                for conn in connections:
+                    conn.close()
+            self.idle.clear()
+
+
+_shared_pool = ConnectionPool(int(env_float('HTTP_POOL_SIZE', DEFAULT_POOL_SIZE)))
+
+
+class HttpClient:
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        cookie_jar: Optional[CookieJar] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        pool: Optional[ConnectionPool] = None,
+        max_retries: Optional[int] = None,
+        max_retry_wait: Optional[float] = None,
+        cache: Optional[HttpCache] = None
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.headers = dict(headers or {})
+        self.cookie_jar = cookie_jar
+        self.connect_timeout = connect_timeout or env_float('HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)
+        self.read_timeout = read_timeout or env_float('HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT)
+        self.pool = pool or _shared_pool
+        self.max_retries = int(env_float('HTTP_MAX_RETRIES', DEFAULT_MAX_RETRIES)) if max_retries is None else max_retries
+        self.max_retry_wait = max_retry_wait or env_float('HTTP_MAX_RETRY_WAIT', DEFAULT_MAX_RETRY_WAIT)
+        self.cache = cache
+
+    def url(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        url = path if '://' in path else f"{self.base_url}/{path.lstrip('/')}"
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urllib.parse.urlencode(params)}"
+        return url
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Union[bytes, MultipartFile]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        use_cache: bool = True,
+        sink: Optional[BinaryIO] = None
+    ) -> HttpResponse:
+        url = self.url(path, params)
+        request_headers = {**self.headers, **(headers or {})}
+
+        if isinstance(body, MultipartFile):
+            request_headers.update(body.headers())
+
+        cache = self.cache if use_cache and method == 'GET' and sink is None else None
+        cache_key = url
+        cached = cache.lookup(cache_key) if cache is not None else None
+        if cached is not None:
+            request_headers.update(cached.validators())
+
+        for attempt in range(self.max_retries + 1):
+            redirect_url, redirect_method, redirect_body = url, method, body
+
+            for _ in range(MAX_REDIRECTS + 1):
+                response = self._send(redirect_method, redirect_url, redirect_body, request_headers, attempt, sink)
+
+                location = response.headers.get('Location')
+                if response.status not in REDIRECT_CODES or not location:
+                    break
+
+                redirect_url = urllib.parse.urljoin(redirect_url, location)
+                if response.status == 303 or (response.status in (301, 302) and redirect_method == 'POST'):
+                    redirect_method, redirect_body = 'GET', None
+                    request_headers.pop('Content-Type', None)
+                    request_headers.pop('Content-Length', None)
+
+            url = redirect_url
+            # The limiter already paused the host for Retry-After; the next _send waits it out.
+            # Only a 429 guarantees the request was not processed, so a 503 is resent for idempotent methods only
+            if response.status not in THROTTLE_CODES or response.throttle_delay is None:
+                break
+            if response.status != 429 and method not in IDEMPOTENT_METHODS:
+                break
+            if response.throttle_delay > self.max_retry_wait:
+                break
+
+        if cached is not None and response.status == 304:
+            cache.touch(cache_key)
+            response = HttpResponse(200, 'OK', url, build_headers(cached.headers), cached.body)
+            response.from_cache = True
+            return response
+
+        if response.status >= 400:
+            raise HttpError(response.status, response.reason, url, response.headers, response.body)
+
+        if cache is not None and response.status == 200:
+            cache.store(cache_key, response.headers, response.body)
+
+        return response
+
+    def _send(self, method: str, url: str, body: Optional[Union[bytes, MultipartFile]], headers: Dict[str, str],
+              attempt: int = 0, sink: Optional[BinaryIO] = None) -> HttpResponse:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+
+        target = parts.path or '/'
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        headers = {
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            **headers
+        }
+        if sink is not None:
+            # Streamed bodies are written as they arrive, so they must not be compressed
+            headers['Accept-Encoding'] = 'identity'
+
+        if self.cookie_jar is not None:
+            cookie_request = urllib.request.Request(url, method=method)
+            self.cookie_jar.add_cookie_header(cookie_request)
+            cookie = cookie_request.get_header('Cookie')
+            if cookie:
+                headers['Cookie'] = cookie
+
+        for connect_try in range(2):
+            try:
+                conn, reused = self.pool.acquire(key, self.connect_timeout, self.read_timeout)
+            except (OSError, http.client.HTTPException) as e:
+                raise TransportError(str(e) or type(e).__name__, url, sent=False)
+
+            reusable = False
+            streamed = False
+            written = False
+            try:
+                request_target = url if getattr(conn, 'via_proxy', False) else target
+                conn.request(method, request_target, body=body, headers=headers)
+                written = True
+                raw = conn.getresponse()
+                if sink is not None and 200 <= raw.status < 300:
+                    streamed = True
+                    data = b''
+                    if raw.status == 200 and 'Range' in headers:
+                        # The server ignored the Range header and is sending the whole body
+                        sink.seek(0)
+                        sink.truncate()
+                    while True:
+                        chunk = raw.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        sink.write(chunk)
+                    # read(amt) returns b'' when the peer closes early instead of raising
+                    if raw.length:
+                        raise http.client.IncompleteRead(b'', raw.length)
+                else:
+                    data = raw.read()
+                reusable = not raw.will_close
+                throttle_delay = self.pool.record(key, raw.status, raw.headers, attempt)
+            except STALE_CONNECTION_ERRORS as e:
+                # Once the whole request is written the server may have acted on it even if it then hung up,
+                # so only idempotent requests are resent from that point
+                if reused and connect_try == 0 and not streamed and (not written or method in IDEMPOTENT_METHODS):
+                    continue
+                raise TransportError(str(e) or type(e).__name__, url, sent=written)
+            except socket.timeout:
+                raise TransportError(f"timed out after {self.read_timeout}s", url, sent=written)
+            except (OSError, http.client.HTTPException) as e:
+                raise TransportError(str(e) or type(e).__name__, url, sent=written)
+            finally:
+                self.pool.release(key, conn, reusable)
+
+            response = HttpResponse(raw.status, raw.reason, url, raw.headers,
+                                    decode_body(data, raw.headers.get('Content-Encoding')))
+            response.throttle_delay = throttle_delay
+
+            if self.cookie_jar is not None:
+                self.cookie_jar.extract_cookies(response, urllib.request.Request(url, method=method))
+
+            return response
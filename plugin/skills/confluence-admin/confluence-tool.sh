@@ -18,12 +18,18 @@ case "$command" in
     get-space)
         python3 "$SCRIPTS_DIR/confluence_get_space.py" "$@"
         ;;
+    export-space)
+        python3 "$SCRIPTS_DIR/confluence_export_space.py" "$@"
+        ;;
     get-page)
         python3 "$SCRIPTS_DIR/confluence_get_page.py" "$@"
         ;;
     search)
         python3 "$SCRIPTS_DIR/confluence_search.py" "$@"
         ;;
+    index)
+        python3 "$SCRIPTS_DIR/confluence_index.py" "$@"
+        ;;
     create-page)
         python3 "$SCRIPTS_DIR/confluence_create_page.py" "$@"
         ;;
@@ -33,6 +39,12 @@ case "$command" in
     list-attachments)
         python3 "$SCRIPTS_DIR/confluence_list_attachments.py" "$@"
         ;;
+    download-attachments)
+        python3 "$SCRIPTS_DIR/confluence_attachments.py" download "$@"
+        ;;
+    upload-attachments)
+        python3 "$SCRIPTS_DIR/confluence_attachments.py" upload "$@"
+        ;;
     --help|-h|help)
         echo "Confluence Admin Tool - Manage Confluence via REST API"
         echo ""
@@ -43,20 +55,32 @@ case "$command" in
         echo "  list-spaces <instance> [limit] [type]"
         echo "                                - List spaces (type: global/personal/all)"
         echo "  get-space <instance> <key>    - Get space details"
+        echo "  export-space <instance> <key> [--output DIR] [--concurrency N] [--no-attachments]"
+        echo "                                - Export/refresh all pages and attachments to disk"
         echo ""
         echo "Pages:"
         echo "  get-page <instance> <id> [expand]"
         echo "                                - Get page by ID"
         echo "  search <instance> <cql> [limit]"
         echo "                                - Search with CQL"
+        echo "  search <instance> <text> [limit] --local [--space KEY]"
+        echo "                                - Full-text search of the local index (offline)"
+        echo "  index <instance> <space> [--full] | --status"
+        echo "                                - Build/update the local search index"
         echo "  create-page <instance> <json|->"
         echo "                                - Create new page"
         echo "  update-page <instance> <id> <json|->"
         echo "                                - Update page"
+        echo "  update-page <instance> <id> --patch <json|-> [--dry-run] [--message TEXT] [--minor-edit]"
+        echo "                                - Patch sections/elements of the current version"
         echo ""
         echo "Attachments:"
         echo "  list-attachments <instance> <page_id> [limit]"
         echo "                                - List page attachments"
+        echo "  download-attachments <instance> <page_id> [name...] [--output DIR] [--force]"
+        echo "                                - Download attachments (resumes partial files)"
+        echo "  upload-attachments <instance> <page_id> <file...> [--comment TEXT] [--minor-edit]"
+        echo "                                - Upload files (new version if the name exists)"
         echo ""
         echo "  --help, -h, help              - Show this message"
         exit 0
@@ -1,78 +1,74 @@
 #!/usr/bin/env python3
 
+import os
+import re
 import sys
 import json
-import urllib.request
-import urllib.parse
-import urllib.error
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Iterator
 from confluence_auth import ConfluenceAuth
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '_lib'))
+from http_client import HttpClient, HttpResponse, HttpError, TransportError
+from http_cache import open_cache
+
+CONTENT_ENDPOINT = re.compile(r'^content/\d+$')
+
+
+def error_message(e: HttpError) -> str:
+    error_body = e.text()
+    try:
+        error_json = json.loads(error_body)
+        if 'message' in error_json:
+            return f"Confluence Error ({e.status}): {error_json['message']}"
+    except (ValueError, TypeError):
+        pass
+    return f"HTTP {e.status}: {error_body}"
+
 
 class ConfluenceAPI:
     def __init__(self, instance: str):
         self.auth = ConfluenceAuth(instance)
         self.base_url = self.auth.url
-        self.opener = self.auth.get_opener()
         self.headers = self.auth.get_headers()
+        self.http = HttpClient(self.base_url, headers=self.headers, cookie_jar=self.auth.get_cookie_jar(),
+                               cache=open_cache(f"confluence-{instance.lower()}"))
+
+    def request(self, method: str, path: str, **kwargs) -> HttpResponse:
+        try:
+            return self.http.request(method, path, **kwargs)
+
+        except HttpError as e:
+            if e.status != 401 or self.auth.auth_method != "nginx_browser":
+                raise
+
+            print("Session expired, clearing cache and retrying...", file=sys.stderr)
+            self.auth.invalidate_session()
+            self.http.cookie_jar = self.auth.get_cookie_jar()
+
+            return self.http.request(method, path, **kwargs)
 
     def _make_request(
         self,
         endpoint: str,
         method: str = "GET",
         data: Optional[Dict[str, Any]] = None,
-        params: Optional[Dict[str, str]] = None
+        params: Optional[Dict[str, str]] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
-        url = f"{self.base_url}/rest/api/{endpoint.lstrip('/')}"
-
-        if params:
-            query_string = urllib.parse.urlencode(params)
-            url = f"{url}?{query_string}"
+        path = f"rest/api/{endpoint.lstrip('/')}"
 
         req_data = None
         if data:
             req_data = json.dumps(data).encode('utf-8')
 
-        request = urllib.request.Request(url, data=req_data, method=method)
+        try:
+            return self.request(method, path, params=params, body=req_data, use_cache=use_cache).json()
 
-        for key, value in self.headers.items():
-            request.add_header(key, value)
+        except HttpError as e:
+            print(error_message(e), file=sys.stderr)
+            sys.exit(1)
 
-        try:
-            with self.opener.open(request, timeout=30) as response:
-                response_text = response.read().decode('utf-8')
-                if response_text:
-                    return json.loads(response_text)
-                return {}
-
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8')
-
-            if e.code == 401 and self.auth.auth_method == "nginx_browser":
-                print("Session expired, clearing cache and retrying...", file=sys.stderr)
-                self.auth.clear_cache()
-                self.opener = self.auth.get_opener()
-
-                request2 = urllib.request.Request(url, data=req_data, method=method)
-                for key, value in self.headers.items():
-                    request2.add_header(key, value)
-
-                try:
-                    with self.opener.open(request2, timeout=30) as response:
-                        response_text = response.read().decode('utf-8')
-                        if response_text:
-                            return json.loads(response_text)
-                        return {}
-                except urllib.error.HTTPError as e2:
-                    error_body2 = e2.read().decode('utf-8')
-                    self._handle_error(e2.code, error_body2)
-                except urllib.error.URLError as e2:
-                    print(f"URL Error: {e2.reason}", file=sys.stderr)
-                    sys.exit(1)
-            else:
-                self._handle_error(e.code, error_body)
-
-        except urllib.error.URLError as e:
+        except TransportError as e:
             print(f"URL Error: {e.reason}", file=sys.stderr)
             sys.exit(1)
 
@@ -80,19 +76,32 @@ class ConfluenceAPI:
             print(f"JSON Decode Error: {e}", file=sys.stderr)
             sys.exit(1)
 
-    def _handle_error(self, code: int, error_body: str):
-        try:
-            error_json = json.loads(error_body)
-            if 'message' in error_json:
-                print(f"Confluence Error ({code}): {error_json['message']}", file=sys.stderr)
-            else:
-                print(f"HTTP {code}: {error_body}", file=sys.stderr)
-        except:
-            print(f"HTTP {code}: {error_body}", file=sys.stderr)
-        sys.exit(1)
-
-    def get(self, endpoint: str, params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-        return self._make_request(endpoint, "GET", params=params)
+    def get(self, endpoint: str, params: Optional[Dict[str, str]] = None, use_cache: bool = True) -> Dict[str, Any]:
+        endpoint = endpoint.strip('/')
+        cache = self.http.cache if use_cache else None
+
+        # Confluence sends no ETag for content; a cached page is reused while version.number is unchanged
+        if cache is not None and CONTENT_ENDPOINT.match(endpoint):
+            url = self.http.url(f"rest/api/{endpoint}", params)
+            cached = cache.lookup(url)
+            if cached is not None and cached.version is not None and not cached.validators():
+                current = self._make_request(endpoint, "GET", params={'expand': 'version'}, use_cache=False)
+                if current.get('version', {}).get('number') == cached.version:
+                    cache.touch(url)
+                    return json.loads(cached.body)
+
+        return self._make_request(endpoint, "GET", params=params, use_cache=use_cache)
+
+    def get_all(self, endpoint: str, params: Optional[Dict[str, str]] = None,
+                use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+        while endpoint:
+            page = self._make_request(endpoint, "GET", params=params, use_cache=use_cache)
+            yield from page.get('results', [])
+
+            # _links.next already carries the query string (and the context path, if any)
+            next_link = page.get('_links', {}).get('next')
+            endpoint = next_link.split('/rest/api/', 1)[-1] if next_link else None
+            params = None
 
     def post(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         return self._make_request(endpoint, "POST", data=data)
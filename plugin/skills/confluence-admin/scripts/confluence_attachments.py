@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import glob
+import json
+import argparse
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any
+from confluence_api import ConfluenceAPI, error_message
+from http_client import HttpError, TransportError, MultipartFile
+
+DEFAULT_CONCURRENCY = 4
+PAGE_LIMIT = '100'
+
+
+def failure(e: Exception) -> str:
+    if isinstance(e, HttpError):
+        return error_message(e)
+    if isinstance(e, TransportError):
+        return f"URL Error: {e.reason}"
+    return str(e)
+
+
+def local_name(title: str) -> str:
+    return title.replace('/', '_').replace('\0', '_') or 'attachment'
+
+
+def list_attachments(api: ConfluenceAPI, page_id: str) -> List[Dict[str, Any]]:
+    return list(api.get_all(f'content/{page_id}/child/attachment',
+                            params={'expand': 'version', 'limit': PAGE_LIMIT}, use_cache=False))
+
+
+def read_sidecar(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def download_one(api: ConfluenceAPI, attachment: Dict[str, Any], output: str, force: bool) -> Dict[str, Any]:
+    size = attachment.get('extensions', {}).get('fileSize')
+    version = attachment['version']['number']
+    name = local_name(attachment['title'])
+    path = os.path.join(output, name)
+    # Records which attachment version the file holds; a new version can have the same size
+    sidecar_path = os.path.join(output, f".{name}.version")
+    result = {'id': attachment['id'], 'title': attachment['title'], 'version': version, 'path': path}
+
+    recorded = read_sidecar(sidecar_path)
+    if (not force and os.path.exists(path) and recorded.get('id') == attachment['id']
+            and recorded.get('version') == version and recorded.get('size') == os.path.getsize(path)):
+        return {**result, 'status': 'unchanged', 'size': recorded['size']}
+
+    # The version is part of the name so a newer upload never resumes onto older bytes
+    part_path = os.path.join(output, f".{attachment['id']}-v{version}.part")
+    for stale in glob.glob(os.path.join(glob.escape(output), f".{attachment['id']}-v*.part")):
+        if stale != part_path:
+            os.remove(stale)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+    try:
+        with open(part_path, 'ab') as sink:
+            api.request('GET', attachment['_links']['download'].lstrip('/'), headers=headers, use_cache=False, sink=sink)
+    except HttpError as e:
+        if not (e.status == 416 and offset and offset == size):
+            raise
+
+    received = os.path.getsize(part_path)
+    if size is not None and received != size:
+        raise ValueError(f"Incomplete download: {received} of {size} bytes (rerun to resume)")
+
+    os.replace(part_path, path)
+    with open(sidecar_path, 'w', encoding='utf-8') as f:
+        json.dump({'id': attachment['id'], 'version': version, 'size': received}, f)
+    return {**result, 'status': 'resumed' if offset else 'downloaded', 'size': received}
+
+
+def upload_one(api: ConfluenceAPI, page_id: str, path: str, existing: Dict[str, Dict[str, Any]],
+               comment: str, minor_edit: bool) -> Dict[str, Any]:
+    name = os.path.basename(path)
+    fields = {'minorEdit': 'true' if minor_edit else 'false'}
+    if comment:
+        fields['comment'] = comment
+
+    body = MultipartFile(path, filename=name, content_type=mimetypes.guess_type(name)[0] or 'application/octet-stream',
+                         fields=fields)
+
+    # Re-uploading an existing file name has to go through the attachment's data endpoint
+    current = existing.get(name)
+    endpoint = f"rest/api/content/{page_id}/child/attachment"
+    if current:
+        endpoint += f"/{current['id']}/data"
+
+    data = api.request('POST', endpoint, body=body, headers={'X-Atlassian-Token': 'no-check'}).json()
+    attachment = data['results'][0] if 'results' in data else data
+
+    return {
+        'file': path,
+        'status': 'updated' if current else 'created',
+        'id': attachment['id'],
+        'title': attachment['title'],
+        'version': attachment.get('version', {}).get('number'),
+        'size': os.path.getsize(path)
+    }
+
+
+def run_parallel(tasks: List, concurrency: int) -> Dict[str, List[Dict[str, Any]]]:
+    results = []
+    errors = []
+
+    def attempt(task):
+        label, call = task
+        try:
+            return call(), None
+        except (HttpError, TransportError, OSError, ValueError) as e:
+            return None, {**label, 'error': failure(e)}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for result, error in pool.map(attempt, tasks):
+            if error:
+                errors.append(error)
+                print(f"Failed: {error}", file=sys.stderr)
+            else:
+                results.append(result)
+                print(f"{result['status'].capitalize()}: {result.get('path') or result.get('file')}", file=sys.stderr)
+
+    return {'results': results, 'errors': errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream Confluence attachments to and from disk')
+    subparsers = parser.add_subparsers(dest='operation', required=True)
+
+    download_parser = subparsers.add_parser('download', help='Download attachments of a page')
+    download_parser.add_argument('instance', help='Instance name (e.g., DEVERSIN)')
+    download_parser.add_argument('page_id', help='Page ID')
+    download_parser.add_argument('names', nargs='*', help='Attachment file names (default: all)')
+    download_parser.add_argument('--output', default='.', help='Target directory (default: current directory)')
+    download_parser.add_argument('--force', action='store_true', help='Download even if this version was downloaded before')
+
+    upload_parser = subparsers.add_parser('upload', help='Upload files to a page (new version if the name exists)')
+    upload_parser.add_argument('instance', help='Instance name (e.g., DEVERSIN)')
+    upload_parser.add_argument('page_id', help='Page ID')
+    upload_parser.add_argument('files', nargs='+', help='Files to upload')
+    upload_parser.add_argument('--comment', help='Attachment version comment')
+    upload_parser.add_argument('--minor-edit', action='store_true', help='Do not notify page watchers')
+
+    for sub in (download_parser, upload_parser):
+        sub.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                         help=f'Transfers in parallel (default: {DEFAULT_CONCURRENCY})')
+
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        print("Error: --concurrency must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    api = ConfluenceAPI(args.instance)
+
+    if args.operation == 'download':
+        attachments = list_attachments(api, args.page_id)
+        if args.names:
+            missing = set(args.names) - {attachment['title'] for attachment in attachments}
+            if missing:
+                print(f"Error: No attachment named {', '.join(sorted(missing))} on page {args.page_id}", file=sys.stderr)
+                sys.exit(1)
+            attachments = [attachment for attachment in attachments if attachment['title'] in args.names]
+
+        os.makedirs(args.output, exist_ok=True)
+        tasks = [({'id': attachment['id'], 'title': attachment['title']},
+                  lambda attachment=attachment: download_one(api, attachment, args.output, args.force))
+                 for attachment in attachments]
+    else:
+        missing = [path for path in args.files if not os.path.isfile(path)]
+        if missing:
+            print(f"Error: Not a file: {', '.join(missing)}", file=sys.stderr)
+            sys.exit(1)
+
+        existing = {attachment['title']: attachment for attachment in list_attachments(api, args.page_id)}
+        tasks = [({'file': path},
+                  lambda path=path: upload_one(api, args.page_id, path, existing, args.comment, args.minor_edit))
+                 for path in args.files]
+
+    output = run_parallel(tasks, args.concurrency)
+    print(json.dumps({'operation': args.operation, 'page_id': args.page_id, **output}, indent=2))
+
+    if output['errors']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
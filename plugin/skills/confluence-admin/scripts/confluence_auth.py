@@ -3,12 +3,44 @@
 import os
 import sys
 import json
+import fcntl
 import base64
 import time
+import urllib.parse
 import urllib.request
 import urllib.error
+from contextlib import contextmanager
+from html.parser import HTMLParser
 from http.cookiejar import Cookie, CookieJar
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+DEFAULT_SESSION_FRESH = 900
+SESSION_COOKIES = ('seraph.confluence', 'JSESSIONID')
+
+
+class LoginFormParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.forms: List[Dict[str, Any]] = []
+        self.current: Optional[Dict[str, Any]] = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'form':
+            self.current = {'action': attrs.get('action') or '', 'inputs': []}
+            self.forms.append(self.current)
+        elif tag == 'input' and self.current is not None and attrs.get('name'):
+            self.current['inputs'].append(attrs)
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self.current = None
+
+    def login_form(self) -> Optional[Dict[str, Any]]:
+        for form in self.forms:
+            if any((field.get('type') or '').lower() == 'password' for field in form['inputs']):
+                return form
+        return None
 
 
 class ConfluenceAuth:
@@ -28,6 +60,8 @@ class ConfluenceAuth:
         self.url = self.url.rstrip('/')
         self.cache_file = f"/tmp/confluence_{instance.lower()}_session.json"
         self.cache_ttl = 7 * 24 * 3600
+        self.session_fresh = float(os.getenv('CONFLUENCE_SESSION_FRESH') or DEFAULT_SESSION_FRESH)
+        self.session: Optional[Dict[str, Any]] = None
 
         self.auth_method = self._detect_auth_method()
 
@@ -44,29 +78,22 @@ class ConfluenceAuth:
             print("Optional: BASIC_USER + BASIC_PASS (for nginx-protected instances)", file=sys.stderr)
             sys.exit(1)
 
-    def get_opener(self) -> urllib.request.OpenerDirector:
+    def get_cookie_jar(self) -> CookieJar:
         if self.auth_method == "nginx_browser":
-            return self._get_session_based_opener()
-        else:
-            return self._get_simple_opener()
+            self.session = self._get_or_create_session()
+            return self._build_cookie_jar(self.session['cookie_value'],
+                                          self.session.get('cookie_name', 'seraph.confluence'))
+        return CookieJar()
 
-    def _get_simple_opener(self) -> urllib.request.OpenerDirector:
+    def _build_cookie_jar(self, cookie_value: str, cookie_name: str) -> CookieJar:
         cookie_jar = CookieJar()
-        return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookie_jar))
 
-    def _get_session_based_opener(self) -> urllib.request.OpenerDirector:
-        session = self._get_or_create_session()
-
-        cookie_jar = CookieJar()
-
-        domain = self.url.replace('https://', '').replace('http://', '')
-
-        cookie_name = session.get('cookie_name', 'seraph.confluence')
+        domain = urllib.parse.urlsplit(self.url).hostname
 
         session_cookie = Cookie(
             version=0,
             name=cookie_name,
-            value=session['cookie_value'],
+            value=cookie_value,
             port=None,
             port_specified=False,
             domain=domain,
@@ -74,7 +101,7 @@ class ConfluenceAuth:
             domain_initial_dot=False,
             path='/',
             path_specified=True,
-            secure=True,
+            secure=self.url.startswith('https://'),
             expires=None,
             discard=True,
             comment=None,
@@ -84,7 +111,7 @@ class ConfluenceAuth:
         )
 
         cookie_jar.set_cookie(session_cookie)
-        return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookie_jar))
+        return cookie_jar
 
     def get_headers(self) -> Dict[str, str]:
         headers = {
@@ -106,68 +133,153 @@ class ConfluenceAuth:
 
         return headers
 
-    def _get_or_create_session(self) -> Dict[str, Any]:
-        if self._is_cache_valid():
+    @contextmanager
+    def _session_lock(self):
+        # One process renews the session; the others wait here and then reuse its cookie
+        with open(self.cache_file + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load_session(self) -> Optional[Dict[str, Any]]:
+        try:
             with open(self.cache_file, 'r') as f:
                 session = json.load(f)
-                cookie_name = session.get('cookie_name', 'seraph.confluence')
-                if self._test_session(session['cookie_value'], cookie_name):
-                    return session
+        except (OSError, ValueError):
+            return None
 
-        return self._create_session_with_browser()
+        if time.time() - session.get('created_at', 0) >= self.cache_ttl:
+            return None
+        return session
 
-    def _is_cache_valid(self) -> bool:
-        if not os.path.exists(self.cache_file):
-            return False
+    def _save_session(self, session: Dict[str, Any]):
+        tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(session, f)
+        os.replace(tmp_file, self.cache_file)
 
-        try:
-            with open(self.cache_file, 'r') as f:
-                session = json.load(f)
+    def _is_fresh(self, session: Dict[str, Any]) -> bool:
+        validated_at = session.get('validated_at', session.get('created_at', 0))
+        return time.time() - validated_at < self.session_fresh
 
-            age = time.time() - session['created_at']
-            return age < self.cache_ttl
-        except:
-            return False
+    def _get_or_create_session(self) -> Dict[str, Any]:
+        session = self._load_session()
+        if session and self._is_fresh(session):
+            return session
+
+        with self._session_lock():
+            session = self._load_session()
+            if session and self._is_fresh(session):
+                return session
+
+            if session and self._test_session(session['cookie_value'], session.get('cookie_name', 'seraph.confluence')):
+                session['validated_at'] = time.time()
+            else:
+                session = self._create_session_with_form() or self._create_session_with_browser()
+
+            self._save_session(session)
+            return session
+
+    def invalidate_session(self):
+        if self.session is None:
+            return
+        with self._session_lock():
+            # Another process may already have replaced the rejected cookie
+            current = self._load_session()
+            if current and current['cookie_value'] == self.session['cookie_value']:
+                os.remove(self.cache_file)
+        self.session = None
+
+    def _nginx_auth_header(self) -> str:
+        return "Basic " + base64.b64encode(f"{self.basic_user}:{self.basic_pass}".encode()).decode()
 
     def _test_session(self, cookie_value: str, cookie_name: str = 'seraph.confluence') -> bool:
         try:
-            cookie_jar = CookieJar()
-            domain = self.url.replace('https://', '').replace('http://', '')
-
-            session_cookie = Cookie(
-                version=0,
-                name=cookie_name,
-                value=cookie_value,
-                port=None,
-                port_specified=False,
-                domain=domain,
-                domain_specified=True,
-                domain_initial_dot=False,
-                path='/',
-                path_specified=True,
-                secure=True,
-                expires=None,
-                discard=True,
-                comment=None,
-                comment_url=None,
-                rest={},
-                rfc2109=False
-            )
-
-            cookie_jar.set_cookie(session_cookie)
+            cookie_jar = self._build_cookie_jar(cookie_value, cookie_name)
             opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookie_jar))
 
-            nginx_auth = base64.b64encode(f"{self.basic_user}:{self.basic_pass}".encode()).decode()
-
             request = urllib.request.Request(f"{self.url}/rest/api/user/current")
-            request.add_header("Authorization", f"Basic {nginx_auth}")
+            request.add_header("Authorization", self._nginx_auth_header())
             request.add_header("Accept", "application/json")
 
             with opener.open(request, timeout=5) as response:
-                return response.status == 200
+                # Anonymous access also answers 200, so check who we are
+                return response.status == 200 and json.load(response).get('type') != 'anonymous'
         except:
             return False
 
+    def _create_session_with_form(self) -> Optional[Dict[str, Any]]:
+        cookie_jar = CookieJar()
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookie_jar))
+        login_url = f"{self.url}/login.action"
+
+        try:
+            request = urllib.request.Request(login_url, headers={"Authorization": self._nginx_auth_header()})
+            with opener.open(request, timeout=15) as response:
+                parser = LoginFormParser()
+                parser.feed(response.read().decode('utf-8', errors='replace'))
+        except (urllib.error.URLError, OSError):
+            return None
+
+        form = parser.login_form()
+        if form is None:
+            return None
+
+        fields = {}
+        for field in form['inputs']:
+            kind = (field.get('type') or 'text').lower()
+            if kind == 'password':
+                fields[field['name']] = self.password
+            elif kind in ('text', 'email') and 'user' in field['name'].lower():
+                fields[field['name']] = self.username
+            elif kind in ('hidden', 'checkbox') and field.get('value') is not None:
+                fields[field['name']] = field['value']
+
+        if self.username not in fields.values():
+            return None
+
+        print(f"Authenticating to {self.url}...", file=sys.stderr)
+
+        action = urllib.parse.urljoin(login_url, form['action'] or 'login.action')
+        request = urllib.request.Request(action, data=urllib.parse.urlencode(fields).encode(), headers={
+            "Authorization": self._nginx_auth_header(),
+            "Content-Type": "application/x-www-form-urlencoded",
+            "X-Atlassian-Token": "no-check"
+        })
+
+        try:
+            with opener.open(request, timeout=15) as response:
+                login_reason = response.headers.get('X-Seraph-LoginReason', '')
+        except urllib.error.HTTPError as e:
+            login_reason = e.headers.get('X-Seraph-LoginReason', '')
+        except (urllib.error.URLError, OSError):
+            return None
+
+        if login_reason in ('AUTHENTICATED_FAILED', 'AUTHENTICATION_DENIED'):
+            print(f"Error: Login failed: {login_reason}", file=sys.stderr)
+            sys.exit(1)
+
+        cookies = {cookie.name: cookie.value for cookie in cookie_jar}
+        for cookie_name in SESSION_COOKIES:
+            if cookie_name in cookies and self._test_session(cookies[cookie_name], cookie_name):
+                print(f"✓ Authenticated successfully", file=sys.stderr)
+                return self._new_session(cookie_name, cookies[cookie_name])
+
+        return None
+
+    def _new_session(self, cookie_name: str, cookie_value: str) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            'cookie_name': cookie_name,
+            'cookie_value': cookie_value,
+            'created_at': now,
+            'validated_at': now,
+            'expires_at': now + self.cache_ttl
+        }
+
     def _create_session_with_browser(self) -> Dict[str, Any]:
         try:
             from playwright.sync_api import sync_playwright
@@ -255,18 +367,8 @@ class ConfluenceAuth:
 
                 browser.close()
 
-                session = {
-                    'cookie_name': cookie_name,
-                    'cookie_value': cookie_value,
-                    'created_at': time.time(),
-                    'expires_at': time.time() + self.cache_ttl
-                }
-
-                with open(self.cache_file, 'w') as f:
-                    json.dump(session, f)
-
                 print(f"✓ Authenticated successfully", file=sys.stderr)
-                return session
+                return self._new_session(cookie_name, cookie_value)
 
             except Exception as e:
                 browser.close()
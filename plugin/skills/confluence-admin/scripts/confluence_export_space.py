@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Optional, Tuple
+from confluence_api import ConfluenceAPI
+from http_client import HttpError, TransportError
+
+DEFAULT_CONCURRENCY = 4
+PAGE_LIMIT = '100'
+PAGE_EXPAND = 'body.storage,version,ancestors,metadata.labels,space'
+FLUSH_INTERVAL = 2
+
+
+def safe_name(name: str) -> str:
+    return re.sub(r'[^\w.-]+', '_', name).strip('_')[:120] or 'file'
+
+
+def write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def remove_file(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class Manifest:
+    def __init__(self, root: str):
+        self.path = os.path.join(root, 'manifest.json')
+        self.lock = threading.Lock()
+        self.flushed_at = 0.0
+        self.data: Dict[str, Any] = {'pages': {}}
+
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                self.data = json.load(f)
+
+    def page(self, page_id: str) -> Optional[Dict[str, Any]]:
+        return self.data['pages'].get(page_id)
+
+    def record(self, page_id: str, entry: Dict[str, Any]):
+        with self.lock:
+            self.data['pages'][page_id] = entry
+            # Flushing on a timer keeps resume cheap without rewriting the manifest per page
+            if time.time() - self.flushed_at >= FLUSH_INTERVAL:
+                self._write()
+
+    def save(self, **fields):
+        with self.lock:
+            self.data.update(fields)
+            self._write()
+
+    def _write(self):
+        write_atomic(self.path, json.dumps(self.data, indent=1).encode('utf-8'))
+        self.flushed_at = time.time()
+
+
+class SpaceExporter:
+    def __init__(self, api: ConfluenceAPI, space_key: str, root: str, attachments: bool):
+        self.api = api
+        self.space_key = space_key
+        self.root = root
+        self.attachments = attachments
+        self.manifest = Manifest(root)
+        self.lock = threading.Lock()
+        self.seen = set()
+        self.errors: List[Dict[str, Any]] = []
+        self.stats = {
+            'pages': 0,
+            'downloaded': 0,
+            'unchanged': 0,
+            'attachments_downloaded': 0,
+            'attachments_unchanged': 0,
+            'removed': 0
+        }
+
+    def count(self, name: str):
+        with self.lock:
+            self.stats[name] += 1
+
+    def list_pages(self, endpoint: str, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        return list(self.api.get_all(endpoint, {**params, 'expand': 'version', 'limit': PAGE_LIMIT}, use_cache=False))
+
+    def export_attachments(self, page_id: str, known: Dict[str, Any]) -> Dict[str, Any]:
+        current = {}
+
+        for attachment in self.list_pages(f'content/{page_id}/child/attachment', {}):
+            attachment_id = attachment['id']
+            version = attachment['version']['number']
+            path = os.path.join('attachments', page_id, f"{attachment_id}-{safe_name(attachment['title'])}")
+            previous = known.get(attachment_id)
+
+            if previous and previous['version'] == version and os.path.exists(os.path.join(self.root, previous['path'])):
+                current[attachment_id] = previous
+                self.count('attachments_unchanged')
+                continue
+
+            target = os.path.join(self.root, path)
+            tmp_path = f"{target}.{threading.get_ident()}.tmp"
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+
+            try:
+                with open(tmp_path, 'wb') as sink:
+                    self.api.request('GET', attachment['_links']['download'].lstrip('/'), use_cache=False, sink=sink)
+            except (HttpError, TransportError) as e:
+                remove_file(tmp_path)
+                reason = f"HTTP {e.status}" if isinstance(e, HttpError) else f"URL Error: {e.reason}"
+                with self.lock:
+                    self.errors.append({'page': page_id, 'attachment': attachment_id, 'error': reason})
+                # Keep the old entry so the next run sees the version mismatch and retries
+                if previous:
+                    current[attachment_id] = previous
+                continue
+
+            os.replace(tmp_path, target)
+            if previous and previous['path'] != path:
+                remove_file(os.path.join(self.root, previous['path']))
+
+            current[attachment_id] = {
+                'title': attachment['title'],
+                'version': version,
+                'path': path,
+                'size': os.path.getsize(target),
+                'mediaType': attachment.get('metadata', {}).get('mediaType')
+            }
+            self.count('attachments_downloaded')
+
+        for attachment_id, previous in known.items():
+            if attachment_id not in current:
+                remove_file(os.path.join(self.root, previous['path']))
+
+        return current
+
+    def export_page(self, summary: Dict[str, Any], parent_id: Optional[str]) -> Tuple[str, List[Dict[str, Any]]]:
+        page_id = summary['id']
+        version = summary['version']['number']
+        path = os.path.join('pages', f"{page_id}.json")
+        previous = self.manifest.page(page_id)
+
+        if previous and previous['version'] == version and os.path.exists(os.path.join(self.root, path)):
+            entry = dict(previous, parent=parent_id)
+            self.count('unchanged')
+        else:
+            page = self.api.get(f'content/{page_id}', params={'expand': PAGE_EXPAND}, use_cache=False)
+            write_atomic(os.path.join(self.root, path), json.dumps(page, indent=2).encode('utf-8'))
+            entry = {
+                'title': page['title'],
+                'version': page['version']['number'],
+                'parent': parent_id,
+                'path': path,
+                'attachments': previous.get('attachments', {}) if previous else {}
+            }
+            self.count('downloaded')
+
+        if self.attachments:
+            entry['attachments'] = self.export_attachments(page_id, entry['attachments'])
+
+        self.manifest.record(page_id, entry)
+        self.count('pages')
+
+        if self.stats['pages'] % 50 == 0:
+            print(f"Exported {self.stats['pages']} pages", file=sys.stderr)
+
+        return page_id, self.list_pages(f'content/{page_id}/child/page', {})
+
+    def remove_missing(self):
+        for page_id in list(self.manifest.data['pages']):
+            if page_id in self.seen:
+                continue
+            remove_file(os.path.join(self.root, 'pages', f"{page_id}.json"))
+            shutil.rmtree(os.path.join(self.root, 'attachments', page_id), ignore_errors=True)
+            del self.manifest.data['pages'][page_id]
+            self.stats['removed'] += 1
+
+    def run(self, concurrency: int) -> Dict[str, Any]:
+        space = self.api.get(f'space/{self.space_key}', params={'expand': 'description.plain,homepage'})
+        write_atomic(os.path.join(self.root, 'space.json'), json.dumps(space, indent=2).encode('utf-8'))
+
+        self.manifest.save(instance=self.api.auth.instance, space=self.space_key, base_url=self.api.base_url,
+                           complete=False)
+
+        roots = self.list_pages(f'space/{self.space_key}/content/page', {'depth': 'root'})
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                pending = set()
+                for page in roots:
+                    self.seen.add(page['id'])
+                    pending.add(pool.submit(self.export_page, page, None))
+
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        parent_id, children = future.result()
+                        for child in children:
+                            if child['id'] not in self.seen:
+                                self.seen.add(child['id'])
+                                pending.add(pool.submit(self.export_page, child, parent_id))
+        finally:
+            self.manifest.save()
+
+        self.remove_missing()
+        self.manifest.save(complete=True, exported_at=int(time.time()))
+
+        return {
+            'space': self.space_key,
+            'output': self.root,
+            'manifest': self.manifest.path,
+            **self.stats,
+            'errors': self.errors
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export a Confluence space (pages, storage bodies, attachments)')
+    parser.add_argument('instance', help='Instance name (e.g., DEVERSIN)')
+    parser.add_argument('space', help='Space key (e.g., DEV)')
+    parser.add_argument('--output', help='Archive directory (default: ./confluence-export/<SPACE>)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Pages processed in parallel (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--no-attachments', action='store_true', help='Skip attachment downloads')
+
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        print("Error: --concurrency must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    root = os.path.abspath(args.output or os.path.join('confluence-export', args.space))
+    os.makedirs(root, exist_ok=True)
+
+    api = ConfluenceAPI(args.instance)
+    exporter = SpaceExporter(api, args.space, root, not args.no_attachments)
+    result = exporter.run(args.concurrency)
+
+    print(json.dumps(result, indent=2))
+
+    if result['errors']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+import argparse
+from confluence_api import ConfluenceAPI
+from confluence_local_index import LocalIndex
+
+PAGE_LIMIT = '50'
+ID_LIMIT = '200'
+PAGE_EXPAND = 'body.storage,version,ancestors,metadata.labels,space'
+INDEX_OVERLAP_MINUTES = 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a local full-text index of a Confluence space')
+    parser.add_argument('instance', help='Instance name (e.g., DEVERSIN)')
+    parser.add_argument('space', nargs='?', help='Space key (e.g., DEV)')
+    parser.add_argument('--full', action='store_true', help='Re-index every page and drop pages no longer in the space')
+    parser.add_argument('--status', action='store_true', help='Show indexed spaces and their last index time')
+
+    args = parser.parse_args()
+
+    index = LocalIndex(args.instance)
+
+    try:
+        if args.status:
+            print(json.dumps({'instance': args.instance.upper(), 'path': index.path, 'spaces': index.status()}, indent=2))
+            return
+
+        if not args.space:
+            print("Error: space is required (or use --status)", file=sys.stderr)
+            sys.exit(1)
+
+        space = args.space.upper()
+        api = ConfluenceAPI(args.instance)
+
+        started = time.time()
+        last_index = None if args.full else index.last_indexed(space)
+
+        space_cql = f'type=page AND space="{space}"'
+        cql = space_cql
+        if last_index is not None:
+            minutes = int((started - last_index) // 60) + INDEX_OVERLAP_MINUTES
+            cql += f' AND lastmodified >= now("-{minutes}m")'
+
+        params = {'cql': cql, 'expand': PAGE_EXPAND, 'limit': PAGE_LIMIT}
+
+        fetched = 0
+        seen = set()
+        batch = []
+        for page in api.get_all('content/search', params=params, use_cache=False):
+            batch.append(page)
+            seen.add(page['id'])
+            if len(batch) == int(PAGE_LIMIT):
+                index.upsert(batch, started)
+                fetched += len(batch)
+                batch = []
+                print(f"Indexed {fetched} pages", file=sys.stderr)
+        index.upsert(batch, started)
+        fetched += len(batch)
+
+        if last_index is not None:
+            # Deleted and moved pages never show up as modified; listing the ids without bodies finds them cheaply
+            for page in api.get_all('content/search', params={'cql': space_cql, 'limit': ID_LIMIT}, use_cache=False):
+                seen.add(page['id'])
+        pruned = index.prune(space, seen)
+        count = index.record_index(space, started)
+
+        output = {
+            'status': 'success',
+            'instance': args.instance.upper(),
+            'space': space,
+            'mode': 'incremental' if last_index is not None else 'full',
+            'fetched': fetched,
+            'pruned': pruned,
+            'pages': count,
+            'seconds': round(time.time() - started, 2),
+            'path': index.path
+        }
+        print(json.dumps(output, indent=2))
+
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import sqlite3
+from html.parser import HTMLParser
+from typing import Dict, Optional, Any, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '_lib'))
+from cache_dir import tool_cache_dir
+
+BLOCK_TAGS = {
+    'p', 'div', 'br', 'hr', 'li', 'tr', 'td', 'th', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'pre', 'blockquote', 'table', 'ul', 'ol', 'ac:structured-macro', 'ac:parameter', 'ac:plain-text-body',
+    'ac:rich-text-body', 'ac:task'
+}
+
+# bm25 weights for title, body, labels, ancestors
+RANK = 'bm25(10.0, 1.0, 5.0, 2.0)'
+
+
+def get_cache_dir(*parts: str) -> str:
+    return tool_cache_dir('confluence-tool', *parts)
+
+
+class StorageText(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+    def unknown_decl(self, data):
+        # Code and noformat macros keep their text in CDATA sections
+        if data.startswith('CDATA['):
+            self.parts.append('\n' + data[6:] + '\n')
+
+    def text(self) -> str:
+        lines = (' '.join(line.split()) for line in ''.join(self.parts).splitlines())
+        return '\n'.join(line for line in lines if line)
+
+
+def storage_to_text(storage: str) -> str:
+    parser = StorageText()
+    parser.feed(storage or '')
+    parser.close()
+    return parser.text()
+
+
+def quote_terms(query: str) -> str:
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+class LocalIndex:
+    def __init__(self, instance: str):
+        self.instance = instance.upper()
+        self.path = os.path.join(get_cache_dir(), f"index-{self.instance.lower()}.sqlite")
+        self.db = sqlite3.connect(self.path, timeout=10)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                space TEXT NOT NULL,
+                title TEXT NOT NULL,
+                version INTEGER,
+                last_modified TEXT,
+                labels TEXT,
+                ancestors TEXT,
+                webui TEXT,
+                indexed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_space ON pages (space);
+            CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+                title, body, labels, ancestors, tokenize = 'porter unicode61', prefix = '2 3'
+            );
+            CREATE TABLE IF NOT EXISTS index_state (
+                space TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                finished_at REAL NOT NULL,
+                page_count INTEGER NOT NULL
+            );
+        """)
+        if not self.db.execute("SELECT 1 FROM pages_fts_config WHERE k = 'rank'").fetchone():
+            with self.db:
+                self.db.execute("INSERT INTO pages_fts (pages_fts, rank) VALUES ('rank', ?)", (RANK,))
+
+    def upsert(self, pages: List[Dict[str, Any]], indexed_at: float):
+        with self.db:
+            for page in pages:
+                labels = [label['name'] for label in page.get('metadata', {}).get('labels', {}).get('results', [])]
+                ancestors = [ancestor['title'] for ancestor in page.get('ancestors', [])]
+                version = page.get('version', {})
+                body = storage_to_text(page.get('body', {}).get('storage', {}).get('value', ''))
+                values = (
+                    page['space']['key'] if page.get('space') else '',
+                    page['title'],
+                    version.get('number'),
+                    version.get('when'),
+                    json.dumps(labels),
+                    json.dumps(ancestors),
+                    page.get('_links', {}).get('webui'),
+                    indexed_at
+                )
+
+                row = self.db.execute("SELECT rowid FROM pages WHERE id = ?", (page['id'],)).fetchone()
+                if row:
+                    rowid = row[0]
+                    self.db.execute(
+                        "UPDATE pages SET space = ?, title = ?, version = ?, last_modified = ?, labels = ?,"
+                        " ancestors = ?, webui = ?, indexed_at = ? WHERE rowid = ?",
+                        values + (rowid,)
+                    )
+                    self.db.execute("DELETE FROM pages_fts WHERE rowid = ?", (rowid,))
+                else:
+                    rowid = self.db.execute(
+                        "INSERT INTO pages (id, space, title, version, last_modified, labels, ancestors, webui,"
+                        " indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (page['id'],) + values
+                    ).lastrowid
+
+                self.db.execute(
+                    "INSERT INTO pages_fts (rowid, title, body, labels, ancestors) VALUES (?, ?, ?, ?, ?)",
+                    (rowid, page['title'], body, ' '.join(labels), ' / '.join(ancestors))
+                )
+
+    def prune(self, space: str, keep: set) -> int:
+        stale = [(rowid,) for rowid, page_id in self.db.execute("SELECT rowid, id FROM pages WHERE space = ?", (space,))
+                 if page_id not in keep]
+        with self.db:
+            self.db.executemany("DELETE FROM pages_fts WHERE rowid = ?", stale)
+            self.db.executemany("DELETE FROM pages WHERE rowid = ?", stale)
+        return len(stale)
+
+    def last_indexed(self, space: str) -> Optional[float]:
+        row = self.db.execute("SELECT started_at FROM index_state WHERE space = ?", (space,)).fetchone()
+        return row[0] if row else None
+
+    def record_index(self, space: str, started_at: float) -> int:
+        count = self.db.execute("SELECT COUNT(*) FROM pages WHERE space = ?", (space,)).fetchone()[0]
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO index_state VALUES (?, ?, ?, ?)",
+                            (space, started_at, time.time(), count))
+        return count
+
+    def status(self) -> List[Dict[str, Any]]:
+        rows = self.db.execute("SELECT space, started_at, page_count FROM index_state ORDER BY space")
+        return [{
+            'space': row[0],
+            'last_index': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(row[1])),
+            'age_seconds': int(time.time() - row[1]),
+            'pages': row[2]
+        } for row in rows]
+
+    def search(self, query: str, space: Optional[str] = None, limit: int = 25) -> Tuple[int, List[Dict[str, Any]]]:
+        where = "pages_fts MATCH ?"
+        params: List[Any] = []
+        if space:
+            # Unary + keeps SQLite from driving the query off pages_space and probing FTS per row
+            where += " AND +p.space = ?"
+            params.append(space.upper())
+
+        def run(match: str):
+            total = self.db.execute(
+                f"SELECT COUNT(*) FROM pages_fts JOIN pages p ON p.rowid = pages_fts.rowid WHERE {where}",
+                [match] + params
+            ).fetchone()[0]
+            rows = self.db.execute(
+                f"SELECT p.id, p.space, p.title, p.version, p.last_modified, p.labels, p.ancestors, p.webui,"
+                f" snippet(pages_fts, 1, '[', ']', '...', 16), pages_fts.rank"
+                f" FROM pages_fts JOIN pages p ON p.rowid = pages_fts.rowid"
+                f" WHERE {where} ORDER BY pages_fts.rank LIMIT ?",
+                [match] + params + [limit]
+            ).fetchall()
+            return total, rows
+
+        try:
+            total, rows = run(query)
+        except sqlite3.OperationalError:
+            # Not valid FTS5 syntax (e.g. "v1.2-beta"); search for the words instead
+            total, rows = run(quote_terms(query))
+
+        return total, [{
+            'id': row[0],
+            'type': 'page',
+            'title': row[2],
+            'space': {'key': row[1]},
+            'version': {'number': row[3], 'when': row[4]},
+            'labels': json.loads(row[5]),
+            'ancestors': json.loads(row[6]),
+            'excerpt': row[8],
+            'score': round(-row[9], 3),
+            '_links': {'webui': row[7]}
+        } for row in rows]
+
+    def close(self):
+        self.db.close()
@@ -2,25 +2,45 @@
 
 import sys
 import json
+import argparse
 from confluence_api import ConfluenceAPI
+from confluence_local_index import LocalIndex
 
-if len(sys.argv) < 3:
-    print("Usage: confluence_search.py <instance> <cql_query> [limit]", file=sys.stderr)
-    print("  cql_query: Confluence Query Language query", file=sys.stderr)
-    print("  Example: 'type=page AND space=DEV AND title~\"api\"'", file=sys.stderr)
-    sys.exit(1)
 
-instance = sys.argv[1]
-cql = sys.argv[2]
-limit = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+def main():
+    parser = argparse.ArgumentParser(
+        description='Search Confluence with CQL, or the local index with --local',
+        epilog='Example: \'type=page AND space=DEV AND title~"api"\''
+    )
+    parser.add_argument('instance', help='Instance name (e.g., DEVERSIN)')
+    parser.add_argument('query', help='CQL query, or full-text query with --local')
+    parser.add_argument('limit', nargs='?', type=int, default=25, help='Maximum results (default: 25)')
+    parser.add_argument('--local', action='store_true',
+                        help='Search the local index built by the index command (offline, FTS5 syntax)')
+    parser.add_argument('--space', help='Restrict --local results to one space')
 
-api = ConfluenceAPI(instance)
+    args = parser.parse_args()
 
-params = {
-    'cql': cql,
-    'limit': str(limit)
-}
+    if args.local:
+        index = LocalIndex(args.instance)
+        try:
+            total, results = index.search(args.query, args.space, args.limit)
+        finally:
+            index.close()
+        print(json.dumps({'results': results, 'size': len(results), 'totalSize': total, 'source': 'local'}, indent=2))
+        return
 
-result = api.get('content/search', params=params)
+    api = ConfluenceAPI(args.instance)
 
-print(json.dumps(result, indent=2))
+    params = {
+        'cql': args.query,
+        'limit': str(args.limit)
+    }
+
+    result = api.get('content/search', params=params)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
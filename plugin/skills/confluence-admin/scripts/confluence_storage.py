@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+
+import re
+from html.parser import HTMLParser
+from typing import Dict, Optional, Any, List, Tuple
+from confluence_local_index import storage_to_text, BLOCK_TAGS
+
+HEADINGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+ACTIONS = ('replace', 'append', 'prepend', 'before', 'after', 'delete')
+
+CDATA = re.compile(r'<!\[CDATA\[.*?\]\]>', re.S)
+XPATH_STEP = re.compile(r'''(//|/)([\w:.-]+|\*)((?:\[(?:[^\]'"]|'[^']*'|"[^"]*")*\])*)''')
+PREDICATE = re.compile(r'''\[((?:[^\]'"]|'[^']*'|"[^"]*")*)\]''')
+QUOTED = r'''(?:'([^']*)'|"([^"]*)")'''
+ATTR_PREDICATE = re.compile(r'^@([\w:.-]+)(?:\s*=\s*' + QUOTED + r')?$')
+TEXT_PREDICATE = re.compile(r'^(?:\.|text\(\))\s*=\s*' + QUOTED + r'$')
+CONTAINS_PREDICATE = re.compile(r'^contains\(\s*(\.|text\(\)|@[\w:.-]+)\s*,\s*' + QUOTED + r'\s*\)$')
+BLOCK_START = re.compile(r'(?=<(?:%s)[\s/>])' % '|'.join(sorted(map(re.escape, BLOCK_TAGS), key=len, reverse=True)))
+
+
+class PatchError(Exception):
+    pass
+
+
+class Node:
+    def __init__(self, tag: str, attrs: Dict[str, str], start: int, inner_start: int, parent: Optional['Node']):
+        self.tag = tag
+        self.attrs = attrs
+        self.start = start
+        self.inner_start = inner_start
+        self.inner_end = inner_start
+        self.end = inner_start
+        self.parent = parent
+        self.children: List['Node'] = []
+        self.empty = False
+
+    def text(self, source: str) -> str:
+        return ' '.join(storage_to_text(source[self.inner_start:self.inner_end]).split())
+
+
+class StorageTree(HTMLParser):
+    # Only records where each element starts and ends; edits are spliced into the original string
+    # so untouched markup stays byte-for-byte identical
+    def __init__(self, source: str):
+        super().__init__(convert_charrefs=True)
+        self.source = source
+        self.root = Node('#root', {}, 0, 0, None)
+        self.stack = [self.root]
+
+        # CDATA (code macros) may contain anything; blank it out with a comment of the same length.
+        # Newlines are kept so the parser's line/column positions still map onto the original offsets
+        masked = CDATA.sub(lambda match: '<!--' + re.sub(r'[^\n]', ' ', match.group()[4:-3]) + '-->', source)
+        self.line_starts = [0] + [match.end() for match in re.finditer('\n', masked)]
+        self.feed(masked)
+        self.close()
+
+        for node in self.stack[1:]:
+            node.inner_end = node.end = len(source)
+        self.root.inner_end = self.root.end = len(source)
+
+    def source_offset(self) -> int:
+        line, column = self.getpos()
+        return self.line_starts[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        start = self.source_offset()
+        parent = self.stack[-1]
+        node = Node(tag, {name: value or '' for name, value in attrs}, start,
+                    start + len(self.get_starttag_text()), parent)
+        parent.children.append(node)
+        self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        node = self.stack.pop()
+        node.inner_end = node.end = node.inner_start
+        node.empty = True
+
+    def handle_endtag(self, tag):
+        position = self.source_offset()
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth].tag == tag:
+                end = self.source.find('>', position) + 1 or len(self.source)
+                for node in self.stack[depth:]:
+                    node.inner_end = position
+                    node.end = end if node is self.stack[depth] else position
+                del self.stack[depth:]
+                return
+
+
+def iter_nodes(node: Node):
+    for child in node.children:
+        yield child
+        yield from iter_nodes(child)
+
+
+def find_sections(tree: StorageTree, heading: str, level: Optional[int] = None) -> List[Tuple[Node, int]]:
+    wanted = ' '.join(heading.split()).casefold()
+    sections = []
+    for node in iter_nodes(tree.root):
+        if node.tag not in HEADINGS or (level and HEADINGS[node.tag] != level):
+            continue
+        if node.text(tree.source).casefold() != wanted:
+            continue
+
+        # A section runs until the next heading of the same or a higher level among its siblings
+        siblings = node.parent.children
+        end = node.parent.inner_end
+        for sibling in siblings[siblings.index(node) + 1:]:
+            if sibling.tag in HEADINGS and HEADINGS[sibling.tag] <= HEADINGS[node.tag]:
+                end = sibling.start
+                break
+        sections.append((node, end))
+    return sections
+
+
+def matches_predicate(node: Node, predicate: str, source: str) -> bool:
+    match = ATTR_PREDICATE.match(predicate)
+    if match:
+        name, single, double = match.groups()
+        if name.lower() not in node.attrs:
+            return False
+        return single is None and double is None or node.attrs[name.lower()] == (single if single is not None else double)
+
+    match = TEXT_PREDICATE.match(predicate)
+    if match:
+        value = match.group(1) if match.group(1) is not None else match.group(2)
+        return node.text(source) == ' '.join(value.split())
+
+    match = CONTAINS_PREDICATE.match(predicate)
+    if match:
+        subject = match.group(1)
+        value = match.group(2) if match.group(2) is not None else match.group(3)
+        haystack = node.attrs.get(subject[1:].lower(), '') if subject.startswith('@') else node.text(source)
+        return value in haystack
+
+    raise PatchError(f"Unsupported XPath predicate: [{predicate}]")
+
+
+def select(tree: StorageTree, xpath: str) -> List[Node]:
+    xpath = xpath.strip()
+    steps = []
+    position = 0
+    while position < len(xpath):
+        match = XPATH_STEP.match(xpath, position)
+        if not match:
+            raise PatchError(f"Unsupported XPath at '{xpath[position:]}' (supported: /, //, name, *, "
+                             f"[n], [last()], [@a], [@a='v'], [.='text'], [contains(., 'text')])")
+        steps.append((match.group(1), match.group(2).lower(), PREDICATE.findall(match.group(3))))
+        position = match.end()
+    if not steps:
+        raise PatchError("Empty XPath")
+
+    context = [tree.root]
+    for axis, name, predicates in steps:
+        # Positional predicates count among siblings, so candidates are grouped by parent
+        parents = []
+        for node in context:
+            parents.append(node)
+            if axis == '//':
+                parents.extend(iter_nodes(node))
+
+        selected = []
+        seen = set()
+        for parent in parents:
+            if id(parent) in seen:
+                continue
+            seen.add(id(parent))
+            group = [child for child in parent.children if name == '*' or child.tag == name]
+            for predicate in predicates:
+                predicate = predicate.strip()
+                if predicate.isdigit():
+                    group = group[int(predicate) - 1:int(predicate)] if int(predicate) > 0 else []
+                elif predicate == 'last()':
+                    group = group[-1:]
+                else:
+                    group = [child for child in group if matches_predicate(child, predicate, tree.source)]
+            selected.extend(group)
+
+        unique = {id(node): node for node in selected}
+        context = sorted(unique.values(), key=lambda node: node.start)
+
+    return context
+
+
+def operation_edits(tree: StorageTree, operation: Dict[str, Any]) -> List[Tuple[int, int, str]]:
+    actions = [action for action in ACTIONS if action in operation]
+    if len(actions) != 1:
+        raise PatchError(f"Operation needs exactly one of {', '.join(ACTIONS)}: {operation}")
+    action = actions[0]
+    value = '' if action == 'delete' else operation[action]
+    if not isinstance(value, str):
+        raise PatchError(f"'{action}' must be a storage format string: {operation}")
+
+    edits = []
+    if 'section' in operation:
+        label = f"section '{operation['section']}'"
+        for heading, end in find_sections(tree, operation['section'], operation.get('level')):
+            edits.append({
+                'replace': (heading.end, end, value),
+                'append': (end, end, value),
+                'prepend': (heading.end, heading.end, value),
+                'before': (heading.start, heading.start, value),
+                'after': (end, end, value),
+                'delete': (heading.start, end, '')
+            }[action])
+    elif 'xpath' in operation:
+        label = f"xpath {operation['xpath']}"
+        for node in select(tree, operation['xpath']):
+            if node.empty and action in ('append', 'prepend'):
+                raise PatchError(f"Cannot {action} inside the empty element <{node.tag}/> ({label})")
+            edits.append({
+                'replace': (node.start, node.end, value),
+                'append': (node.inner_end, node.inner_end, value),
+                'prepend': (node.inner_start, node.inner_start, value),
+                'before': (node.start, node.start, value),
+                'after': (node.end, node.end, value),
+                'delete': (node.start, node.end, '')
+            }[action])
+    else:
+        raise PatchError(f"Operation needs a 'section' or 'xpath' target: {operation}")
+
+    if not edits:
+        raise PatchError(f"No match for {label}")
+    if len(edits) > 1 and not operation.get('all'):
+        raise PatchError(f"{label} matches {len(edits)} places; narrow it down or set \"all\": true")
+    return edits
+
+
+def apply_operation(source: str, operation: Dict[str, Any]) -> str:
+    edits = sorted(operation_edits(StorageTree(source), operation), key=lambda edit: (edit[0], edit[1]))
+    for previous, current in zip(edits, edits[1:]):
+        if current[0] < previous[1]:
+            raise PatchError(f"Matches overlap (nested elements?): {operation}")
+
+    for start, end, value in reversed(edits):
+        source = source[:start] + value + source[end:]
+    return source
+
+
+def apply_patch(source: str, operations: List[Dict[str, Any]]) -> str:
+    if not isinstance(operations, list):
+        raise PatchError("'operations' must be a list")
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise PatchError(f"Operation must be an object: {operation!r}")
+        source = apply_operation(source, operation)
+    return source
+
+
+def diff_lines(storage: str) -> List[str]:
+    # Storage is usually one long line; break it before block elements so diffs stay readable
+    return [line.rstrip('\n') for line in BLOCK_START.split(storage) if line.strip()]
@@ -2,13 +2,17 @@
 
 import sys
 import json
-from confluence_api import ConfluenceAPI
+import difflib
+import argparse
+from typing import Dict, Any
+from confluence_api import ConfluenceAPI, error_message
+from confluence_storage import apply_patch, diff_lines, PatchError
+from http_client import HttpError, TransportError
 
-if len(sys.argv) < 4:
-    print("Usage: confluence_update_page.py <instance> <page_id> <json_file|->>", file=sys.stderr)
-    print("  json_file: File containing update data or '-' for stdin", file=sys.stderr)
-    print("""
-Example JSON:
+DEFAULT_RETRIES = 3
+
+EXAMPLE = """
+Example JSON (full update):
 {
   "version": {"number": 2},
   "title": "Updated Page Title",
@@ -20,21 +24,138 @@ Example JSON:
     }
   }
 }
-""", file=sys.stderr)
+
+Example patch (--patch):
+{
+  "title": "Optional new title",
+  "operations": [
+    {"section": "Installation", "replace": "<p>Run <code>make install</code></p>"},
+    {"xpath": "//table[1]/tbody", "append": "<tr><td>1.4</td><td>Released</td></tr>"},
+    {"xpath": "//ac:structured-macro[@ac:name='warning']", "delete": true}
+  ]
+}
+"""
+
+
+def load_json(source: str) -> Any:
+    if source == '-':
+        return json.load(sys.stdin)
+    with open(source, 'r') as f:
+        return json.load(f)
+
+
+def patch_page(api: ConfluenceAPI, page_id: str, patch: Any, args) -> Dict[str, Any]:
+    operations = patch if isinstance(patch, list) else patch.get('operations', [])
+    new_title = None if isinstance(patch, list) else patch.get('title')
+    conflict = None
+
+    for attempt in range(1, args.retries + 2):
+        page = api.get(f'content/{page_id}', params={'expand': 'body.storage,version,space'})
+        version = page['version']['number']
+        storage = page['body']['storage']['value']
+
+        if conflict is not None:
+            previous_version, error, previous_patched, previous_title = conflict
+            # A 409 without a newer version is not an edit conflict (e.g. a duplicate title); rebasing won't help
+            if previous_version == version:
+                print(error_message(error), file=sys.stderr)
+                sys.exit(1)
+            # The 409 may answer a retried PUT whose first attempt went through; re-applying would patch twice
+            if storage == previous_patched and page['title'] == previous_title:
+                return {
+                    'status': 'updated',
+                    'id': page_id,
+                    'title': page['title'],
+                    'version': version,
+                    'attempts': attempt - 1,
+                    'previous_version': previous_version,
+                    '_links': {'webui': page.get('_links', {}).get('webui')}
+                }
+
+        try:
+            patched = apply_patch(storage, operations)
+        except PatchError as e:
+            print(f"Patch Error (version {version}): {e}", file=sys.stderr)
+            sys.exit(1)
+
+        title = new_title or page['title']
+        result = {'id': page_id, 'title': title, 'version': version, 'attempts': attempt}
+
+        if patched == storage and title == page['title']:
+            return {'status': 'unchanged', **result}
+
+        if args.dry_run:
+            diff = difflib.unified_diff(diff_lines(storage), diff_lines(patched), f'version {version}', 'patched',
+                                        lineterm='')
+            return {'status': 'dry-run', **result, 'diff': '\n'.join(diff)}
+
+        data = {
+            'id': page_id,
+            'type': page['type'],
+            'title': title,
+            'version': {'number': version + 1, 'minorEdit': args.minor_edit},
+            'body': {'storage': {'value': patched, 'representation': 'storage'}}
+        }
+        if args.message:
+            data['version']['message'] = args.message
+
+        try:
+            updated = api.request('PUT', f'rest/api/content/{page_id}', body=json.dumps(data).encode('utf-8'),
+                                  use_cache=False).json()
+        except HttpError as e:
+            if e.status != 409:
+                print(error_message(e), file=sys.stderr)
+                sys.exit(1)
+            conflict = (version, e, patched, title)
+            print(f"Version conflict saving version {version + 1}, re-applying the patch to the latest version...",
+                  file=sys.stderr)
+            continue
+        except TransportError as e:
+            print(f"URL Error: {e.reason}", file=sys.stderr)
+            sys.exit(1)
+
+        return {
+            'status': 'updated',
+            **result,
+            'version': updated['version']['number'],
+            'previous_version': version,
+            '_links': {'webui': updated.get('_links', {}).get('webui')}
+        }
+
+    print(f"Error: Page {page_id} kept changing; gave up after {args.retries + 1} attempts", file=sys.stderr)
     sys.exit(1)
 
-instance = sys.argv[1]
-page_id = sys.argv[2]
-json_file = sys.argv[3]
 
-if json_file == '-':
-    update_data = json.load(sys.stdin)
-else:
-    with open(json_file, 'r') as f:
-        update_data = json.load(f)
+def main():
+    parser = argparse.ArgumentParser(
+        description='Update a page with full page JSON, or patch its storage format in place with --patch',
+        epilog=EXAMPLE,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('instance', help='Instance name (e.g., DEVERSIN)')
+    parser.add_argument('page_id', help='Page ID')
+    parser.add_argument('json_file', nargs='?', help="File containing update data or '-' for stdin")
+    parser.add_argument('--patch', metavar='FILE', help="Patch file or '-' for stdin (fetches the current version itself)")
+    parser.add_argument('--message', help='Version comment (--patch)')
+    parser.add_argument('--minor-edit', action='store_true', help='Do not notify watchers (--patch)')
+    parser.add_argument('--dry-run', action='store_true', help='Show the storage diff without saving (--patch)')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help=f'Re-apply the patch this many times on version conflicts (default: {DEFAULT_RETRIES})')
+
+    args = parser.parse_args()
+
+    if bool(args.json_file) == bool(args.patch):
+        parser.error("give either a JSON file or --patch")
+
+    api = ConfluenceAPI(args.instance)
+
+    if args.patch:
+        result = patch_page(api, args.page_id, load_json(args.patch), args)
+    else:
+        result = api.put(f'content/{args.page_id}', data=load_json(args.json_file))
 
-api = ConfluenceAPI(instance)
+    print(json.dumps(result, indent=2))
 
-result = api.put(f'content/{page_id}', data=update_data)
 
-print(json.dumps(result, indent=2))
+if __name__ == '__main__':
+    main()
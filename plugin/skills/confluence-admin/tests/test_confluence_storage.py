@@ -0,0 +1,145 @@
+import os
+import sys
+import json
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from confluence_storage import StorageTree, select, apply_patch, PatchError
+from confluence_update_page import patch_page
+from http_client import HttpError
+
+CODE_MACRO = ('<ac:structured-macro ac:name="code"><ac:plain-text-body><![CDATA[if a < b:\n    print("<p>x</p>")\n'
+              'done]]></ac:plain-text-body></ac:structured-macro>')
+
+
+class MultiLineCdataTest(unittest.TestCase):
+    def setUp(self):
+        self.storage = f'<h1>Intro</h1>\n{CODE_MACRO}\n<h2>Install</h2>\n<p>old</p>\n<h2>Usage</h2>\n<p>use</p>'
+
+    def test_xpath_after_code_macro(self):
+        patched = apply_patch(self.storage, [{'xpath': "//p[.='old']", 'replace': '<p>NEW</p>'}])
+        self.assertEqual(patched, self.storage.replace('<p>old</p>', '<p>NEW</p>'))
+
+    def test_element_right_after_code_macro(self):
+        storage = ('<ac:structured-macro ac:name="code"><ac:plain-text-body><![CDATA[l1\nl2\nl3]]></ac:plain-text-body>'
+                   '</ac:structured-macro>\n<h2>T</h2>\n<p>q</p>')
+        patched = apply_patch(storage, [{'xpath': '//p', 'replace': '<p>NEW</p>'}])
+        self.assertEqual(patched, storage.replace('<p>q</p>', '<p>NEW</p>'))
+
+    def test_section_after_code_macro(self):
+        patched = apply_patch(self.storage, [{'section': 'Install', 'replace': '<p>NEW</p>\n'}])
+        self.assertEqual(patched, self.storage.replace('\n<p>old</p>\n', '<p>NEW</p>\n'))
+        self.assertIn(CODE_MACRO, patched)
+
+    def test_tags_inside_cdata_are_not_elements(self):
+        with self.assertRaises(PatchError):
+            apply_patch(self.storage, [{'xpath': "//p[.='x']", 'delete': True}])
+
+
+class SelectTest(unittest.TestCase):
+    def setUp(self):
+        self.tree = StorageTree('<p class="a">one</p><p class="b">two words</p>'
+                                '<table><tbody><tr><td>1</td></tr><tr><td>2</td></tr></tbody></table>'
+                                '<ac:structured-macro ac:name="info"><ac:rich-text-body><p>hint</p>'
+                                '</ac:rich-text-body></ac:structured-macro>')
+
+    def texts(self, xpath):
+        return [node.text(self.tree.source) for node in select(self.tree, xpath)]
+
+    def test_attribute_predicates(self):
+        self.assertEqual(self.texts('/p[@class]'), ['one', 'two words'])
+        self.assertEqual(self.texts("/p[@class='b']"), ['two words'])
+        self.assertEqual(self.texts("//ac:structured-macro[@ac:name=\"info\"]//p"), ['hint'])
+
+    def test_text_predicates(self):
+        self.assertEqual(self.texts("//p[.='one']"), ['one'])
+        self.assertEqual(self.texts("//p[text()='two words']"), ['two words'])
+        self.assertEqual(self.texts("//p[contains(., 'word')]"), ['two words'])
+        self.assertEqual(self.texts("//p[contains(@class, 'a')]"), ['one'])
+
+    def test_positional_predicates_count_per_parent(self):
+        self.assertEqual(self.texts('//tr[2]/td'), ['2'])
+        self.assertEqual(self.texts('//tr[last()]'), ['2'])
+        self.assertEqual(self.texts('//p[1]'), ['one', 'hint'])
+        self.assertEqual(self.texts('//p[9]'), [])
+
+    def test_unsupported_predicate(self):
+        with self.assertRaises(PatchError):
+            select(self.tree, '//p[position() > 1]')
+
+
+class SectionTest(unittest.TestCase):
+    storage = '<h2>A</h2><p>a</p><h3>Sub</h3><p>s</p><h2>B</h2><p>b</p><h1>Top</h1><p>t</p>'
+
+    def test_section_includes_lower_headings_and_stops_at_same_level(self):
+        patched = apply_patch(self.storage, [{'section': 'A', 'replace': '<p>x</p>'}])
+        self.assertEqual(patched, '<h2>A</h2><p>x</p><h2>B</h2><p>b</p><h1>Top</h1><p>t</p>')
+
+    def test_section_stops_at_higher_level(self):
+        patched = apply_patch(self.storage, [{'section': 'Sub', 'delete': True},
+                                             {'section': 'B', 'append': '<p>more</p>'}])
+        self.assertEqual(patched, '<h2>A</h2><p>a</p><h2>B</h2><p>b</p><p>more</p><h1>Top</h1><p>t</p>')
+
+    def test_last_section_runs_to_the_end(self):
+        patched = apply_patch(self.storage, [{'section': 'top', 'level': 1, 'prepend': '<p>0</p>'}])
+        self.assertEqual(patched, self.storage.replace('<h1>Top</h1>', '<h1>Top</h1><p>0</p>'))
+
+
+class MatchErrorsTest(unittest.TestCase):
+    def test_several_matches_need_all(self):
+        storage = '<p>a</p><p>b</p>'
+        with self.assertRaisesRegex(PatchError, 'matches 2 places'):
+            apply_patch(storage, [{'xpath': '//p', 'delete': True}])
+        self.assertEqual(apply_patch(storage, [{'xpath': '//p', 'delete': True, 'all': True}]), '')
+
+    def test_overlapping_matches(self):
+        with self.assertRaisesRegex(PatchError, 'overlap'):
+            apply_patch('<div><div>x</div></div>', [{'xpath': '//div', 'replace': '', 'all': True}])
+
+    def test_no_match(self):
+        with self.assertRaisesRegex(PatchError, 'No match'):
+            apply_patch('<p>a</p>', [{'section': 'Missing', 'delete': True}])
+
+
+class FakeAPI:
+    def __init__(self, storage, put_already_applied=False):
+        self.page = {'id': '1', 'type': 'page', 'title': 'T', 'version': {'number': 5},
+                     'body': {'storage': {'value': storage}}}
+        self.put_already_applied = put_already_applied
+        self.puts = []
+
+    def get(self, endpoint, params=None):
+        return json.loads(json.dumps(self.page))
+
+    def request(self, method, path, body=None, use_cache=True):
+        data = json.loads(body)
+        self.puts.append(data)
+        self.page['version']['number'] = data['version']['number']
+        self.page['body']['storage']['value'] = data['body']['storage']['value']
+        if self.put_already_applied:
+            # The write went through, but the (retried) request came back as a conflict
+            raise HttpError(409, 'Conflict', path, {}, b'{"message": "Version must be incremented"}')
+        return SimpleNamespace(json=lambda: {'version': {'number': data['version']['number']}, '_links': {}})
+
+
+class PatchPageTest(unittest.TestCase):
+    args = SimpleNamespace(retries=3, dry_run=False, minor_edit=False, message=None)
+
+    def test_unchanged_does_not_put(self):
+        api = FakeAPI('<p>a</p>')
+        result = patch_page(api, '1', [{'xpath': '//p', 'replace': '<p>a</p>'}], self.args)
+        self.assertEqual(result['status'], 'unchanged')
+        self.assertEqual(api.puts, [])
+
+    def test_conflict_after_applied_put_is_not_patched_twice(self):
+        api = FakeAPI('<p>a</p>', put_already_applied=True)
+        result = patch_page(api, '1', [{'xpath': '//p', 'append': '!'}], self.args)
+        self.assertEqual(result['status'], 'updated')
+        self.assertEqual(result['version'], 6)
+        self.assertEqual(len(api.puts), 1)
+        self.assertEqual(api.page['body']['storage']['value'], '<p>a!</p>')
+
+
+if __name__ == '__main__':
+    unittest.main()
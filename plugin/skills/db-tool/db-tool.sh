@@ -23,6 +23,21 @@ case "$command" in
     schema)
         python3 "$SCRIPTS_DIR/schema.py" "$@"
         ;;
+    fanout)
+        python3 "$SCRIPTS_DIR/fanout.py" "$@"
+        ;;
+    export)
+        python3 "$SCRIPTS_DIR/export.py" "$@"
+        ;;
+    load)
+        python3 "$SCRIPTS_DIR/load.py" "$@"
+        ;;
+    explain)
+        python3 "$SCRIPTS_DIR/explain.py" "$@"
+        ;;
+    daemon)
+        python3 "$SCRIPTS_DIR/db_daemon.py" "$@"
+        ;;
     --help|-h|help)
         echo "Database Tool - Manage database connections with SSH tunnel support"
         echo ""
@@ -33,15 +48,28 @@ case "$command" in
         echo "  connect <env>     - Test connection to database environment"
         echo "  query <env> <sql> - Execute SQL query (use '-' to read from stdin)"
         echo "  schema <env> [table] - Show database schema (tables or specific table)"
+        echo "  schema <env> --all   - Dump every table with columns, indexes, keys and row estimates"
+        echo "  fanout <sql> <env>... [--match GLOB] - Run SQL on several environments in parallel"
+        echo "  export <env> <sql> <file> - Export query to CSV, Arrow IPC or Parquet (batched)"
+        echo "  load <env> <table> <file> - Bulk load CSV/NDJSON (COPY on PostgreSQL, batched inserts on MySQL)"
+        echo "  explain <env> <sql> [--diff] - EXPLAIN ANALYZE profile: plan tree, timings, misestimates, seq scans"
+        echo "  daemon <start|stop|restart|status> [env] - Manage persistent tunnel/connection pool"
         echo "  --help, -h, help  - Show this help message"
         echo ""
         echo "Examples:"
         echo "  db-tool.sh discover"
         echo "  db-tool.sh connect ALTA_DEV"
         echo "  db-tool.sh query ALTA_DEV 'SELECT * FROM users LIMIT 10'"
+        echo "  db-tool.sh query ALTA_DEV 'SELECT * FROM events' --timeout 30 --max-rows 1000"
         echo "  echo 'SELECT * FROM users' | db-tool.sh query ALTA_DEV -"
         echo "  db-tool.sh schema ALTA_DEV"
         echo "  db-tool.sh schema ALTA_DEV users"
+        echo "  db-tool.sh schema ALTA_DEV --all"
+        echo "  db-tool.sh fanout 'SELECT COUNT(*) FROM users' ALTA_DEV ALTA_STAGE ALTA_PROD"
+        echo "  db-tool.sh export ALTA_DEV 'SELECT * FROM orders' orders.parquet"
+        echo "  db-tool.sh load ALTA_DEV users users.csv --truncate"
+        echo "  db-tool.sh explain ALTA_DEV 'SELECT * FROM orders WHERE user_id = 42' --diff"
+        echo "  db-tool.sh daemon start ALTA_DEV"
         echo ""
         echo "Environment variable format (in ~/.secrets):"
         echo "  DB_<PROJECT>_<ENV>='{\"type\":\"postgres\",\"host\":\"...\",\"port\":5432,\"user\":\"...\",\"password\":\"...\",\"database\":\"...\",\"ssh\":{\"host\":\"...\",\"user\":\"...\",\"key\":\"~/.ssh/id_rsa\"}}'"
@@ -49,7 +77,7 @@ case "$command" in
         ;;
     *)
         echo "Unknown command: $command" >&2
-        echo "Available commands: discover, connect, query, schema" >&2
+        echo "Available commands: discover, connect, query, schema, fanout, export, load, explain, daemon" >&2
         echo "Use --help for more information" >&2
         exit 1
         ;;
@@ -44,6 +44,7 @@ def main():
                 'database': config.database,
                 'user': config.user,
                 'ssh_tunnel': config.has_ssh_tunnel,
+                'daemon': db.via_daemon,
                 'version': version
             }
 
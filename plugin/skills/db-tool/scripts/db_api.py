@@ -3,10 +3,24 @@
 import os
 import sys
 import json
+import signal
+import hashlib
+import threading
 from typing import Dict, Any, Optional, Tuple
 from contextlib import contextmanager
 from sshtunnel import SSHTunnelForwarder
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '_lib'))
+from cache_dir import tool_cache_dir
+
+
+STREAM_CURSOR_NAME = 'db_tool_stream'
+CANCEL_GRACE = 2
+
+
+class QueryCancelled(Exception):
+    pass
+
 
 class DatabaseConfig:
     def __init__(self, env_name: str):
@@ -71,15 +85,46 @@ class DatabaseConfig:
     def ssh_config(self) -> Optional[Dict[str, Any]]:
         return self.config.get('ssh')
 
+    @property
+    def fingerprint(self) -> str:
+        return hashlib.sha256(json.dumps(self.config, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def get_cache_dir(*parts: str) -> str:
+    return tool_cache_dir('db-tool', *parts)
+
 
 class DatabaseConnection:
-    def __init__(self, config: DatabaseConfig):
+    def __init__(self, config: DatabaseConfig, use_daemon: bool = True,
+                 statement_timeout: Optional[float] = None, local_infile: bool = False):
         self.config = config
         self.tunnel = None
         self.connection = None
+        self.endpoint: Optional[Tuple[str, int]] = None
+        self.use_daemon = use_daemon and not os.getenv('DB_TOOL_NO_DAEMON')
+        self.via_daemon = False
+        self.statement_timeout = statement_timeout
+        self.local_infile = local_infile
+        self.cancelled = False
 
     @contextmanager
     def connect(self):
+        if self.use_daemon:
+            from db_daemon import connect_daemon
+
+            pooled = connect_daemon(self.config)
+            if pooled is not None:
+                self.via_daemon = True
+                self.connection = pooled
+                try:
+                    if self.statement_timeout:
+                        pooled.set_statement_timeout(self.statement_timeout)
+                    yield pooled
+                finally:
+                    pooled.close()
+                    self.connection = None
+                return
+
         try:
             if self.config.has_ssh_tunnel:
                 local_bind = self._setup_ssh_tunnel()
@@ -88,7 +133,10 @@ class DatabaseConnection:
                 host = self.config.host
                 port = self.config.port
 
+            self.endpoint = (host, port)
             self.connection = self._create_connection(host, port)
+            if self.statement_timeout:
+                self._apply_statement_timeout(self.connection, self.statement_timeout)
             yield self.connection
 
         finally:
@@ -153,6 +201,9 @@ class DatabaseConnection:
                 'database': self.config.database
             }
 
+            if self.local_infile:
+                conn_params['allow_local_infile'] = True
+
             return mysql.connector.connect(**conn_params)
 
         else:
@@ -160,6 +211,93 @@ class DatabaseConnection:
             print(f"Supported types: postgres, mysql", file=sys.stderr)
             sys.exit(1)
 
+    def _apply_statement_timeout(self, conn, seconds: float):
+        milliseconds = int(seconds * 1000)
+        cursor = conn.cursor()
+
+        try:
+            if self.config.db_type == 'postgres':
+                cursor.execute("SET statement_timeout = %s", (milliseconds,))
+                conn.commit()
+            elif self.config.db_type == 'mysql':
+                cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {milliseconds}")
+        finally:
+            cursor.close()
+
+    def _cancel_connection(self, conn, host: str, port: int):
+        if self.config.db_type == 'mysql':
+            killer = self._create_connection(host, port)
+            try:
+                cursor = killer.cursor()
+                cursor.execute(f"KILL QUERY {int(conn.connection_id)}")
+                cursor.close()
+            finally:
+                killer.close()
+        else:
+            conn.cancel()
+
+    def cancel(self):
+        if self.connection is not None:
+            self.cancelled = True
+            self.interrupt()
+
+    def interrupt(self):
+        conn = self.connection
+        if conn is None:
+            return
+
+        try:
+            if self.via_daemon:
+                conn.cancel()
+            else:
+                self._cancel_connection(conn, *self.endpoint)
+        except Exception as e:
+            print(f"Warning: Could not cancel query: {e}", file=sys.stderr)
+
+    @contextmanager
+    def cancel_guard(self):
+        # SIGINT is blocked before any helper thread starts: new threads inherit the mask, and only
+        # the watcher may receive it
+        watcher = None
+        active = threading.Event()
+        if threading.current_thread() is threading.main_thread() and hasattr(signal, 'pthread_sigmask'):
+            active.set()
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGINT})
+            watcher = threading.Thread(target=self._watch_sigint, args=(active,), daemon=True)
+            watcher.start()
+
+        timer = None
+        if self.statement_timeout:
+            timer = threading.Timer(self.statement_timeout + CANCEL_GRACE, self.cancel)
+            timer.daemon = True
+            timer.start()
+
+        try:
+            yield
+        finally:
+            if timer:
+                timer.cancel()
+            if watcher:
+                active.clear()
+                signal.pthread_kill(watcher.ident, signal.SIGINT)
+                watcher.join()
+                signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGINT})
+
+        if self.cancelled:
+            raise QueryCancelled("Query cancelled")
+
+    def _watch_sigint(self, active: threading.Event):
+        signal.sigwait({signal.SIGINT})
+        if not active.is_set():
+            return
+
+        print("Cancelling query (press Ctrl-C again to abort)...", file=sys.stderr)
+        self.cancel()
+
+        signal.sigwait({signal.SIGINT})
+        if active.is_set():
+            os._exit(130)
+
     def _cleanup(self):
         if self.connection:
             try:
@@ -174,6 +312,27 @@ class DatabaseConnection:
                 pass
 
 
+def fetch_limited(cursor, max_rows: Optional[int]) -> Tuple[list, bool]:
+    if max_rows is None:
+        return cursor.fetchall(), False
+
+    rows = cursor.fetchmany(max_rows + 1)
+    return rows[:max_rows], len(rows) > max_rows
+
+
+def stream_cursor(conn, db_type: str):
+    if hasattr(conn, 'stream_cursor'):
+        return conn.stream_cursor()
+
+    if db_type == 'postgres':
+        return conn.cursor(name=STREAM_CURSOR_NAME)
+
+    if db_type == 'mysql':
+        return conn.cursor(buffered=False)
+
+    return conn.cursor()
+
+
 def execute_query(env_name: str, query: str, fetch: bool = True) -> Any:
     config = DatabaseConfig(env_name)
     db = DatabaseConnection(config)
@@ -0,0 +1,675 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import uuid
+import base64
+import socket
+import signal
+import decimal
+import datetime
+import argparse
+import threading
+import subprocess
+import socketserver
+from typing import Dict, Any, Optional, List, Tuple
+from db_api import DatabaseConfig, DatabaseConnection, get_cache_dir, stream_cursor
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_SHUTDOWN_AFTER = 1800
+DEFAULT_ACQUIRE_TIMEOUT = 10
+CLIENT_CONNECT_TIMEOUT = 2
+REAPER_INTERVAL = 5
+
+
+class DaemonError(Exception):
+    pass
+
+
+def socket_path(env_name: str) -> str:
+    return os.path.join(get_cache_dir('daemon'), f"{env_name}.sock")
+
+
+def log_path(env_name: str) -> str:
+    return os.path.join(get_cache_dir('daemon'), f"{env_name}.log")
+
+
+def encode_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, decimal.Decimal):
+        return {'$t': 'decimal', 'v': str(value)}
+    if isinstance(value, datetime.datetime):
+        return {'$t': 'datetime', 'v': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'$t': 'date', 'v': value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {'$t': 'time', 'v': value.isoformat()}
+    if isinstance(value, datetime.timedelta):
+        return {'$t': 'timedelta', 'v': value.total_seconds()}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {'$t': 'bytes', 'v': base64.b64encode(bytes(value)).decode('ascii')}
+    if isinstance(value, uuid.UUID):
+        return {'$t': 'uuid', 'v': str(value)}
+    if isinstance(value, tuple):
+        return {'$t': 'tuple', 'v': [encode_value(v) for v in value]}
+    if isinstance(value, list):
+        return [encode_value(v) for v in value]
+    if isinstance(value, dict):
+        return {'$t': 'dict', 'v': {str(k): encode_value(v) for k, v in value.items()}}
+    return str(value)
+
+
+def decode_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return [decode_value(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+
+    kind = value.get('$t')
+    raw = value.get('v')
+
+    if kind == 'decimal':
+        return decimal.Decimal(raw)
+    if kind == 'datetime':
+        return datetime.datetime.fromisoformat(raw)
+    if kind == 'date':
+        return datetime.date.fromisoformat(raw)
+    if kind == 'time':
+        return datetime.time.fromisoformat(raw)
+    if kind == 'timedelta':
+        return datetime.timedelta(seconds=raw)
+    if kind == 'bytes':
+        return base64.b64decode(raw)
+    if kind == 'uuid':
+        return uuid.UUID(raw)
+    if kind == 'tuple':
+        return tuple(decode_value(v) for v in raw)
+    if kind == 'dict':
+        return {k: decode_value(v) for k, v in raw.items()}
+    return value
+
+
+def _describe(cursor) -> Optional[List[List[Any]]]:
+    if not cursor.description:
+        return None
+    return [[encode_value(item) for item in column] for column in cursor.description]
+
+
+def _is_alive(conn) -> bool:
+    try:
+        if hasattr(conn, 'is_connected'):
+            return conn.is_connected()
+        return not conn.closed
+    except Exception:
+        return False
+
+
+class ConnectionPool:
+    def __init__(self, config: DatabaseConfig, pool_size: int, idle_timeout: int):
+        self.config = config
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.factory = DatabaseConnection(config, use_daemon=False)
+        self.idle: List[Tuple[Any, float]] = []
+        self.in_use = 0
+        self.lock = threading.Condition()
+
+    def _endpoint(self) -> Tuple[str, int]:
+        if not self.config.has_ssh_tunnel:
+            return self.config.host, self.config.port
+
+        tunnel = self.factory.tunnel
+        if tunnel is None:
+            return self.factory._setup_ssh_tunnel()
+
+        if not tunnel.is_active:
+            print(f"SSH tunnel for DB_{self.config.env_name} is down, restarting...", file=sys.stderr)
+            tunnel.restart()
+
+        return '127.0.0.1', tunnel.local_bind_port
+
+    def acquire(self, timeout: float):
+        deadline = time.monotonic() + timeout
+
+        with self.lock:
+            while True:
+                while self.idle:
+                    conn, _ = self.idle.pop()
+                    if _is_alive(conn):
+                        self.in_use += 1
+                        return conn
+                    self._close(conn)
+
+                if self.in_use < self.pool_size:
+                    self.in_use += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DaemonError(f"Connection pool exhausted ({self.pool_size} in use)")
+                self.lock.wait(remaining)
+
+            try:
+                host, port = self._endpoint()
+                return self.factory._create_connection(host, port)
+            except BaseException:
+                self.in_use -= 1
+                self.lock.notify()
+                raise
+
+    def release(self, conn, reset_timeout: bool = False):
+        try:
+            conn.rollback()
+            if reset_timeout:
+                self.factory._apply_statement_timeout(conn, 0)
+            healthy = _is_alive(conn)
+        except Exception:
+            healthy = False
+
+        with self.lock:
+            self.in_use -= 1
+            if healthy:
+                self.idle.append((conn, time.monotonic()))
+            else:
+                self._close(conn)
+            self.lock.notify()
+
+    def cancel(self, conn):
+        with self.lock:
+            host, port = self._endpoint()
+        self.factory._cancel_connection(conn, host, port)
+
+    def reap(self):
+        cutoff = time.monotonic() - self.idle_timeout
+
+        with self.lock:
+            keep = []
+            for conn, last_used in self.idle:
+                if last_used < cutoff:
+                    self._close(conn)
+                else:
+                    keep.append((conn, last_used))
+            self.idle = keep
+
+    def close(self):
+        with self.lock:
+            for conn, _ in self.idle:
+                self._close(conn)
+            self.idle = []
+
+        if self.factory.tunnel:
+            try:
+                self.factory.tunnel.stop()
+            except Exception:
+                pass
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            tunnel = self.factory.tunnel
+            return {
+                'pool_size': self.pool_size,
+                'idle_connections': len(self.idle),
+                'active_connections': self.in_use,
+                'ssh_tunnel': bool(self.config.has_ssh_tunnel),
+                'tunnel_active': bool(tunnel and tunnel.is_active)
+            }
+
+
+class SessionHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        conn = None
+        session_id = None
+        reset_timeout = False
+        cursors: Dict[int, Any] = {}
+
+        try:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+
+                request = json.loads(line)
+                op = request.get('op')
+
+                try:
+                    if op == 'ping':
+                        response = server.status()
+                    elif op == 'shutdown':
+                        threading.Thread(target=server.shutdown, daemon=True).start()
+                        response = {'stopping': True}
+                    elif op == 'cancel':
+                        target = server.sessions.get(request.get('session'))
+                        if target is None:
+                            raise DaemonError("Unknown session")
+                        server.pool.cancel(target)
+                        response = {}
+                    elif op == 'open':
+                        if conn is None:
+                            conn = server.pool.acquire(request.get('timeout', server.acquire_timeout))
+                            session_id = uuid.uuid4().hex
+                            server.sessions[session_id] = conn
+                            server.touch()
+                        response = {'session': session_id}
+                    elif conn is None:
+                        raise DaemonError("Session not opened")
+                    elif op == 'set_timeout':
+                        server.pool.factory._apply_statement_timeout(conn, request['seconds'])
+                        reset_timeout = True
+                        response = {}
+                    elif op == 'execute':
+                        cursor = cursors.get(request['cursor'])
+                        if cursor is None:
+                            if request.get('stream'):
+                                cursor = stream_cursor(conn, server.config.db_type)
+                            else:
+                                cursor = conn.cursor()
+                            cursors[request['cursor']] = cursor
+
+                        params = decode_value(request.get('params'))
+                        if params is None:
+                            cursor.execute(request['sql'])
+                        else:
+                            cursor.execute(request['sql'], params)
+
+                        response = {
+                            'description': _describe(cursor),
+                            'rowcount': cursor.rowcount,
+                            'lastrowid': getattr(cursor, 'lastrowid', None)
+                        }
+                    elif op == 'fetch':
+                        cursor = cursors[request['cursor']]
+                        size = request.get('size')
+                        rows = cursor.fetchall() if size is None else cursor.fetchmany(size)
+                        response = {
+                            'description': _describe(cursor),
+                            'rows': [[encode_value(v) for v in row] for row in rows]
+                        }
+                    elif op == 'close_cursor':
+                        cursor = cursors.pop(request['cursor'], None)
+                        if cursor is not None:
+                            cursor.close()
+                        response = {}
+                    elif op == 'commit':
+                        conn.commit()
+                        response = {}
+                    elif op == 'rollback':
+                        conn.rollback()
+                        response = {}
+                    else:
+                        raise DaemonError(f"Unknown operation '{op}'")
+
+                    self._send({'ok': True, **response})
+
+                except Exception as e:
+                    self._send({'ok': False, 'error': str(e), 'error_type': type(e).__name__})
+
+        except (ConnectionError, OSError):
+            pass
+
+        finally:
+            for cursor in cursors.values():
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+            if session_id is not None:
+                server.sessions.pop(session_id, None)
+
+            if conn is not None:
+                server.pool.release(conn, reset_timeout)
+                server.touch()
+
+    def _send(self, message: Dict[str, Any]):
+        self.wfile.write(json.dumps(message, default=str).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, config: DatabaseConfig, path: str, pool_size: int,
+                 idle_timeout: int, shutdown_after: int, acquire_timeout: int):
+        self.config = config
+        self.path = path
+        self.pool = ConnectionPool(config, pool_size, idle_timeout)
+        self.shutdown_after = shutdown_after
+        self.acquire_timeout = acquire_timeout
+        self.started_at = time.time()
+        self.sessions: Dict[str, Any] = {}
+        self.last_activity = time.monotonic()
+
+        old_umask = os.umask(0o077)
+        try:
+            super().__init__(path, SessionHandler)
+        finally:
+            os.umask(old_umask)
+
+    def touch(self):
+        self.last_activity = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'env': self.config.env_name,
+            'pid': os.getpid(),
+            'socket': self.path,
+            'fingerprint': self.config.fingerprint,
+            'uptime': round(time.time() - self.started_at, 1),
+            'idle_timeout': self.pool.idle_timeout,
+            'shutdown_after': self.shutdown_after,
+            **self.pool.status()
+        }
+
+    def reaper(self):
+        while True:
+            time.sleep(REAPER_INTERVAL)
+            self.pool.reap()
+
+            if self.shutdown_after and self.pool.in_use == 0:
+                if time.monotonic() - self.last_activity > self.shutdown_after:
+                    print(f"Idle for {self.shutdown_after}s, shutting down", file=sys.stderr)
+                    self.shutdown()
+                    return
+
+
+class DaemonCursor:
+    def __init__(self, connection: 'DaemonConnection', cursor_id: int, stream: bool = False):
+        self.connection = connection
+        self.cursor_id = cursor_id
+        self.stream = stream
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+        self.arraysize = 1
+
+    def execute(self, sql: str, params: Any = None):
+        response = self.connection._call({
+            'op': 'execute',
+            'cursor': self.cursor_id,
+            'sql': sql,
+            'params': encode_value(params),
+            'stream': self.stream
+        })
+
+        self._set_description(response['description'])
+        self.rowcount = response['rowcount']
+        self.lastrowid = response.get('lastrowid')
+
+    def _set_description(self, description: Optional[List[List[Any]]]):
+        if description:
+            self.description = [tuple(decode_value(item) for item in column) for column in description]
+        else:
+            self.description = None
+
+    def _fetch(self, size: Optional[int]) -> List[Tuple]:
+        response = self.connection._call({'op': 'fetch', 'cursor': self.cursor_id, 'size': size})
+        self._set_description(response['description'])
+        return [tuple(decode_value(v) for v in row) for row in response['rows']]
+
+    def fetchone(self) -> Optional[Tuple]:
+        rows = self._fetch(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size: Optional[int] = None) -> List[Tuple]:
+        return self._fetch(size or self.arraysize)
+
+    def fetchall(self) -> List[Tuple]:
+        return self._fetch(None)
+
+    def close(self):
+        if self.connection.sock is not None:
+            self.connection._call({'op': 'close_cursor', 'cursor': self.cursor_id})
+
+
+class DaemonConnection:
+    def __init__(self, sock: socket.socket, env_name: Optional[str] = None):
+        self.sock = sock
+        self.env_name = env_name
+        self.stream = sock.makefile('rwb')
+        self.next_cursor = 0
+        self.session_id = None
+
+    def _call(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        if self.sock is None:
+            raise DaemonError("Daemon connection is closed")
+
+        self.stream.write(json.dumps(message).encode('utf-8') + b'\n')
+        self.stream.flush()
+
+        line = self.stream.readline()
+        if not line:
+            raise DaemonError("Daemon closed the connection")
+
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', 'Unknown daemon error'))
+        return response
+
+    def cursor(self) -> DaemonCursor:
+        self.next_cursor += 1
+        return DaemonCursor(self, self.next_cursor)
+
+    def stream_cursor(self) -> DaemonCursor:
+        self.next_cursor += 1
+        return DaemonCursor(self, self.next_cursor, stream=True)
+
+    def set_statement_timeout(self, seconds: float):
+        self._call({'op': 'set_timeout', 'seconds': seconds})
+
+    def cancel(self):
+        if self.session_id is None:
+            return
+        if _request(self.env_name, {'op': 'cancel', 'session': self.session_id}) is None:
+            raise DaemonError("Daemon did not accept the cancel request")
+
+    def commit(self):
+        self._call({'op': 'commit'})
+
+    def rollback(self):
+        self._call({'op': 'rollback'})
+
+    def close(self):
+        if self.sock is None:
+            return
+        try:
+            self.stream.close()
+            self.sock.close()
+        except OSError:
+            pass
+        self.sock = None
+
+
+def _open_socket(env_name: str, timeout: Optional[float]) -> Optional[socket.socket]:
+    path = socket_path(env_name)
+    if not os.path.exists(path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _request(env_name: str, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    sock = _open_socket(env_name, CLIENT_CONNECT_TIMEOUT)
+    if sock is None:
+        return None
+
+    conn = DaemonConnection(sock)
+    try:
+        response = conn._call(message)
+        response.pop('ok', None)
+        return response
+    except (DaemonError, OSError, ValueError):
+        return None
+    finally:
+        conn.close()
+
+
+def connect_daemon(config: DatabaseConfig) -> Optional[DaemonConnection]:
+    sock = _open_socket(config.env_name, CLIENT_CONNECT_TIMEOUT)
+    if sock is None:
+        return None
+
+    conn = DaemonConnection(sock, config.env_name)
+    try:
+        status = conn._call({'op': 'ping'})
+        if status.get('fingerprint') != config.fingerprint:
+            print(f"Warning: db-tool daemon for {config.env_name} uses a stale config, "
+                  f"restart it with 'db-tool.sh daemon restart {config.env_name}'", file=sys.stderr)
+            conn.close()
+            return None
+
+        sock.settimeout(None)
+        conn.session_id = conn._call({'op': 'open'})['session']
+    except (DaemonError, OSError, ValueError) as e:
+        print(f"Warning: db-tool daemon unavailable ({e}), using direct connection", file=sys.stderr)
+        conn.close()
+        return None
+
+    return conn
+
+
+def serve(args):
+    config = DatabaseConfig(args.env)
+    path = socket_path(args.env)
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    server = DaemonServer(config, path, args.pool_size, args.idle_timeout,
+                          args.shutdown_after, args.acquire_timeout)
+
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    threading.Thread(target=server.reaper, daemon=True).start()
+
+    print(f"db-tool daemon for DB_{args.env} listening on {path}", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        server.pool.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def start(args) -> Dict[str, Any]:
+    DatabaseConfig(args.env)
+
+    status = _request(args.env, {'op': 'ping'})
+    if status is not None:
+        return {'status': 'success', 'message': 'Daemon already running', **status}
+
+    command = [
+        sys.executable, os.path.abspath(__file__), 'serve', args.env,
+        '--pool-size', str(args.pool_size),
+        '--idle-timeout', str(args.idle_timeout),
+        '--shutdown-after', str(args.shutdown_after),
+        '--acquire-timeout', str(args.acquire_timeout)
+    ]
+
+    with open(log_path(args.env), 'ab') as log:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                                   start_new_session=True)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise DaemonError(f"Daemon exited with code {process.returncode}, see {log_path(args.env)}")
+
+        status = _request(args.env, {'op': 'ping'})
+        if status is not None:
+            return {'status': 'success', 'message': 'Daemon started', **status}
+        time.sleep(0.1)
+
+    raise DaemonError(f"Daemon did not start within 30s, see {log_path(args.env)}")
+
+
+def stop(args) -> Dict[str, Any]:
+    if _request(args.env, {'op': 'shutdown'}) is None:
+        path = socket_path(args.env)
+        if os.path.exists(path):
+            os.remove(path)
+        return {'status': 'success', 'env': args.env, 'message': 'Daemon not running'}
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline and os.path.exists(socket_path(args.env)):
+        time.sleep(0.1)
+
+    return {'status': 'success', 'env': args.env, 'message': 'Daemon stopped'}
+
+
+def show_status(args) -> Any:
+    if args.env:
+        envs = [args.env]
+    else:
+        envs = sorted(name[:-len('.sock')] for name in os.listdir(get_cache_dir('daemon')) if name.endswith('.sock'))
+
+    result = []
+    for env in envs:
+        info = _request(env, {'op': 'ping'})
+        result.append({'env': env, 'running': info is not None, **(info or {})})
+
+    return result[0] if args.env else result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage persistent connection pool daemons")
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    for action in ('start', 'restart', 'serve'):
+        sub = subparsers.add_parser(action)
+        sub.add_argument("env", help="Environment name (e.g., ALTA_DEV)")
+        sub.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE,
+                         help=f"Max open connections (default: {DEFAULT_POOL_SIZE})")
+        sub.add_argument("--idle-timeout", type=int, default=DEFAULT_IDLE_TIMEOUT,
+                         help=f"Close pooled connections idle for N seconds (default: {DEFAULT_IDLE_TIMEOUT})")
+        sub.add_argument("--shutdown-after", type=int, default=DEFAULT_SHUTDOWN_AFTER,
+                         help=f"Stop daemon after N idle seconds, 0 = never (default: {DEFAULT_SHUTDOWN_AFTER})")
+        sub.add_argument("--acquire-timeout", type=int, default=DEFAULT_ACQUIRE_TIMEOUT,
+                         help=f"Seconds to wait for a free connection (default: {DEFAULT_ACQUIRE_TIMEOUT})")
+
+    subparsers.add_parser('stop').add_argument("env", help="Environment name (e.g., ALTA_DEV)")
+    subparsers.add_parser('status').add_argument("env", nargs='?', help="Environment name (default: all)")
+
+    args = parser.parse_args()
+
+    if args.action == 'serve':
+        serve(args)
+        return
+
+    try:
+        if args.action == 'start':
+            result = start(args)
+        elif args.action == 'restart':
+            stop(args)
+            result = start(args)
+        elif args.action == 'stop':
+            result = stop(args)
+        else:
+            result = show_status(args)
+
+        print(json.dumps(result, indent=2))
+
+    except Exception as e:
+        print(json.dumps({'status': 'error', 'env': args.env, 'error': str(e)}, indent=2), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
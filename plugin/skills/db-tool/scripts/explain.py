@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+
+import re
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from collections import Counter
+from typing import List, Dict, Any, Optional
+from db_api import DatabaseConfig, DatabaseConnection, get_cache_dir
+
+DEFAULT_LARGE_TABLE_ROWS = 10000
+DEFAULT_MISESTIMATE_FACTOR = 10
+DIFF_MIN_CHANGE_MS = 1.0
+
+MYSQL_TREE_LINE = re.compile(
+    r'^(?P<indent>\s*)-> (?P<desc>.*?)'
+    r'(?:\s+\(cost=(?P<cost>[\d.e+]+)(?:\.\.(?P<cost_total>[\d.e+]+))? rows=(?P<rows>[\d.e+]+)\))?'
+    r'(?:\s+\(actual time=(?P<first>[\d.e+]+)\.\.(?P<last>[\d.e+]+) rows=(?P<actual>[\d.e+]+) loops=(?P<loops>\d+)\))?'
+    r'(?:\s+\(never executed\))?\s*$'
+)
+
+MYSQL_SCAN_NODES = ('Table scan', 'Full scan')
+
+
+def sql_digest(sql: str) -> str:
+    normalized = ' '.join(sql.split()).rstrip(';')
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def estimate_ratio(actual: Optional[float], estimated: Optional[float]) -> Optional[float]:
+    if actual is None or estimated is None:
+        return None
+    return float(f"{max(actual, 1) / max(estimated, 1):.3g}")
+
+
+def finish_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    children = node['children']
+
+    if node.get('total_ms') is not None:
+        child_ms = sum(child.get('total_ms') or 0 for child in children)
+        node['self_ms'] = round(max(node['total_ms'] - child_ms, 0), 3)
+
+    node['estimate_ratio'] = estimate_ratio(node.get('actual_rows'), node.get('estimated_rows'))
+
+    finished = {key: value for key, value in node.items() if value is not None and key != 'children'}
+    finished['children'] = children
+    return finished
+
+
+def normalize_postgres(plan: Dict[str, Any]) -> Dict[str, Any]:
+    loops = plan.get('Actual Loops')
+    total = plan.get('Actual Total Time')
+
+    node = {
+        'node': plan['Node Type'],
+        'relation': plan.get('Relation Name'),
+        'alias': plan.get('Alias') if plan.get('Alias') != plan.get('Relation Name') else None,
+        'index': plan.get('Index Name'),
+        'join_type': plan.get('Join Type'),
+        'condition': plan.get('Index Cond') or plan.get('Hash Cond') or plan.get('Merge Cond') or plan.get('Join Filter'),
+        'filter': plan.get('Filter'),
+        'cost': plan.get('Total Cost'),
+        'estimated_rows': plan.get('Plan Rows'),
+        'actual_rows': plan.get('Actual Rows'),
+        'loops': loops,
+        'rows_removed': plan.get('Rows Removed by Filter'),
+        'startup_ms': plan.get('Actual Startup Time'),
+        'total_ms': round(total * (loops or 1), 3) if total is not None else None,
+        'buffers': {
+            'hit': plan.get('Shared Hit Blocks', 0),
+            'read': plan.get('Shared Read Blocks', 0)
+        } if 'Shared Hit Blocks' in plan else None,
+        'children': [normalize_postgres(child) for child in plan.get('Plans', [])]
+    }
+
+    return finish_node(node)
+
+
+def parse_mysql_tree(text: str) -> Dict[str, Any]:
+    root = {'children': []}
+    stack = [(-1, root)]
+
+    for line in text.splitlines():
+        match = MYSQL_TREE_LINE.match(line)
+        if not match:
+            continue
+
+        desc = match.group('desc')
+        loops = int(match.group('loops')) if match.group('loops') else None
+        last = float(match.group('last')) if match.group('last') else None
+
+        node_type = re.split(r' on |: | using ', desc, maxsplit=1)[0]
+        relation = re.search(r' on (\S+)', desc)
+        index = re.search(r' using (\S+)', desc)
+
+        node = {
+            'node': node_type,
+            'relation': relation.group(1) if relation else None,
+            'index': index.group(1) if index else None,
+            'detail': desc if desc != node_type else None,
+            'cost': float(match.group('cost_total') or match.group('cost')) if match.group('cost') else None,
+            'estimated_rows': float(match.group('rows')) if match.group('rows') else None,
+            'actual_rows': float(match.group('actual')) if match.group('actual') else None,
+            'loops': loops,
+            'startup_ms': float(match.group('first')) if match.group('first') else None,
+            'total_ms': round(last * (loops or 1), 3) if last is not None else None,
+            'children': []
+        }
+
+        depth = len(match.group('indent')) // 4
+        while stack[-1][0] >= depth:
+            stack.pop()
+        stack[-1][1]['children'].append(node)
+        stack.append((depth, node))
+
+    def finish(node):
+        node['children'] = [finish(child) for child in node['children']]
+        return finish_node(node)
+
+    if not root['children']:
+        raise ValueError("Could not parse EXPLAIN output")
+
+    return finish(root['children'][0])
+
+
+def explain_postgres(cursor, sql: str, analyze: bool) -> Dict[str, Any]:
+    options = 'ANALYZE, BUFFERS, FORMAT JSON' if analyze else 'FORMAT JSON'
+    cursor.execute(f"EXPLAIN ({options}) {sql}")
+
+    document = cursor.fetchone()[0]
+    if isinstance(document, str):
+        document = json.loads(document)
+    document = document[0]
+
+    return {
+        'planning_ms': document.get('Planning Time'),
+        'execution_ms': document.get('Execution Time'),
+        'plan': normalize_postgres(document['Plan'])
+    }
+
+
+def explain_mysql(cursor, sql: str, analyze: bool) -> Dict[str, Any]:
+    cursor.execute(f"EXPLAIN ANALYZE {sql}" if analyze else f"EXPLAIN FORMAT=TREE {sql}")
+    text = '\n'.join(str(row[0]) for row in cursor.fetchall())
+    plan = parse_mysql_tree(text)
+
+    return {
+        'planning_ms': None,
+        'execution_ms': plan.get('total_ms'),
+        'plan': plan
+    }
+
+
+def walk(node: Dict[str, Any], path: str = ''):
+    signature = node['node'] + (f"({node['relation']})" if node.get('relation') else '')
+    path = f"{path} > {signature}" if path else signature
+    yield path, node
+    for child in node['children']:
+        yield from walk(child, path)
+
+
+def postgres_table_rows(cursor, relations: List[str]) -> Dict[str, float]:
+    if not relations:
+        return {}
+    cursor.execute(
+        "SELECT relname, max(reltuples) FROM pg_catalog.pg_class WHERE relname = ANY(%s) GROUP BY relname",
+        (relations,)
+    )
+    return {name: float(rows) for name, rows in cursor.fetchall() if rows is not None and rows >= 0}
+
+
+def find_warnings(plan: Dict[str, Any], table_rows: Dict[str, float],
+                  large_table: int, factor: float) -> List[Dict[str, Any]]:
+    warnings = []
+
+    for path, node in walk(plan):
+        relation = node.get('relation')
+
+        if node['node'] == 'Seq Scan' or node['node'] in MYSQL_SCAN_NODES:
+            rows = table_rows.get(relation)
+            if rows is None:
+                scanned = node.get('actual_rows', node.get('estimated_rows')) or 0
+                rows = (scanned + node.get('rows_removed', 0)) * (node.get('loops') or 1)
+            if rows >= large_table:
+                warnings.append({
+                    'type': 'seq_scan',
+                    'node': path,
+                    'relation': relation,
+                    'table_rows': int(rows)
+                })
+
+        ratio = node.get('estimate_ratio')
+        if ratio is not None and 'actual_rows' in node and (ratio >= factor or ratio <= 1 / factor):
+            warnings.append({
+                'type': 'misestimate',
+                'node': path,
+                'estimated_rows': node.get('estimated_rows'),
+                'actual_rows': node['actual_rows'],
+                'ratio': ratio
+            })
+
+    return warnings
+
+
+def diff_plans(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    before_nodes = {path: node for path, node in walk(before['plan'])}
+    after_nodes = {path: node for path, node in walk(after['plan'])}
+    before_shape = Counter(path for path, _ in walk(before['plan']))
+    after_shape = Counter(path for path, _ in walk(after['plan']))
+
+    changed = []
+    for path in after_nodes:
+        if path not in before_nodes:
+            continue
+        old_ms = before_nodes[path].get('total_ms')
+        new_ms = after_nodes[path].get('total_ms')
+        if old_ms is not None and new_ms is not None and abs(new_ms - old_ms) >= DIFF_MIN_CHANGE_MS:
+            changed.append({'node': path, 'before_ms': old_ms, 'after_ms': new_ms})
+
+    changed.sort(key=lambda item: abs(item['after_ms'] - item['before_ms']), reverse=True)
+
+    old_total, new_total = before.get('execution_ms'), after.get('execution_ms')
+
+    return {
+        'plan_changed': before_shape != after_shape,
+        'added': sorted((after_shape - before_shape).elements()),
+        'removed': sorted((before_shape - after_shape).elements()),
+        'execution_ms': {
+            'before': old_total,
+            'after': new_total,
+            'change_pct': round((new_total - old_total) / old_total * 100, 1) if old_total and new_total is not None else None
+        },
+        'nodes': changed
+    }
+
+
+class PlanStore:
+    def __init__(self, env: str):
+        self.env = env
+        self.db = sqlite3.connect(os.path.join(get_cache_dir(), 'plans.sqlite'), timeout=5)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS plans (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                env TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                sql TEXT NOT NULL,
+                analyzed INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                execution_ms REAL,
+                payload TEXT NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS plans_lookup ON plans (env, digest, id)")
+
+    def save(self, sql: str, analyze: bool, result: Dict[str, Any]) -> int:
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO plans (env, digest, sql, analyzed, created_at, execution_ms, payload) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.env, sql_digest(sql), sql, int(analyze), time.time(), result.get('execution_ms'), json.dumps(result))
+            )
+        return cursor.lastrowid
+
+    def load(self, sql: str, plan_id: Optional[int] = None, before_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        if plan_id is not None:
+            row = self.db.execute(
+                "SELECT id, created_at, payload FROM plans WHERE env = ? AND id = ?",
+                (self.env, plan_id)
+            ).fetchone()
+        else:
+            row = self.db.execute(
+                "SELECT id, created_at, payload FROM plans WHERE env = ? AND digest = ? AND id < ? ORDER BY id DESC LIMIT 1",
+                (self.env, sql_digest(sql), before_id if before_id is not None else sys.maxsize)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {'id': row[0], 'created_at': row[1], **json.loads(row[2])}
+
+    def history(self, sql: str) -> List[Dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT id, created_at, analyzed, execution_ms FROM plans WHERE env = ? AND digest = ? ORDER BY id",
+            (self.env, sql_digest(sql))
+        ).fetchall()
+
+        return [{
+            'id': row[0],
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(row[1])),
+            'analyze': bool(row[2]),
+            'execution_ms': row[3]
+        } for row in rows]
+
+    def close(self):
+        self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture and profile a query plan")
+    parser.add_argument("env", help="Environment name (e.g., ALTA_DEV)")
+    parser.add_argument("sql", help="SQL statement to explain (or - for stdin)")
+    parser.add_argument("--no-analyze", action='store_true',
+                        help="Plan only, do not execute the statement (no timings or actual rows)")
+    parser.add_argument("--diff", nargs='?', const='previous', metavar='PLAN_ID',
+                        help="Compare with a stored plan (default: previous run of the same SQL)")
+    parser.add_argument("--history", action='store_true',
+                        help="List stored plans for this SQL instead of running EXPLAIN")
+    parser.add_argument("--no-save", action='store_true',
+                        help="Do not store the plan locally")
+    parser.add_argument("--large-table", type=int, default=DEFAULT_LARGE_TABLE_ROWS,
+                        help=f"Flag sequential scans on tables with at least N rows (default: {DEFAULT_LARGE_TABLE_ROWS})")
+    parser.add_argument("--misestimate", type=float, default=DEFAULT_MISESTIMATE_FACTOR,
+                        help=f"Flag nodes whose row estimate is off by this factor (default: {DEFAULT_MISESTIMATE_FACTOR})")
+    parser.add_argument("--timeout", type=float,
+                        help="Statement timeout in seconds (server-side, plus client-side cancel)")
+
+    args = parser.parse_args()
+
+    sql = sys.stdin.read().strip() if args.sql == '-' else args.sql
+    sql = sql.strip().rstrip(';') if sql else sql
+    if not sql:
+        print("Error: No SQL query provided", file=sys.stderr)
+        sys.exit(1)
+
+    if args.diff not in (None, 'previous') and not args.diff.isdigit():
+        print("Error: --diff expects a plan id", file=sys.stderr)
+        sys.exit(1)
+
+    config = DatabaseConfig(args.env)
+    store = PlanStore(args.env)
+
+    try:
+        if args.history:
+            print(json.dumps({'status': 'success', 'env': args.env, 'plans': store.history(sql)}, indent=2))
+            return
+
+        if config.db_type not in ('postgres', 'mysql'):
+            raise ValueError(f"EXPLAIN is not supported for '{config.db_type}'")
+
+        analyze = not args.no_analyze
+        db = DatabaseConnection(config, statement_timeout=args.timeout)
+
+        with db.connect() as conn, db.cancel_guard():
+            cursor = conn.cursor()
+
+            try:
+                if config.db_type == 'postgres':
+                    result = explain_postgres(cursor, sql, analyze)
+                    scans = {node['relation'] for _, node in walk(result['plan'])
+                             if node['node'] == 'Seq Scan' and node.get('relation')}
+                    table_rows = postgres_table_rows(cursor, sorted(scans))
+                else:
+                    result = explain_mysql(cursor, sql, analyze)
+                    table_rows = {}
+            finally:
+                cursor.close()
+                conn.rollback()
+
+        result['warnings'] = find_warnings(result['plan'], table_rows, args.large_table, args.misestimate)
+
+        output = {
+            'status': 'success',
+            'env': args.env,
+            'db_type': config.db_type,
+            'analyze': analyze,
+            **result
+        }
+
+        if not args.no_save:
+            output['plan_id'] = store.save(sql, analyze, result)
+
+        if args.diff:
+            plan_id = int(args.diff) if args.diff != 'previous' else None
+            previous = store.load(sql, plan_id, before_id=output.get('plan_id'))
+            if previous is None:
+                output['diff'] = None
+                print("No stored plan to compare against", file=sys.stderr)
+            else:
+                output['diff'] = {'previous_id': previous['id'], **diff_plans(previous, result)}
+
+        print(json.dumps(output, indent=2, default=str))
+
+    except Exception as e:
+        output = {
+            'status': 'error',
+            'error': str(e),
+            'sql': sql
+        }
+        print(json.dumps(output, indent=2), file=sys.stderr)
+        sys.exit(1)
+
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import csv
+import json
+import time
+import decimal
+import argparse
+from typing import List, Dict, Any, Optional
+from db_api import DatabaseConfig, DatabaseConnection, stream_cursor
+
+DEFAULT_BATCH_SIZE = 10000
+
+FORMAT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.arrow': 'arrow',
+    '.ipc': 'arrow',
+    '.feather': 'arrow',
+    '.parquet': 'parquet'
+}
+
+POSTGRES_TYPES = {
+    16: 'bool',
+    20: 'int', 21: 'int', 23: 'int', 26: 'int',
+    700: 'float', 701: 'float',
+    1700: 'decimal',
+    1082: 'date',
+    1083: 'time',
+    1114: 'timestamp',
+    1184: 'timestamptz',
+    1186: 'interval',
+    17: 'binary',
+    114: 'json', 3802: 'json'
+}
+
+MYSQL_TYPES = {
+    1: 'int', 2: 'int', 3: 'int', 8: 'int', 9: 'int', 13: 'int',
+    4: 'float', 5: 'float',
+    0: 'decimal', 246: 'decimal',
+    10: 'date', 14: 'date',
+    11: 'interval',
+    7: 'timestamp', 12: 'timestamp',
+    249: 'blob', 250: 'blob', 251: 'blob', 252: 'blob',
+    16: 'binary',
+    245: 'json'
+}
+
+MYSQL_BINARY_FLAG = 128
+
+
+def column_kind(db_type: str, column) -> str:
+    type_code = column[1]
+
+    if db_type == 'postgres':
+        return POSTGRES_TYPES.get(type_code, 'string')
+
+    if db_type == 'mysql':
+        kind = MYSQL_TYPES.get(type_code, 'string')
+        if kind == 'blob':
+            flags = column[7] if len(column) > 7 and column[7] else 0
+            return 'binary' if flags & MYSQL_BINARY_FLAG else 'string'
+        return kind
+
+    return 'string'
+
+
+def to_text(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).decode('utf-8', errors='replace')
+    return str(value)
+
+
+def to_csv_value(value: Any) -> Any:
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float, str, decimal.Decimal)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return '\\x' + bytes(value).hex()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return to_text(value)
+
+
+class CsvWriter:
+    def __init__(self, path: str, columns: List[Dict[str, Any]]):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([column['name'] for column in columns])
+
+    def write(self, rows: List[tuple]):
+        self.writer.writerows([to_csv_value(v) for v in row] for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ArrowWriter:
+    def __init__(self, path: str, columns: List[Dict[str, Any]], compression: Optional[str], parquet: bool):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            print("Error: pyarrow not installed", file=sys.stderr)
+            print("Install: pip3 install pyarrow", file=sys.stderr)
+            sys.exit(1)
+
+        self.pa = pa
+        self.columns = columns
+        self.types = [self._arrow_type(column) for column in columns]
+        self.schema = pa.schema([pa.field(c['name'], t) for c, t in zip(columns, self.types)])
+
+        if parquet:
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema, compression=compression or 'none')
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=compression)
+            self.writer = pa.ipc.new_file(path, self.schema, options=options)
+
+    def _arrow_type(self, column: Dict[str, Any]):
+        pa = self.pa
+        kind = column['type']
+
+        if kind == 'bool':
+            return pa.bool_()
+        if kind == 'int':
+            return pa.int64()
+        if kind == 'float':
+            return pa.float64()
+        if kind == 'decimal':
+            precision, scale = column.get('precision'), column.get('scale')
+            if precision and scale is not None and 0 < precision <= 38:
+                return pa.decimal128(precision, scale)
+            column['type'] = 'string'
+            return pa.string()
+        if kind == 'date':
+            return pa.date32()
+        if kind == 'time':
+            return pa.time64('us')
+        if kind == 'timestamp':
+            return pa.timestamp('us')
+        if kind == 'timestamptz':
+            return pa.timestamp('us', tz='UTC')
+        if kind == 'interval':
+            return pa.duration('us')
+        if kind == 'binary':
+            return pa.binary()
+        return pa.string()
+
+    def write(self, rows: List[tuple]):
+        pa = self.pa
+        arrays = []
+
+        for index, (column, arrow_type) in enumerate(zip(self.columns, self.types)):
+            values = [row[index] for row in rows]
+
+            if column['type'] in ('string', 'json'):
+                values = [None if v is None else (v if isinstance(v, str) else to_text(v)) for v in values]
+            elif column['type'] == 'binary':
+                values = [None if v is None else bytes(v) for v in values]
+
+            arrays.append(pa.array(values, type=arrow_type))
+
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def open_writer(fmt: str, path: str, columns: List[Dict[str, Any]], compression: Optional[str]):
+    if fmt == 'csv':
+        return CsvWriter(path, columns)
+    return ArrowWriter(path, columns, compression, parquet=(fmt == 'parquet'))
+
+
+def describe_columns(db_type: str, description) -> List[Dict[str, Any]]:
+    columns = []
+    for column in description:
+        columns.append({
+            'name': column[0],
+            'type': column_kind(db_type, column),
+            'precision': column[4] if len(column) > 4 else None,
+            'scale': column[5] if len(column) > 5 else None
+        })
+    return columns
+
+
+def export_query(conn, config: DatabaseConfig, sql: str, path: str, fmt: str,
+                 batch_size: int, compression: Optional[str]) -> Dict[str, Any]:
+    cursor = stream_cursor(conn, config.db_type)
+    writer = None
+    row_count = 0
+
+    try:
+        cursor.execute(sql)
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+
+            if writer is None:
+                if not cursor.description:
+                    raise ValueError("Query did not return rows")
+                columns = describe_columns(config.db_type, cursor.description)
+                writer = open_writer(fmt, path, columns, compression)
+
+            if not rows:
+                break
+
+            writer.write(rows)
+            row_count += len(rows)
+
+    finally:
+        if writer is not None:
+            writer.close()
+        cursor.close()
+
+    return {
+        'rows': row_count,
+        'columns': [{'name': c['name'], 'type': c['type']} for c in columns]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export query results to CSV, Arrow IPC or Parquet")
+    parser.add_argument("env", help="Environment name (e.g., ALTA_DEV)")
+    parser.add_argument("sql", help="SQL query to export (or - for stdin)")
+    parser.add_argument("output", help="Output file path (.csv, .arrow, .parquet)")
+    parser.add_argument("--format", choices=['csv', 'arrow', 'parquet'],
+                        help="Output format (default: inferred from file extension)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Rows fetched and written per batch (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--compression",
+                        help="Compression codec: parquet default zstd, arrow default none (lz4, zstd)")
+    parser.add_argument("--timeout", type=float,
+                        help="Statement timeout in seconds (server-side, plus client-side cancel)")
+
+    args = parser.parse_args()
+
+    sql = sys.stdin.read().strip() if args.sql == '-' else args.sql
+    if not sql:
+        print("Error: No SQL query provided", file=sys.stderr)
+        sys.exit(1)
+
+    fmt = args.format or FORMAT_EXTENSIONS.get(os.path.splitext(args.output)[1].lower())
+    if not fmt:
+        print(f"Error: Cannot infer format from '{args.output}', use --format", file=sys.stderr)
+        sys.exit(1)
+
+    compression = args.compression
+    if compression is None and fmt == 'parquet':
+        compression = 'zstd'
+    if compression == 'none':
+        compression = None
+
+    try:
+        config = DatabaseConfig(args.env)
+        db = DatabaseConnection(config, statement_timeout=args.timeout)
+
+        started = time.monotonic()
+        with db.connect() as conn, db.cancel_guard():
+            result = export_query(conn, config, sql, args.output, fmt, args.batch_size, compression)
+        elapsed = time.monotonic() - started
+
+        output = {
+            'status': 'success',
+            'env': args.env,
+            'format': fmt,
+            'path': os.path.abspath(args.output),
+            'row_count': result['rows'],
+            'bytes': os.path.getsize(args.output),
+            'seconds': round(elapsed, 3),
+            'columns': result['columns']
+        }
+        print(json.dumps(output, indent=2))
+
+    except Exception as e:
+        output = {
+            'status': 'error',
+            'error': str(e),
+            'sql': sql
+        }
+        print(json.dumps(output, indent=2), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
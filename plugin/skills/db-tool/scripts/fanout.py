@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+import queue
+import fnmatch
+import argparse
+import threading
+from typing import List, Dict, Any, Callable
+from db_api import DatabaseConfig, DatabaseConnection
+from discover import discover_databases
+from query import to_json_value
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 60
+
+
+def run_env(env: str, sql: str, timeout: float,
+            register: Callable[[DatabaseConnection], None]) -> Dict[str, Any]:
+    started = time.monotonic()
+
+    try:
+        config = DatabaseConfig(env)
+    except SystemExit:
+        return {'env': env, 'status': 'error', 'error': f"Invalid or missing DB_{env} configuration"}
+
+    db = DatabaseConnection(config, statement_timeout=timeout)
+    register(db)
+
+    with db.connect() as conn:
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(sql)
+
+            if cursor.description:
+                columns = [desc[0] for desc in cursor.description]
+                rows = [[to_json_value(v) for v in row] for row in cursor.fetchall()]
+                result = {'columns': columns, 'rows': rows, 'row_count': len(rows)}
+            else:
+                conn.commit()
+                result = {'affected_rows': cursor.rowcount}
+
+        finally:
+            cursor.close()
+
+    return {
+        'env': env,
+        'status': 'success',
+        'elapsed': round(time.monotonic() - started, 3),
+        **result
+    }
+
+
+def fanout(envs: List[str], sql: str, concurrency: int, timeout: float) -> List[Dict[str, Any]]:
+    pending: queue.Queue = queue.Queue()
+    for env in envs:
+        pending.put(env)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    started: Dict[str, float] = {}
+    connections: Dict[str, DatabaseConnection] = {}
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            try:
+                env = pending.get_nowait()
+            except queue.Empty:
+                return
+
+            with lock:
+                started[env] = time.monotonic()
+
+            def register(db, env=env):
+                with lock:
+                    connections[env] = db
+
+            try:
+                result = run_env(env, sql, timeout, register)
+            except BaseException as e:
+                result = {'env': env, 'status': 'error', 'error': str(e) or type(e).__name__}
+
+            with lock:
+                results.setdefault(env, result)
+
+    workers = min(concurrency, len(envs))
+    for _ in range(workers):
+        threading.Thread(target=worker, daemon=True).start()
+
+    # A worker stuck past its env's timeout (tunnel connect, pool acquire) keeps its slot, so queued envs
+    # could wait forever; everything still open when each wave has used up its timeout is given up on
+    deadline = time.monotonic() + timeout * -(-len(envs) // workers)
+
+    while True:
+        expired = []
+        with lock:
+            now = time.monotonic()
+            for env, start in started.items():
+                if env not in results and now - start > timeout:
+                    results[env] = {'env': env, 'status': 'timeout', 'error': f"No result after {timeout}s"}
+                    expired.append(env)
+
+            if now > deadline:
+                while True:
+                    try:
+                        env = pending.get_nowait()
+                    except queue.Empty:
+                        break
+                    results[env] = {'env': env, 'status': 'timeout', 'error': "Not started: no free worker"}
+                for env in envs:
+                    if env not in results:
+                        results[env] = {'env': env, 'status': 'timeout', 'error': f"No result after {timeout}s"}
+                        expired.append(env)
+
+            cancel = [connections[env] for env in expired if env in connections]
+            done = len(results) == len(envs)
+
+        # Stop the statement on the server; cancelling can block on the network, so it gets its own thread
+        for db in cancel:
+            threading.Thread(target=db.cancel, daemon=True).start()
+
+        if done:
+            break
+
+        time.sleep(0.05)
+
+    return [results[env] for env in envs]
+
+
+def merge_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    columns: List[str] = []
+    rows = []
+    summary = []
+
+    for result in results:
+        for column in result.get('columns', []):
+            if column not in columns:
+                columns.append(column)
+
+        for row in result.get('rows', []):
+            rows.append({'env': result['env'], **dict(zip(result['columns'], row))})
+
+        summary.append({key: value for key, value in result.items() if key not in ('columns', 'rows')})
+
+    return {
+        'columns': ['env'] + columns,
+        'rows': rows,
+        'row_count': len(rows),
+        'envs': summary
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one SQL statement against several environments in parallel")
+    parser.add_argument("sql", help="SQL query to execute (or - for stdin)")
+    parser.add_argument("envs", nargs='*', help="Environment names (e.g., ALTA_DEV ALTA_STAGE)")
+    parser.add_argument("--match", help="Glob over discovered environments (e.g., 'ALTA_*')")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Max environments queried at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Per-environment timeout in seconds (default: {DEFAULT_TIMEOUT})")
+
+    args = parser.parse_args()
+
+    sql = sys.stdin.read().strip() if args.sql == '-' else args.sql
+    if not sql:
+        print("Error: No SQL query provided", file=sys.stderr)
+        sys.exit(1)
+
+    envs = list(args.envs)
+    if args.match:
+        for db in discover_databases():
+            if fnmatch.fnmatch(db['env'], args.match) and db['env'] not in envs:
+                envs.append(db['env'])
+
+    if not envs:
+        print("Error: No environments given (pass names or --match)", file=sys.stderr)
+        sys.exit(1)
+
+    if args.concurrency < 1:
+        print("Error: --concurrency must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.monotonic()
+    results = fanout(envs, sql, args.concurrency, args.timeout)
+    failed = [r['env'] for r in results if r['status'] != 'success']
+
+    output = {
+        'status': 'success' if not failed else ('error' if len(failed) == len(results) else 'partial'),
+        'sql': sql,
+        'elapsed': round(time.monotonic() - started, 3),
+        **merge_results(results)
+    }
+
+    print(json.dumps(output, indent=2, default=str))
+    sys.stdout.flush()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from typing import List, Any, Iterator, Tuple
+from db_api import DatabaseConfig, DatabaseConnection
+
+DEFAULT_BATCH_SIZE = 10000
+COPY_BUFFER_SIZE = 1 << 20
+
+FORMAT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson'
+}
+
+
+def quote_identifier(db_type: str, name: str) -> str:
+    quote = '`' if db_type == 'mysql' else '"'
+    return '.'.join(quote + part.replace(quote, quote * 2) + quote for part in name.split('.'))
+
+
+def to_load_value(value: Any, db_type: str) -> Any:
+    if isinstance(value, bool):
+        # COPY parses true/false; MySQL BOOLEAN is TINYINT(1) and rejects the strings in strict mode
+        return ('true' if value else 'false') if db_type == 'postgres' else int(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def csv_header(path: str) -> List[str]:
+    with open(path, newline='', encoding='utf-8') as file:
+        header = next(csv.reader(file), None)
+
+    if not header:
+        raise ValueError(f"{path} is empty (a header row is required)")
+
+    return header
+
+
+def read_csv(path: str) -> Tuple[List[str], Iterator[List[Any]]]:
+    file = open(path, newline='', encoding='utf-8')
+    reader = csv.reader(file)
+
+    try:
+        columns = next(reader)
+    except StopIteration:
+        file.close()
+        raise ValueError(f"{path} is empty (a header row is required)")
+
+    def rows():
+        with file:
+            for row in reader:
+                yield [value if value != '' else None for value in row]
+
+    return columns, rows()
+
+
+def read_ndjson(path: str, db_type: str) -> Tuple[List[str], Iterator[List[Any]]]:
+    # Columns are the union of all keys in first-seen order, so keys that only appear in later records
+    # are not dropped; this costs a first pass over the file
+    keys = {}
+    with open(path, encoding='utf-8') as file:
+        for line_no, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}:{line_no}: expected a JSON object")
+            keys.update(dict.fromkeys(record))
+
+    if not keys:
+        raise ValueError(f"{path} has no JSON object rows")
+
+    columns = list(keys)
+
+    def rows():
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield [to_load_value(record.get(c), db_type) for c in columns]
+
+    return columns, rows()
+
+
+def to_copy_field(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class CsvStream(io.RawIOBase):
+    def __init__(self, rows: Iterator[List[Any]]):
+        self.rows = rows
+        self.pending = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.pending) < size:
+            lines = []
+            for row in self.rows:
+                lines.append(','.join(map(to_copy_field, row)) + '\n')
+                if len(lines) >= 1000:
+                    break
+
+            if not lines:
+                break
+
+            self.pending += ''.join(lines).encode('utf-8')
+
+        if size < 0:
+            size = len(self.pending)
+
+        chunk, self.pending = self.pending[:size], self.pending[size:]
+        return chunk
+
+
+def copy_postgres(cursor, table: str, path: str, fmt: str) -> int:
+    if fmt == 'csv':
+        columns = csv_header(path)
+        source = open(path, 'rb')
+        header = 'true'
+    else:
+        columns, rows = read_ndjson(path, 'postgres')
+        source = CsvStream(rows)
+        header = 'false'
+
+    column_list = ', '.join(quote_identifier('postgres', c) for c in columns)
+    sql = f"COPY {quote_identifier('postgres', table)} ({column_list}) FROM STDIN WITH (FORMAT csv, HEADER {header})"
+
+    with source:
+        cursor.copy_expert(sql, source, size=COPY_BUFFER_SIZE)
+
+    return cursor.rowcount
+
+
+def load_data_infile(cursor, table: str, path: str) -> int:
+    columns = csv_header(path)
+
+    with open(path, 'rb') as file:
+        first_line = file.readline()
+    terminator = '\\r\\n' if first_line.endswith(b'\r\n') else '\\n'
+
+    variables = [f"@c{i}" for i in range(len(columns))]
+    assignments = ', '.join(
+        f"{quote_identifier('mysql', c)} = NULLIF({v}, '')" for c, v in zip(columns, variables)
+    )
+
+    cursor.execute(
+        f"LOAD DATA LOCAL INFILE %s INTO TABLE {quote_identifier('mysql', table)} "
+        f"CHARACTER SET utf8mb4 "
+        f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+        f"LINES TERMINATED BY '{terminator}' IGNORE 1 LINES "
+        f"({', '.join(variables)}) SET {assignments}",
+        (os.path.abspath(path),)
+    )
+
+    return cursor.rowcount
+
+
+def insert_batches(cursor, db_type: str, table: str, columns: List[str],
+                   rows: Iterator[List[Any]], batch_size: int) -> int:
+    column_list = ', '.join(quote_identifier(db_type, c) for c in columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    sql = f"INSERT INTO {quote_identifier(db_type, table)} ({column_list}) VALUES ({placeholders})"
+
+    row_count = 0
+    batch = []
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            cursor.executemany(sql, batch)
+            row_count += len(batch)
+            batch = []
+
+    if batch:
+        cursor.executemany(sql, batch)
+        row_count += len(batch)
+
+    return row_count
+
+
+def load_file(conn, config: DatabaseConfig, table: str, path: str, fmt: str,
+              method: str, batch_size: int, truncate: bool) -> int:
+    cursor = conn.cursor()
+
+    try:
+        if truncate:
+            if config.db_type == 'postgres':
+                cursor.execute(f"TRUNCATE {quote_identifier('postgres', table)}")
+            else:
+                cursor.execute(f"DELETE FROM {quote_identifier(config.db_type, table)}")
+
+        if method == 'copy':
+            row_count = copy_postgres(cursor, table, path, fmt)
+        elif method == 'infile':
+            row_count = load_data_infile(cursor, table, path)
+        else:
+            columns, rows = read_csv(path) if fmt == 'csv' else read_ndjson(path, config.db_type)
+            row_count = insert_batches(cursor, config.db_type, table, columns, rows, batch_size)
+
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+
+    return row_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load a CSV or NDJSON file into a table")
+    parser.add_argument("env", help="Environment name (e.g., ALTA_DEV)")
+    parser.add_argument("table", help="Target table (optionally schema-qualified)")
+    parser.add_argument("file", help="Input file (.csv with header row, or .ndjson/.jsonl)")
+    parser.add_argument("--format", choices=['csv', 'ndjson'],
+                        help="Input format (default: inferred from file extension)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Rows per executemany batch on MySQL (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--local-infile", action='store_true',
+                        help="MySQL: use LOAD DATA LOCAL INFILE for CSV (server must allow local_infile)")
+    parser.add_argument("--truncate", action='store_true',
+                        help="Empty the table first, in the same transaction")
+
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.file):
+        print(f"Error: File not found: {args.file}", file=sys.stderr)
+        sys.exit(1)
+
+    fmt = args.format or FORMAT_EXTENSIONS.get(os.path.splitext(args.file)[1].lower())
+    if not fmt:
+        print(f"Error: Cannot infer format from '{args.file}', use --format", file=sys.stderr)
+        sys.exit(1)
+
+    if args.batch_size < 1:
+        print("Error: --batch-size must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    config = DatabaseConfig(args.env)
+
+    if config.db_type == 'postgres':
+        method = 'copy'
+    elif args.local_infile:
+        if fmt != 'csv':
+            print("Error: --local-infile only supports CSV input", file=sys.stderr)
+            sys.exit(1)
+        method = 'infile'
+    else:
+        method = 'executemany'
+
+    try:
+        db = DatabaseConnection(config, use_daemon=False, local_infile=(method == 'infile'))
+
+        started = time.monotonic()
+        with db.connect() as conn:
+            row_count = load_file(conn, config, args.table, args.file, fmt, method,
+                                  args.batch_size, args.truncate)
+        elapsed = time.monotonic() - started
+
+        output = {
+            'status': 'success',
+            'env': args.env,
+            'table': args.table,
+            'format': fmt,
+            'method': method,
+            'row_count': row_count,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(row_count / elapsed) if elapsed > 0 else None
+        }
+        print(json.dumps(output, indent=2))
+
+    except Exception as e:
+        output = {
+            'status': 'error',
+            'error': str(e),
+            'env': args.env,
+            'table': args.table
+        }
+        print(json.dumps(output, indent=2), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
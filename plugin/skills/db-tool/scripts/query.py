@@ -1,15 +1,124 @@
 #!/usr/bin/env python3
 
+import re
 import sys
 import json
 import argparse
-from db_api import DatabaseConfig, DatabaseConnection
+from typing import Optional
+from db_api import DatabaseConfig, DatabaseConnection, stream_cursor, fetch_limited
+from schema_cache import invalidate_schema_cache, is_ddl
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Statements a Postgres server-side cursor can DECLARE; anything else runs on a plain cursor
+ROW_QUERY = re.compile(r'^(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/|\()*(?:select|with|values|table)\b', re.I | re.S)
+
+
+def to_json_value(value):
+    if value is None or isinstance(value, (int, float, bool)):
+        return value
+    return str(value)
+
+
+def close_cursor(cursor, db: DatabaseConnection, truncated: bool):
+    if not truncated:
+        cursor.close()
+        return
+
+    if db.config.db_type == 'mysql':
+        db.interrupt()
+    try:
+        cursor.close()
+    except Exception:
+        pass
+
+
+def fetch_rows(db: DatabaseConnection, conn, config: DatabaseConfig, sql: str, max_rows: int):
+    # Server-side cursor so only max_rows + 1 rows cross the wire; the rest is cancelled on close
+    cursor = stream_cursor(conn, config.db_type)
+    truncated = False
+
+    try:
+        cursor.execute(sql)
+        rows = cursor.fetchmany(max_rows + 1)
+        columns = [desc[0] for desc in cursor.description]
+        truncated = len(rows) > max_rows
+        return columns, rows[:max_rows], truncated
+    finally:
+        close_cursor(cursor, db, truncated)
+
+
+def rows_output(columns, rows, truncated: bool):
+    output = {
+        'status': 'success',
+        'columns': columns,
+        'rows': [{col: to_json_value(row[i]) for i, col in enumerate(columns)} for row in rows],
+        'row_count': len(rows)
+    }
+    if truncated:
+        output['truncated'] = True
+    return output
+
+
+def stream_results(db: DatabaseConnection, conn, config: DatabaseConfig, sql: str,
+                   batch_size: int, max_rows: Optional[int]):
+    cursor = stream_cursor(conn, config.db_type)
+    out = sys.stdout
+    row_count = 0
+    truncated = False
+
+    try:
+        cursor.execute(sql)
+        columns = None
+
+        while not truncated:
+            size = batch_size if max_rows is None else min(batch_size, max_rows - row_count + 1)
+            rows = cursor.fetchmany(size)
+
+            if columns is None and cursor.description:
+                columns = [desc[0] for desc in cursor.description]
+
+            if not rows:
+                break
+
+            if max_rows is not None and row_count + len(rows) > max_rows:
+                rows = rows[:max_rows - row_count]
+                truncated = True
+
+            for row in rows:
+                out.write(json.dumps(dict(zip(columns, map(to_json_value, row))), separators=(',', ':')))
+                out.write('\n')
+
+            out.flush()
+            row_count += len(rows)
+
+        if columns is None:
+            conn.commit()
+            if is_ddl(sql):
+                invalidate_schema_cache(config)
+            out.write(json.dumps({'status': 'success', 'affected_rows': cursor.rowcount}, separators=(',', ':')))
+            out.write('\n')
+        elif truncated:
+            print(f"Stopped after {row_count} rows (--max-rows)", file=sys.stderr)
+        else:
+            print(f"Streamed {row_count} rows", file=sys.stderr)
+
+    finally:
+        close_cursor(cursor, db, truncated)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Execute SQL query")
     parser.add_argument("env", help="Environment name (e.g., ALTA_DEV)")
     parser.add_argument("sql", nargs='?', help="SQL query to execute (or use stdin with -)")
+    parser.add_argument("--stream", action='store_true',
+                        help="Stream rows as NDJSON using a server-side cursor (constant memory)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Rows fetched per round trip in --stream mode (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--timeout", type=float,
+                        help="Statement timeout in seconds (server-side, plus client-side cancel)")
+    parser.add_argument("--max-rows", type=int,
+                        help="Stop fetching after N rows (row-returning statements only)")
 
     args = parser.parse_args()
 
@@ -22,11 +131,29 @@ def main():
         print("Error: No SQL query provided", file=sys.stderr)
         sys.exit(1)
 
+    if args.batch_size < 1:
+        print("Error: --batch-size must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    if args.max_rows is not None and args.max_rows < 1:
+        print("Error: --max-rows must be positive", file=sys.stderr)
+        sys.exit(1)
+
     try:
         config = DatabaseConfig(args.env)
-        db = DatabaseConnection(config)
+        db = DatabaseConnection(config, statement_timeout=args.timeout)
+
+        with db.connect() as conn, db.cancel_guard():
+            if args.stream:
+                stream_results(db, conn, config, sql, args.batch_size, args.max_rows)
+                return
+
+            if args.max_rows is not None and ROW_QUERY.match(sql):
+                columns, rows, truncated = fetch_rows(db, conn, config, sql, args.max_rows)
+                print(json.dumps(rows_output(columns, rows, truncated), indent=2))
+                return
 
-        with db.connect() as conn:
+            # A Postgres named cursor cannot run DML/DDL, so everything else uses a plain cursor
             cursor = conn.cursor()
 
             try:
@@ -34,27 +161,15 @@ def main():
 
                 if cursor.description:
                     columns = [desc[0] for desc in cursor.description]
-                    rows = cursor.fetchall()
-
-                    results = []
-                    for row in rows:
-                        row_dict = {}
-                        for i, col in enumerate(columns):
-                            value = row[i]
-                            if value is not None:
-                                row_dict[col] = str(value) if not isinstance(value, (int, float, bool)) else value
-                            else:
-                                row_dict[col] = None
-                        results.append(row_dict)
-
-                    output = {
-                        'status': 'success',
-                        'columns': columns,
-                        'rows': results,
-                        'row_count': len(results)
-                    }
+                    rows, truncated = fetch_limited(cursor, args.max_rows)
+                    if truncated:
+                        # The statement has already run; MySQL refuses to close a cursor with unread rows
+                        cursor.fetchall()
+                    output = rows_output(columns, rows, truncated)
                 else:
                     conn.commit()
+                    if is_ddl(sql):
+                        invalidate_schema_cache(config)
                     output = {
                         'status': 'success',
                         'affected_rows': cursor.rowcount
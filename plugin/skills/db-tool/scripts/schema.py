@@ -4,6 +4,7 @@ import sys
 import json
 import argparse
 from db_api import DatabaseConfig, DatabaseConnection
+from schema_cache import SchemaCache, DEFAULT_MAX_AGE, catalog_fingerprint
 
 
 def get_postgres_schema(cursor, table_name=None):
@@ -99,38 +100,295 @@ def get_mysql_schema(cursor, table_name=None):
         return {'tables': tables}
 
 
+def get_postgres_schema_all(cursor):
+    cursor.execute("""
+        SELECT c.oid, n.nspname, c.relname, c.relkind, c.reltuples::bigint
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f')
+            AND n.nspname NOT IN ('information_schema', 'pg_catalog')
+            AND n.nspname NOT LIKE 'pg_toast%'
+            AND n.nspname NOT LIKE 'pg_temp%'
+        ORDER BY n.nspname, c.relname
+    """)
+
+    kinds = {'r': 'table', 'p': 'partitioned table', 'v': 'view', 'm': 'materialized view', 'f': 'foreign table'}
+    tables = {}
+    for oid, schema, name, kind, reltuples in cursor.fetchall():
+        tables[oid] = {
+            'schema': schema,
+            'table': name,
+            'kind': kinds.get(kind, kind),
+            'row_estimate': reltuples if reltuples is not None and reltuples >= 0 else None,
+            'columns': [],
+            'primary_key': [],
+            'foreign_keys': [],
+            'indexes': []
+        }
+
+    cursor.execute("""
+        SELECT
+            a.attrelid,
+            a.attname,
+            pg_catalog.format_type(a.atttypid, a.atttypmod),
+            CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END,
+            pg_catalog.pg_get_expr(d.adbin, d.adrelid),
+            CASE WHEN a.atttypid IN (1042, 1043) AND a.atttypmod > 0 THEN a.atttypmod - 4 END
+        FROM pg_catalog.pg_attribute a
+        JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_catalog.pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+        WHERE a.attnum > 0
+            AND NOT a.attisdropped
+            AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+            AND n.nspname NOT IN ('information_schema', 'pg_catalog')
+            AND n.nspname NOT LIKE 'pg_toast%'
+            AND n.nspname NOT LIKE 'pg_temp%'
+        ORDER BY a.attrelid, a.attnum
+    """)
+
+    for oid, name, data_type, nullable, default, max_length in cursor.fetchall():
+        if oid in tables:
+            tables[oid]['columns'].append({
+                'column_name': name,
+                'data_type': data_type,
+                'is_nullable': nullable,
+                'column_default': default,
+                'character_maximum_length': max_length
+            })
+
+    cursor.execute("""
+        SELECT i.indrelid, ic.relname, i.indisunique, i.indisprimary, pg_catalog.pg_get_indexdef(i.indexrelid)
+        FROM pg_catalog.pg_index i
+        JOIN pg_catalog.pg_class ic ON ic.oid = i.indexrelid
+        JOIN pg_catalog.pg_namespace n ON n.oid = ic.relnamespace
+        WHERE n.nspname NOT IN ('information_schema', 'pg_catalog')
+            AND n.nspname NOT LIKE 'pg_toast%'
+        ORDER BY i.indrelid, ic.relname
+    """)
+
+    for oid, name, is_unique, is_primary, definition in cursor.fetchall():
+        if oid in tables:
+            tables[oid]['indexes'].append({
+                'index_name': name,
+                'definition': definition,
+                'is_unique': is_unique,
+                'is_primary': is_primary
+            })
+
+    cursor.execute("""
+        SELECT
+            con.conrelid,
+            con.contype,
+            con.conname,
+            ARRAY(
+                SELECT a.attname
+                FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+                JOIN pg_catalog.pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+                ORDER BY k.ord
+            ),
+            rn.nspname,
+            rc.relname,
+            ARRAY(
+                SELECT a.attname
+                FROM unnest(con.confkey) WITH ORDINALITY AS k(attnum, ord)
+                JOIN pg_catalog.pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.attnum
+                ORDER BY k.ord
+            ),
+            pg_catalog.pg_get_constraintdef(con.oid)
+        FROM pg_catalog.pg_constraint con
+        LEFT JOIN pg_catalog.pg_class rc ON rc.oid = con.confrelid
+        LEFT JOIN pg_catalog.pg_namespace rn ON rn.oid = rc.relnamespace
+        WHERE con.contype IN ('p', 'f')
+        ORDER BY con.conrelid, con.conname
+    """)
+
+    for oid, kind, name, columns, ref_schema, ref_table, ref_columns, definition in cursor.fetchall():
+        if oid not in tables:
+            continue
+
+        if kind == 'p':
+            tables[oid]['primary_key'] = list(columns)
+        else:
+            tables[oid]['foreign_keys'].append({
+                'constraint_name': name,
+                'columns': list(columns),
+                'references': {
+                    'schema': ref_schema,
+                    'table': ref_table,
+                    'columns': list(ref_columns)
+                },
+                'definition': definition
+            })
+
+    return {'tables': list(tables.values())}
+
+
+def get_mysql_schema_all(cursor):
+    cursor.execute("""
+        SELECT TABLE_NAME, TABLE_TYPE, ENGINE, TABLE_ROWS
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME
+    """)
+
+    tables = {}
+    for name, table_type, engine, rows in cursor.fetchall():
+        tables[name] = {
+            'table': name,
+            'kind': 'view' if table_type == 'VIEW' else 'table',
+            'engine': engine,
+            'row_estimate': rows,
+            'columns': [],
+            'primary_key': [],
+            'foreign_keys': [],
+            'indexes': []
+        }
+
+    cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT, EXTRA
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+    """)
+
+    for table, name, data_type, nullable, key, default, extra in cursor.fetchall():
+        if table in tables:
+            tables[table]['columns'].append({
+                'column_name': name,
+                'data_type': data_type,
+                'is_nullable': nullable,
+                'key': key,
+                'column_default': default,
+                'extra': extra
+            })
+
+    cursor.execute("""
+        SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    """)
+
+    indexes = {}
+    for table, index_name, non_unique, column in cursor.fetchall():
+        if table not in tables:
+            continue
+
+        index = indexes.get((table, index_name))
+        if index is None:
+            index = {'key_name': index_name, 'non_unique': int(non_unique), 'columns': []}
+            indexes[(table, index_name)] = index
+            tables[table]['indexes'].append(index)
+
+        index['columns'].append(column)
+
+        if index_name == 'PRIMARY':
+            tables[table]['primary_key'].append(column)
+
+    cursor.execute("""
+        SELECT TABLE_NAME, CONSTRAINT_NAME, COLUMN_NAME,
+               REFERENCED_TABLE_SCHEMA, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE()
+            AND REFERENCED_TABLE_NAME IS NOT NULL
+        ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION
+    """)
+
+    foreign_keys = {}
+    for table, name, column, ref_schema, ref_table, ref_column in cursor.fetchall():
+        if table not in tables:
+            continue
+
+        fk = foreign_keys.get((table, name))
+        if fk is None:
+            fk = {
+                'constraint_name': name,
+                'columns': [],
+                'references': {'schema': ref_schema, 'table': ref_table, 'columns': []}
+            }
+            foreign_keys[(table, name)] = fk
+            tables[table]['foreign_keys'].append(fk)
+
+        fk['columns'].append(column)
+        fk['references']['columns'].append(ref_column)
+
+    return {'tables': list(tables.values())}
+
+
+def fetch_schema(cursor, db_type: str, table_name=None, all_tables=False):
+    if db_type == 'postgres':
+        if all_tables:
+            return get_postgres_schema_all(cursor)
+        return get_postgres_schema(cursor, table_name)
+
+    if db_type == 'mysql':
+        if all_tables:
+            return get_mysql_schema_all(cursor)
+        return get_mysql_schema(cursor, table_name)
+
+    print(f"Error: Unsupported database type '{db_type}'", file=sys.stderr)
+    sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Inspect database schema")
     parser.add_argument("env", help="Environment name (e.g., ALTA_DEV)")
     parser.add_argument("table", nargs='?', help="Specific table name (optional)")
+    parser.add_argument("--all", action='store_true',
+                        help="Dump columns, indexes, keys and row estimates for every table")
+    parser.add_argument("--max-age", type=int, default=DEFAULT_MAX_AGE,
+                        help=f"Serve cached schema younger than N seconds without connecting (default: {DEFAULT_MAX_AGE})")
+    parser.add_argument("--refresh", action='store_true', help="Ignore the cache and re-read the catalog")
+    parser.add_argument("--no-cache", action='store_true', help="Do not read or write the schema cache")
 
     args = parser.parse_args()
 
+    if args.all and args.table:
+        print("Error: --all cannot be combined with a table name", file=sys.stderr)
+        sys.exit(1)
+
     try:
         config = DatabaseConfig(args.env)
-        db = DatabaseConnection(config)
-
-        with db.connect() as conn:
-            cursor = conn.cursor()
-
-            if config.db_type == 'postgres':
-                result = get_postgres_schema(cursor, args.table)
-            elif config.db_type == 'mysql':
-                result = get_mysql_schema(cursor, args.table)
-            else:
-                print(f"Error: Unsupported database type '{config.db_type}'", file=sys.stderr)
-                sys.exit(1)
-
-            cursor.close()
-
-            output = {
-                'status': 'success',
-                'env': args.env,
-                'type': config.db_type,
-                **result
-            }
+        cache = None if args.no_cache else SchemaCache(config)
+        key = '*all' if args.all else (f"table:{args.table}" if args.table else '*tables')
+        entry = cache.get(key) if cache and not args.refresh else None
+
+        if entry and entry['age'] < args.max_age:
+            result = entry['payload']
+            cache_status = 'hit'
+        else:
+            db = DatabaseConnection(config)
+
+            with db.connect() as conn:
+                cursor = conn.cursor()
+
+                fingerprint = catalog_fingerprint(cursor, config.db_type) if cache else None
+
+                if entry and fingerprint and entry['fingerprint'] == fingerprint:
+                    result = entry['payload']
+                    cache.touch(key)
+                    cache_status = 'revalidated'
+                else:
+                    result = fetch_schema(cursor, config.db_type, args.table, args.all)
+                    if cache:
+                        cache.put(key, fingerprint, result)
+                    cache_status = 'miss'
+
+                cursor.close()
+
+        output = {
+            'status': 'success',
+            'env': args.env,
+            'type': config.db_type,
+            **result
+        }
+
+        if cache:
+            output['cache'] = cache_status
+            cache.close()
 
-            print(json.dumps(output, indent=2))
+        print(json.dumps(output, indent=2))
 
     except Exception as e:
         output = {
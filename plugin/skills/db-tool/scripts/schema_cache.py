@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import json
+import time
+import sqlite3
+from typing import Dict, Any, Optional
+from db_api import DatabaseConfig, get_cache_dir
+
+DEFAULT_MAX_AGE = 300
+
+DDL_PATTERN = re.compile(r'^\s*(CREATE|ALTER|DROP|RENAME|TRUNCATE|COMMENT)\b', re.IGNORECASE)
+
+POSTGRES_FINGERPRINT_SQL = """
+    SELECT
+        (SELECT max(xmin::text::bigint) FROM pg_catalog.pg_class),
+        (SELECT count(*) FROM pg_catalog.pg_class),
+        (SELECT max(xmin::text::bigint) FROM pg_catalog.pg_attribute),
+        (SELECT count(*) FROM pg_catalog.pg_attribute),
+        (SELECT max(xmin::text::bigint) FROM pg_catalog.pg_constraint),
+        (SELECT count(*) FROM pg_catalog.pg_constraint)
+"""
+
+MYSQL_FINGERPRINT_SQL = """
+    SELECT MAX(CREATE_TIME), MAX(UPDATE_TIME), COUNT(*)
+    FROM information_schema.TABLES
+    WHERE TABLE_SCHEMA = DATABASE()
+"""
+
+
+def catalog_fingerprint(cursor, db_type: str) -> str:
+    if db_type == 'postgres':
+        cursor.execute(POSTGRES_FINGERPRINT_SQL)
+    elif db_type == 'mysql':
+        cursor.execute(MYSQL_FINGERPRINT_SQL)
+    else:
+        return ''
+
+    return '|'.join('' if value is None else str(value) for value in cursor.fetchone())
+
+
+def is_ddl(sql: str) -> bool:
+    return bool(DDL_PATTERN.match(sql))
+
+
+class SchemaCache:
+    def __init__(self, config: DatabaseConfig):
+        self.env = config.env_name
+        self.config_fingerprint = config.fingerprint
+        self.path = os.path.join(get_cache_dir(), 'schema.sqlite')
+        self.db = sqlite3.connect(self.path, timeout=5)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS schema_cache (
+                env TEXT NOT NULL,
+                key TEXT NOT NULL,
+                config TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (env, key)
+            )
+        """)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(
+            "SELECT fingerprint, checked_at, payload FROM schema_cache WHERE env = ? AND key = ? AND config = ?",
+            (self.env, key, self.config_fingerprint)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            'fingerprint': row[0],
+            'age': time.time() - row[1],
+            'payload': json.loads(row[2])
+        }
+
+    def put(self, key: str, fingerprint: str, payload: Dict[str, Any]):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO schema_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (self.env, key, self.config_fingerprint, fingerprint, time.time(), json.dumps(payload, default=str))
+            )
+
+    def touch(self, key: str):
+        with self.db:
+            self.db.execute(
+                "UPDATE schema_cache SET checked_at = ? WHERE env = ? AND key = ?",
+                (time.time(), self.env, key)
+            )
+
+    def invalidate(self):
+        with self.db:
+            self.db.execute("DELETE FROM schema_cache WHERE env = ?", (self.env,))
+
+    def close(self):
+        self.db.close()
+
+
+def invalidate_schema_cache(config: DatabaseConfig):
+    try:
+        cache = SchemaCache(config)
+        cache.invalidate()
+        cache.close()
+    except sqlite3.Error:
+        pass
@@ -18,31 +18,59 @@ case "$command" in
     jira-get-issue)
         python3 "$SCRIPTS_DIR/jira_get_issue.py" "$@"
         ;;
+    jira-get-issues|get-issues)
+        python3 "$SCRIPTS_DIR/jira_get_issues.py" "$@"
+        ;;
     jira-create-issue)
         python3 "$SCRIPTS_DIR/jira_create_issue.py" "$@"
         ;;
     jira-update-issue)
         python3 "$SCRIPTS_DIR/jira_update_issue.py" "$@"
         ;;
+    jira-bulk-create|bulk-create)
+        python3 "$SCRIPTS_DIR/jira_bulk.py" create "$@"
+        ;;
+    jira-bulk-update|bulk-update)
+        python3 "$SCRIPTS_DIR/jira_bulk.py" update "$@"
+        ;;
+    jira-bulk-retry|bulk-retry)
+        python3 "$SCRIPTS_DIR/jira_bulk.py" retry "$@"
+        ;;
     jira-list-sprints)
         python3 "$SCRIPTS_DIR/jira_list_sprints.py" "$@"
         ;;
     jira-get-sprint)
         python3 "$SCRIPTS_DIR/jira_get_sprint.py" "$@"
         ;;
+    jira-sprint-report|sprint-report)
+        python3 "$SCRIPTS_DIR/jira_sprint_report.py" "$@"
+        ;;
+    jira-sync|sync)
+        python3 "$SCRIPTS_DIR/jira_sync.py" "$@"
+        ;;
+    jira-analytics|analytics)
+        python3 "$SCRIPTS_DIR/jira_analytics.py" "$@"
+        ;;
     --help|-h|help)
         echo "Jira Admin Tool - Manage Jira via REST API"
         echo ""
         echo "Discovery:"
-        echo "  discover                    - List all Jira instances"
+        echo "  discover                    - List all Jira instances (--metadata to cache field/type ids)"
         echo ""
         echo "Jira:"
         echo "  jira-search                 - Search/list issues with JQL"
         echo "  jira-get-issue              - Get issue details"
+        echo "  jira-get-issues             - Get many issues in batched searches"
         echo "  jira-create-issue           - Create new issue"
         echo "  jira-update-issue           - Update issue"
+        echo "  jira-bulk-create            - Create issues from NDJSON (50 per request)"
+        echo "  jira-bulk-update            - Update issues from NDJSON in parallel"
+        echo "  jira-bulk-retry             - Re-run failed bulk items from the retry queue"
         echo "  jira-list-sprints           - List sprints for board"
         echo "  jira-get-sprint             - Get sprint details"
+        echo "  jira-sprint-report          - Sprint issues, story points and burndown"
+        echo "  jira-sync                   - Mirror a project into local SQLite (use --cached on search/get)"
+        echo "  jira-analytics              - Cycle time, lead time and throughput from changelogs"
         echo ""
         echo "  --help, -h, help            - Show this message"
         exit 0
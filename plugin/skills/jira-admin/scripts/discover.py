@@ -4,6 +4,9 @@ import os
 import sys
 import json
 import re
+import argparse
+from jira_api import JiraAPI
+from jira_metadata import JiraMetadata
 
 
 def discover_instances():
@@ -41,6 +44,47 @@ def discover_instances():
     return result
 
 
-if __name__ == '__main__':
+def cache_metadata(entries, selected, ttl_hours, refresh, transitions):
+    for entry in entries:
+        jira = entry['services'].get('jira')
+        if not jira or not jira['configured']:
+            continue
+        if selected and entry['instance'].upper() not in selected:
+            continue
+
+        metadata = JiraMetadata(entry['instance'])
+        stale = not metadata.is_fresh() or metadata.data.get('ttl_hours') != ttl_hours
+        if refresh or stale:
+            print(f"Fetching metadata for {entry['instance']}...", file=sys.stderr)
+            metadata.refresh(JiraAPI(entry['instance']), ttl_hours, transitions)
+
+        jira['metadata'] = metadata.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Discover configured Jira instances')
+    parser.add_argument('--metadata', nargs='*', metavar='INSTANCE',
+                        help='Fetch and cache fields, issue types, projects and transitions (all instances if none given)')
+    parser.add_argument('--ttl', type=float, default=24,
+                        help='Hours before cached metadata is refetched (default: 24)')
+    parser.add_argument('--refresh', action='store_true', help='Refetch metadata even if the cache is fresh')
+    parser.add_argument('--no-transitions', action='store_true',
+                        help='Skip the workflow scan; transitions are then learned on first use')
+
+    args = parser.parse_args()
+
     instances = discover_instances()
+
+    if args.metadata is not None:
+        selected = {name.upper() for name in args.metadata}
+        unknown = selected - {entry['instance'].upper() for entry in instances}
+        if unknown:
+            print(f"Error: Unknown instance(s): {', '.join(sorted(unknown))}", file=sys.stderr)
+            sys.exit(1)
+        cache_metadata(instances, selected, args.ttl, args.refresh, not args.no_transitions)
+
     print(json.dumps(instances, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import argparse
+from datetime import datetime, timezone
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from jira_api import JiraAPI, DEFAULT_CONCURRENCY, error_message, parse_time
+from http_client import HttpError, TransportError
+
+DEFAULT_START_STATUSES = 'In Progress'
+DEFAULT_DONE_STATUSES = 'Done,Closed,Resolved'
+DEFAULT_PAGE_SIZE = 100
+CHANGELOG_PAGE_SIZE = 100
+PERCENTILES = (50, 75, 85, 95)
+DAY = 86400.0
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(seconds: List[float]) -> Optional[Dict[str, Any]]:
+    if not seconds:
+        return None
+
+    days = [value / DAY for value in seconds]
+    summary = {f"p{pct}": round(percentile(days, pct), 2) for pct in PERCENTILES}
+    summary['mean'] = round(sum(days) / len(days), 2)
+    summary['count'] = len(days)
+    return summary
+
+
+def iso_week(timestamp: float) -> str:
+    year, week, _ = datetime.fromtimestamp(timestamp, timezone.utc).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def full_changelog(api: JiraAPI, key: str) -> List[Dict[str, Any]]:
+    histories = []
+    start_at = 0
+
+    try:
+        while True:
+            page = api.request(f'issue/{key}/changelog',
+                               params={'startAt': start_at, 'maxResults': CHANGELOG_PAGE_SIZE}).json()
+            histories.extend(page.get('values', []))
+            start_at += len(page.get('values', []))
+            if page.get('isLast', True) or not page.get('values'):
+                return histories
+    except HttpError as e:
+        if e.status != 404:
+            print(error_message(e), file=sys.stderr)
+            sys.exit(1)
+    except TransportError as e:
+        print(f"URL Error: {e.reason}", file=sys.stderr)
+        sys.exit(1)
+
+    # Jira Server/DC has no paged changelog endpoint; expand returns the full history there
+
+    issue = api.get(f'issue/{key}', params={'fields': 'created', 'expand': 'changelog'})
+    return issue.get('changelog', {}).get('histories', [])
+
+
+def status_transitions(histories: List[Dict[str, Any]]) -> List[Tuple[float, str, str]]:
+    transitions = []
+
+    for history in histories:
+        for item in history.get('items', []):
+            if item.get('field') == 'status':
+                transitions.append((
+                    parse_time(history['created']),
+                    item.get('fromString') or '',
+                    item.get('toString') or ''
+                ))
+
+    transitions.sort()
+    return transitions
+
+
+class FlowStats:
+    def __init__(self, start_statuses: List[str], done_statuses: List[str], keep_issues: bool):
+        self.start_statuses = set(start_statuses)
+        self.done_statuses = set(done_statuses)
+        self.keep_issues = keep_issues
+        self.now = datetime.now(timezone.utc).timestamp()
+
+        self.issue_count = 0
+        self.cycle_times: List[float] = []
+        self.lead_times: List[float] = []
+        self.throughput: Dict[str, int] = defaultdict(int)
+        self.status_time: Dict[str, float] = defaultdict(float)
+        self.status_issues: Dict[str, int] = defaultdict(int)
+        self.wip = 0
+        self.issues: List[Dict[str, Any]] = []
+
+    def add(self, key: str, created: float, status: str, transitions: List[Tuple[float, str, str]]):
+        self.issue_count += 1
+        is_done = status.lower() in self.done_statuses
+
+        started = next((ts for ts, _, to in transitions if to.lower() in self.start_statuses), None)
+        done = None
+        if is_done:
+            done = next((ts for ts, _, to in reversed(transitions) if to.lower() in self.done_statuses), None)
+
+        previous_ts = created
+        previous_status = transitions[0][1] if transitions else status
+        seen = set()
+        for ts, from_status, to_status in transitions:
+            self.status_time[from_status] += ts - previous_ts
+            seen.add(from_status)
+            previous_ts, previous_status = ts, to_status
+
+        if not is_done:
+            self.status_time[previous_status] += self.now - previous_ts
+            seen.add(previous_status)
+
+        for name in seen:
+            self.status_issues[name] += 1
+
+        if done is not None:
+            self.lead_times.append(done - created)
+            self.throughput[iso_week(done)] += 1
+            if started is not None and started <= done:
+                self.cycle_times.append(done - started)
+        elif started is not None:
+            self.wip += 1
+
+        if self.keep_issues:
+            self.issues.append({
+                'key': key,
+                'status': status,
+                'started': datetime.fromtimestamp(started, timezone.utc).isoformat() if started else None,
+                'done': datetime.fromtimestamp(done, timezone.utc).isoformat() if done else None,
+                'cycle_days': round((done - started) / DAY, 2) if done and started and started <= done else None,
+                'lead_days': round((done - created) / DAY, 2) if done else None
+            })
+
+    def report(self) -> Dict[str, Any]:
+        report = {
+            'issues': self.issue_count,
+            'completed': len(self.lead_times),
+            'in_progress': self.wip,
+            'cycle_time_days': summarize(self.cycle_times),
+            'lead_time_days': summarize(self.lead_times),
+            'time_in_status_days': {
+                name: {
+                    'total': round(self.status_time[name] / DAY, 2),
+                    'mean': round(self.status_time[name] / DAY / self.status_issues[name], 2),
+                    'issues': self.status_issues[name]
+                }
+                for name in sorted(self.status_time, key=self.status_time.get, reverse=True)
+                if self.status_issues[name]
+            },
+            'throughput_weekly': [
+                {'week': week, 'completed': self.throughput[week]} for week in sorted(self.throughput)
+            ]
+        }
+
+        if self.keep_issues:
+            report['per_issue'] = self.issues
+
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cycle time, lead time and throughput from Jira changelogs')
+    parser.add_argument('instance', help='Instance name (e.g., 4RA)')
+    parser.add_argument('jql', help='JQL selecting the issues to analyse')
+    parser.add_argument('--start', default=DEFAULT_START_STATUSES,
+                        help=f'Comma-separated statuses that start the cycle (default: "{DEFAULT_START_STATUSES}")')
+    parser.add_argument('--done', default=DEFAULT_DONE_STATUSES,
+                        help=f'Comma-separated statuses that end it (default: "{DEFAULT_DONE_STATUSES}")')
+    parser.add_argument('--max-issues', type=int, help='Stop after N issues')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'Issues per search page (default: {DEFAULT_PAGE_SIZE})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Pages and changelogs fetched in parallel (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--per-issue', action='store_true', help='Include per-issue start/done/cycle rows')
+
+    args = parser.parse_args()
+
+    start_statuses = [s.strip().lower() for s in args.start.split(',') if s.strip()]
+    done_statuses = [s.strip().lower() for s in args.done.split(',') if s.strip()]
+
+    api = JiraAPI(args.instance)
+    stats = FlowStats(start_statuses, done_statuses, args.per_issue)
+
+    params = {'jql': args.jql, 'fields': 'created,status', 'expand': 'changelog'}
+    refetched = 0
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        pages = api.search_pages(params, page_size=args.page_size, max_issues=args.max_issues,
+                                 concurrency=args.concurrency)
+
+        for total, issues in pages:
+            truncated = {}
+            for issue in issues:
+                changelog = issue.get('changelog', {})
+                if changelog.get('total', 0) > len(changelog.get('histories', [])):
+                    truncated[issue['key']] = pool.submit(full_changelog, api, issue['key'])
+
+            for issue in issues:
+                histories = issue.get('changelog', {}).get('histories', [])
+                if issue['key'] in truncated:
+                    histories = truncated[issue['key']].result()
+                    refetched += 1
+
+                fields = issue['fields']
+                stats.add(issue['key'], parse_time(fields['created']), fields['status']['name'],
+                          status_transitions(histories))
+
+            print(f"Processed {stats.issue_count}/{total} issues", file=sys.stderr)
+
+    output = {
+        'jql': args.jql,
+        'start_statuses': start_statuses,
+        'done_statuses': done_statuses,
+        'changelogs_refetched': refetched,
+        **stats.report()
+    }
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,10 +3,40 @@
 import os
 import sys
 import json
-import urllib.request
-import urllib.parse
-import urllib.error
-from typing import Dict, Optional, Any
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Any, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '_lib'))
+from http_client import HttpClient, HttpResponse, HttpError, TransportError
+from http_cache import open_cache
+from cache_dir import tool_cache_dir
+
+DEFAULT_CONCURRENCY = 4
+REST_API = 'rest/api/2'
+AGILE_API = 'rest/agile/1.0'
+
+
+def get_cache_dir(*parts: str) -> str:
+    return tool_cache_dir('jira-tool', *parts)
+
+
+def error_message(e: HttpError) -> str:
+    error_body = e.text()
+    try:
+        error_json = json.loads(error_body)
+        if 'errorMessages' in error_json and error_json['errorMessages']:
+            return f"Jira Error: {'; '.join(error_json['errorMessages'])}"
+        if 'errors' in error_json:
+            return f"Jira Error: {error_json['errors']}"
+    except (ValueError, TypeError):
+        pass
+    return f"HTTP {e.status}: {error_body}"
+
+
+def parse_time(value: str) -> float:
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f%z').timestamp()
 
 
 class JiraAPI:
@@ -28,52 +58,40 @@ class JiraAPI:
             sys.exit(1)
 
         self.base_url = self.base_url.rstrip('/')
+        self.http = HttpClient(self.base_url, headers={
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }, cache=open_cache(f"jira-{instance.lower()}"))
 
-    def _make_request(
+    def request(
         self,
         endpoint: str,
         method: str = "GET",
         data: Optional[Dict[str, Any]] = None,
-        params: Optional[Dict[str, str]] = None
-    ) -> Dict[str, Any]:
-        url = f"{self.base_url}/rest/api/2/{endpoint.lstrip('/')}"
-
-        if params:
-            query_string = urllib.parse.urlencode(params)
-            url = f"{url}?{query_string}"
-
-        headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-
+        params: Optional[Dict[str, str]] = None,
+        prefix: str = REST_API
+    ) -> HttpResponse:
         req_data = None
         if data:
             req_data = json.dumps(data).encode('utf-8')
 
-        request = urllib.request.Request(url, data=req_data, headers=headers, method=method)
+        return self.http.request(method, f"{prefix}/{endpoint.lstrip('/')}", params=params, body=req_data)
 
+    def _make_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, str]] = None,
+        prefix: str = REST_API
+    ) -> Dict[str, Any]:
         try:
-            with urllib.request.urlopen(request) as response:
-                response_text = response.read().decode('utf-8')
-                if response_text:
-                    return json.loads(response_text)
-                return {}
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8')
-            try:
-                error_json = json.loads(error_body)
-                if 'errorMessages' in error_json:
-                    print(f"Jira Error: {'; '.join(error_json['errorMessages'])}", file=sys.stderr)
-                elif 'errors' in error_json:
-                    print(f"Jira Error: {error_json['errors']}", file=sys.stderr)
-                else:
-                    print(f"HTTP {e.code}: {error_body}", file=sys.stderr)
-            except:
-                print(f"HTTP {e.code}: {error_body}", file=sys.stderr)
+            return self.request(endpoint, method, data, params, prefix).json()
+        except HttpError as e:
+            print(error_message(e), file=sys.stderr)
             sys.exit(1)
-        except urllib.error.URLError as e:
+        except TransportError as e:
             print(f"URL Error: {e.reason}", file=sys.stderr)
             sys.exit(1)
         except json.JSONDecodeError as e:
@@ -91,3 +109,39 @@ class JiraAPI:
 
     def delete(self, endpoint: str) -> Dict[str, Any]:
         return self._make_request(endpoint, "DELETE")
+
+    def agile_get(self, endpoint: str, params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return self._make_request(endpoint, "GET", params=params, prefix=AGILE_API)
+
+    def search_pages(
+        self,
+        params: Dict[str, str],
+        start_at: int = 0,
+        page_size: int = 100,
+        max_issues: Optional[int] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        endpoint: str = 'search',
+        prefix: str = REST_API
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        def fetch(offset: int, size: int) -> Dict[str, Any]:
+            page_params = {**params, 'startAt': str(offset), 'maxResults': str(size)}
+            return self._make_request(endpoint, "GET", params=page_params, prefix=prefix)
+
+        first = fetch(start_at, page_size if max_issues is None else min(page_size, max_issues))
+        total = first.get('total', 0)
+        page_size = min(page_size, first.get('maxResults') or page_size)
+        end = total if max_issues is None else min(total, start_at + max_issues)
+
+        yield total, first.get('issues', [])[:end - start_at]
+
+        offsets = deque(range(start_at + page_size, end, page_size))
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while offsets or pending:
+                while offsets and len(pending) < concurrency * 2:
+                    offset = offsets.popleft()
+                    pending.append((offset, pool.submit(fetch, offset, min(page_size, end - offset))))
+
+                offset, future = pending.popleft()
+                yield total, future.result().get('issues', [])[:end - offset]
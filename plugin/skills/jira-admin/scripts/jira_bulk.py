@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from jira_api import JiraAPI, DEFAULT_CONCURRENCY, get_cache_dir, error_message
+from jira_metadata import JiraMetadata, MetadataError, load_metadata
+from http_client import HttpError, TransportError, retry_after
+
+BULK_CREATE_LIMIT = 50
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_WAIT = 60
+RETRYABLE_STATUSES = (502, 503, 504)
+
+UNKNOWN_OUTCOME = 'Unknown outcome (Jira may have created the issues; check before retrying with --include-unknown)'
+
+Outcome = Tuple[Dict[str, Any], Optional[str], Optional[int], Optional[str], bool]
+
+
+def read_items(source: str, operation: str) -> List[Dict[str, Any]]:
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    entries = []
+
+    with stream:
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Error: Line {line_no}: invalid JSON ({e})", file=sys.stderr)
+                sys.exit(1)
+            if not isinstance(item, dict):
+                print(f"Error: Line {line_no}: expected a JSON object", file=sys.stderr)
+                sys.exit(1)
+            if operation == 'update' and not item.get('key'):
+                print(f"Error: Line {line_no}: update items need a \"key\"", file=sys.stderr)
+                sys.exit(1)
+            entries.append({'id': None, 'op': operation, 'line': line_no, 'item': item, 'attempts': 0})
+
+    return entries
+
+
+def resolve_items(metadata: JiraMetadata, entries: List[Dict[str, Any]]):
+    for entry in entries:
+        item = entry['item']
+        project_key = item['key'].rsplit('-', 1)[0] if entry['op'] == 'update' else None
+        try:
+            if entry['op'] == 'create' and 'fields' not in item:
+                entry['item'] = metadata.resolve_fields(item)
+                continue
+            if 'fields' in item:
+                item['fields'] = metadata.resolve_fields(item['fields'], project_key)
+            if 'update' in item:
+                item['update'] = metadata.resolve_update(item['update'])
+        except MetadataError as e:
+            label = f"Line {entry['line']}" if entry['id'] is None else f"Queue item {entry['id']}"
+            print(f"Error: {label}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+
+def retry_delay(e: HttpError, attempt: int) -> float:
+    delay = retry_after(e.headers)
+    return min(2 ** attempt, 30) if delay is None else delay
+
+
+class RetryQueue:
+    def __init__(self, path: str):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.lock = threading.Lock()
+
+    def _append(self, path: str, record: Dict[str, Any]):
+        with self.lock, open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read(self, path: str) -> List[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def load(self) -> List[Dict[str, Any]]:
+        entries = {entry['id']: entry for entry in self._read(self.path)}
+        for record in self._read(self.journal_path):
+            if record.get('done'):
+                entries.pop(record['id'], None)
+            elif record['id'] in entries:
+                entries[record['id']].update(record)
+        return list(entries.values())
+
+    def push(self, entry: Dict[str, Any], status: Optional[int], error: str, unknown: bool):
+        record = {**entry, 'id': uuid.uuid4().hex, 'status': status, 'error': error, 'unknown_outcome': unknown,
+                  'attempts': entry['attempts'] + 1, 'queued_at': int(time.time())}
+        self._append(self.path, record)
+
+    def resolve(self, entry: Dict[str, Any]):
+        self._append(self.journal_path, {'id': entry['id'], 'done': True})
+
+    def requeue(self, entry: Dict[str, Any], status: Optional[int], error: str, unknown: bool):
+        self._append(self.journal_path, {'id': entry['id'], 'status': status, 'error': error,
+                                         'unknown_outcome': unknown, 'attempts': entry['attempts'] + 1,
+                                         'queued_at': int(time.time())})
+
+    def compact(self) -> int:
+        entries = self.load()
+        if entries:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            os.replace(tmp_path, self.path)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        return len(entries)
+
+
+class BulkRunner:
+    def __init__(self, api: JiraAPI, max_retries: int, max_wait: float):
+        self.api = api
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+
+    def call(self, method: str, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        # 429 is retried by HttpClient alone. POST issue/bulk is not idempotent: after a gateway error or a
+        # connection dropped once the request was written Jira may have created the issues, so it is only
+        # resent when the request never reached Jira in full
+        idempotent = method != 'POST'
+        attempt = 0
+        while True:
+            try:
+                return self.api.request(endpoint, method, data).json()
+            except HttpError as e:
+                if not idempotent or e.status not in RETRYABLE_STATUSES or attempt >= self.max_retries:
+                    raise
+                delay = retry_delay(e, attempt)
+                if delay > self.max_wait:
+                    raise
+                time.sleep(delay)
+            except TransportError as e:
+                if (e.sent and not idempotent) or attempt >= self.max_retries:
+                    raise
+                time.sleep(min(2 ** attempt, 30))
+            attempt += 1
+
+    def create_chunk(self, entries: List[Dict[str, Any]]) -> List[Outcome]:
+        payload = {'issueUpdates': [
+            entry['item'] if 'fields' in entry['item'] else {'fields': entry['item']} for entry in entries
+        ]}
+
+        try:
+            result = self.call('POST', 'issue/bulk', payload)
+        except HttpError as e:
+            try:
+                result = json.loads(e.text())
+            except ValueError:
+                result = None
+            if not isinstance(result, dict) or 'errors' not in result or not isinstance(result['errors'], list):
+                if e.status in RETRYABLE_STATUSES:
+                    return [(entry, None, e.status, f"{UNKNOWN_OUTCOME}: {error_message(e)}", True)
+                            for entry in entries]
+                return [(entry, None, e.status, error_message(e), False) for entry in entries]
+        except TransportError as e:
+            if e.sent:
+                return [(entry, None, None, f"{UNKNOWN_OUTCOME}: URL Error: {e.reason}", True) for entry in entries]
+            return [(entry, None, None, f"URL Error: {e.reason}", False) for entry in entries]
+
+        failed = {error.get('failedElementNumber'): error for error in result.get('errors', [])}
+        created = iter(result.get('issues', []))
+        outcomes = []
+
+        for index, entry in enumerate(entries):
+            if index in failed:
+                element = failed[index].get('elementErrors', {})
+                message = '; '.join(element.get('errorMessages', [])) or json.dumps(element.get('errors', {}))
+                outcomes.append((entry, None, failed[index].get('status'), f"Jira Error: {message}", False))
+            else:
+                outcomes.append((entry, next(created, {}).get('key'), None, None, False))
+
+        return outcomes
+
+    def update_one(self, entry: Dict[str, Any]) -> Outcome:
+        item = entry['item']
+        body = {k: v for k, v in item.items() if k != 'key'}
+
+        try:
+            self.call('PUT', f"issue/{item['key']}", body)
+            return (entry, item['key'], None, None, False)
+        except HttpError as e:
+            return (entry, None, e.status, error_message(e), False)
+        except TransportError as e:
+            return (entry, None, None, f"URL Error: {e.reason}", False)
+
+
+def run(runner: BulkRunner, queue: RetryQueue, entries: List[Dict[str, Any]],
+        chunk_size: int, concurrency: int) -> Dict[str, Any]:
+    creates = [entry for entry in entries if entry['op'] == 'create']
+    updates = [entry for entry in entries if entry['op'] == 'update']
+    chunks = [creates[i:i + chunk_size] for i in range(0, len(creates), chunk_size)]
+
+    results = []
+    errors = []
+    done = 0
+
+    def record(outcomes: List[Outcome]):
+        nonlocal done
+        for entry, key, status, error, unknown in outcomes:
+            label = {'line': entry['line']} if entry['id'] is None else {'id': entry['id']}
+            if error is None:
+                results.append({**label, 'op': entry['op'], 'key': key})
+                if entry['id'] is not None:
+                    queue.resolve(entry)
+            else:
+                errors.append({**label, 'op': entry['op'], 'status': status, 'error': error,
+                               **({'unknown_outcome': True} if unknown else {})})
+                if entry['id'] is None:
+                    queue.push(entry, status, error, unknown)
+                else:
+                    queue.requeue(entry, status, error, unknown)
+        done += len(outcomes)
+        print(f"Processed {done}/{len(entries)} items", file=sys.stderr)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for outcomes in pool.map(runner.create_chunk, chunks):
+            record(outcomes)
+        for outcome in pool.map(runner.update_one, updates):
+            record([outcome])
+
+    pending = queue.compact()
+
+    output = {
+        'status': 'success' if not errors else 'partial',
+        'succeeded': len(results),
+        'failed': len(errors),
+        'results': results,
+        'errors': errors
+    }
+    if pending:
+        output['queue'] = {'path': queue.path, 'pending': pending}
+
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk create/update Jira issues from NDJSON')
+    subparsers = parser.add_subparsers(dest='operation', required=True)
+
+    create_parser = subparsers.add_parser('create', help='Create issues (one fields object per line)')
+    update_parser = subparsers.add_parser('update', help='Update issues (one {"key", "fields"/"update"} per line)')
+    retry_parser = subparsers.add_parser('retry', help='Re-run items left in the retry queue')
+
+    for sub in (create_parser, update_parser, retry_parser):
+        sub.add_argument('instance', help='Instance name (e.g., 4RA)')
+        if sub is not retry_parser:
+            sub.add_argument('input', help='NDJSON file (use - for stdin)')
+        sub.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                         help=f'Requests in parallel (default: {DEFAULT_CONCURRENCY})')
+        if sub is not update_parser:
+            sub.add_argument('--chunk-size', type=int, default=BULK_CREATE_LIMIT,
+                             help=f'Issues per bulk create request (max/default: {BULK_CREATE_LIMIT})')
+        sub.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                         help=f'Retries on 502/503/504 and connection errors before queueing an item; creates are only '
+                              f'retried when the request was not sent (default: {DEFAULT_MAX_RETRIES})')
+        sub.add_argument('--max-wait', type=float, default=DEFAULT_MAX_WAIT,
+                         help=f'Longest Retry-After to wait for, in seconds (default: {DEFAULT_MAX_WAIT})')
+        sub.add_argument('--no-resolve', action='store_true',
+                         help='Send field names and values as given, without the cached metadata')
+        sub.add_argument('--queue', help='Retry queue file (default: ~/.cache/jira-tool/bulk/<instance>.ndjson)')
+
+    retry_parser.add_argument('--include-unknown', action='store_true',
+                              help='Also resend creates whose outcome is unknown (check Jira for duplicates first)')
+
+    args = parser.parse_args()
+
+    chunk_size = getattr(args, 'chunk_size', BULK_CREATE_LIMIT)
+    if args.concurrency < 1 or not 1 <= chunk_size <= BULK_CREATE_LIMIT:
+        print(f"Error: --concurrency must be positive and --chunk-size between 1 and {BULK_CREATE_LIMIT}",
+              file=sys.stderr)
+        sys.exit(1)
+
+    queue = RetryQueue(args.queue or os.path.join(get_cache_dir('bulk'), f"{args.instance.lower()}.ndjson"))
+
+    held = 0
+    if args.operation == 'retry':
+        entries = queue.load()
+        if not args.include_unknown:
+            held = sum(1 for entry in entries if entry.get('unknown_outcome'))
+            entries = [entry for entry in entries if not entry.get('unknown_outcome')]
+        if not entries:
+            message = 'Retry queue is empty' if not held else \
+                f"Only {held} items with an unknown outcome are queued; check Jira, then use --include-unknown"
+            print(json.dumps({'status': 'success', 'message': message, 'queue': queue.path}))
+            return
+    else:
+        entries = read_items(args.input, args.operation)
+
+    api = JiraAPI(args.instance)
+
+    metadata = None if args.no_resolve else load_metadata(api, args.instance)
+    if metadata:
+        resolve_items(metadata, entries)
+
+    runner = BulkRunner(api, args.max_retries, args.max_wait)
+
+    output = run(runner, queue, entries, chunk_size, args.concurrency)
+    if held:
+        output['held_unknown_outcome'] = held
+    print(json.dumps({'operation': args.operation, **output}, indent=2))
+
+    if output['errors']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,12 +4,15 @@ import sys
 import json
 import argparse
 from jira_api import JiraAPI
+from jira_metadata import load_metadata, MetadataError
 
 
 def main():
     parser = argparse.ArgumentParser(description='Create Jira issue')
     parser.add_argument('instance', help='Instance name (e.g., 4RA)')
     parser.add_argument('data', help='JSON data (use - for stdin)')
+    parser.add_argument('--no-resolve', action='store_true',
+                        help='Send field names and values as given, without the cached metadata')
 
     args = parser.parse_args()
 
@@ -20,6 +23,14 @@ def main():
     else:
         issue_data = json.loads(args.data)
 
+    metadata = None if args.no_resolve else load_metadata(api, args.instance)
+    if metadata:
+        try:
+            issue_data = metadata.resolve_fields(issue_data)
+        except MetadataError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
     payload = {'fields': issue_data}
     result = api.post('issue', payload)
     print(json.dumps(result, indent=2))
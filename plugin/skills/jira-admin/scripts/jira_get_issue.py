@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 
 import sys
-import json
 import argparse
 from jira_api import JiraAPI
+from jira_mirror import JiraMirror, project_fields
+from jira_projection import add_projection_args, projection_from_args, to_json
 
 
 def main():
@@ -12,9 +13,26 @@ def main():
     parser.add_argument('issue_key', help='Issue key (e.g., DEV-123)')
     parser.add_argument('--fields', help='Comma-separated fields to return')
     parser.add_argument('--expand', help='Comma-separated expand options (e.g., changelog,renderedFields)')
+    parser.add_argument('--cached', action='store_true', help='Read from the local mirror (see jira-sync), falling back to the API')
+    add_projection_args(parser)
 
     args = parser.parse_args()
 
+    projection = projection_from_args(args)
+    compact = args.compact or projection is not None
+
+    if args.cached:
+        mirror = JiraMirror(args.instance)
+        issue = mirror.get(args.issue_key)
+        mirror.close()
+
+        if issue is not None:
+            issue = project_fields(issue, args.fields)
+            print(to_json(projection.apply(issue) if projection else issue, compact))
+            return
+
+        print(f"{args.issue_key} not in local mirror, fetching from Jira", file=sys.stderr)
+
     api = JiraAPI(args.instance)
 
     params = {}
@@ -22,9 +40,11 @@ def main():
         params['fields'] = args.fields
     if args.expand:
         params['expand'] = args.expand
+    if projection:
+        params = projection.request_params(params)
 
     result = api.get(f'issue/{args.issue_key}', params=params if params else None)
-    print(json.dumps(result, indent=2))
+    print(to_json(projection.apply(result) if projection else result, compact))
 
 
 if __name__ == '__main__':
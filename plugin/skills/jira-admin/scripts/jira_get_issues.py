@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import re
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+from jira_api import JiraAPI, DEFAULT_CONCURRENCY
+from jira_mirror import JiraMirror, project_fields
+from jira_projection import add_projection_args, projection_from_args, to_json
+
+DEFAULT_CHUNK_SIZE = 100
+
+ISSUE_KEY = re.compile(r'^[A-Za-z][A-Za-z0-9_]*-\d+$')
+
+
+def read_keys(values: List[str]) -> List[str]:
+    if not values or values == ['-']:
+        values = sys.stdin.read().split()
+
+    keys = []
+    for value in values:
+        for key in value.replace(',', ' ').split():
+            key = key.upper()
+            if not ISSUE_KEY.match(key):
+                print(f"Error: Invalid issue key '{key}'", file=sys.stderr)
+                sys.exit(1)
+            if key not in keys:
+                keys.append(key)
+
+    return keys
+
+
+def fetch_chunk(api: JiraAPI, keys: List[str], fields: Optional[str], expand: Optional[str]) -> List[Dict[str, Any]]:
+    params = {
+        'jql': f"key in ({', '.join(keys)})",
+        'maxResults': str(len(keys)),
+        'validateQuery': 'warn'
+    }
+    if fields:
+        params['fields'] = fields
+    if expand:
+        params['expand'] = expand
+
+    issues = []
+    for _, page in api.search_pages(params, page_size=len(keys), concurrency=1):
+        issues.extend(page)
+    return issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Get many Jira issues in a few batched searches')
+    parser.add_argument('instance', help='Instance name (e.g., 4RA)')
+    parser.add_argument('keys', nargs='*', help="Issue keys (space or comma separated; '-' or none reads stdin)")
+    parser.add_argument('--fields', help='Comma-separated fields to return')
+    parser.add_argument('--expand', help='Comma-separated expand options (e.g., changelog,renderedFields)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Keys per search request (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Search requests in parallel (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--cached', action='store_true',
+                        help='Serve keys from the local mirror (see jira-sync) and fetch only the rest')
+    add_projection_args(parser)
+
+    args = parser.parse_args()
+
+    projection = projection_from_args(args)
+    compact = args.compact or projection is not None
+
+    fields, expand = args.fields, args.expand
+    if projection:
+        params = projection.request_params({k: v for k, v in (('fields', fields), ('expand', expand)) if v})
+        fields, expand = params['fields'], params.get('expand')
+
+    keys = read_keys(args.keys)
+    if not keys:
+        print("Error: No issue keys provided", file=sys.stderr)
+        sys.exit(1)
+
+    if args.chunk_size < 1 or args.concurrency < 1:
+        print("Error: --chunk-size and --concurrency must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    found: Dict[str, Dict[str, Any]] = {}
+
+    if args.cached:
+        mirror = JiraMirror(args.instance)
+        for key in keys:
+            issue = mirror.get(key)
+            if issue is not None:
+                found[key] = project_fields(issue, args.fields)
+        mirror.close()
+
+    remaining = [key for key in keys if key not in found]
+
+    if remaining:
+        api = JiraAPI(args.instance)
+        chunks = [remaining[i:i + args.chunk_size] for i in range(0, len(remaining), args.chunk_size)]
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for issues in pool.map(lambda chunk: fetch_chunk(api, chunk, fields, expand), chunks):
+                for issue in issues:
+                    found[issue['key']] = issue
+
+    output = {
+        'total': sum(1 for key in keys if key in found),
+        'issues': [projection.apply(found[key]) if projection else found[key] for key in keys if key in found],
+        'missing': [key for key in keys if key not in found]
+    }
+
+    if args.cached:
+        output['cached'] = len(keys) - len(remaining)
+
+    print(to_json(output, compact))
+
+
+if __name__ == '__main__':
+    main()
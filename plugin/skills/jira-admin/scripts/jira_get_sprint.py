@@ -15,7 +15,7 @@ def main():
 
     api = JiraAPI(args.instance)
 
-    result = api.get(f'sprint/{args.sprint_id}')
+    result = api.agile_get(f'sprint/{args.sprint_id}')
     print(json.dumps(result, indent=2))
 
 
@@ -25,7 +25,7 @@ def main():
         params['state'] = args.state
 
     endpoint = f'board/{args.board_id}/sprint'
-    result = api.get(endpoint, params=params)
+    result = api.agile_get(endpoint, params=params)
     print(json.dumps(result, indent=2))
 
 
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import json
+import time
+import tempfile
+from typing import Dict, List, Any, Optional
+from jira_api import JiraAPI, get_cache_dir
+from http_client import HttpError
+
+DEFAULT_TTL_HOURS = 24
+FIELD_ID = re.compile(r'^(customfield_\d+|[a-z][A-Za-z]*)$')
+NAMED_TYPES = ('priority', 'resolution', 'version', 'component', 'securitylevel')
+
+
+class MetadataError(ValueError):
+    pass
+
+
+def metadata_path(instance: str) -> str:
+    return os.path.join(get_cache_dir(), f"metadata-{instance.lower()}.json")
+
+
+def fetch_all(api: JiraAPI, endpoint: str, params: Dict[str, str]) -> List[Dict[str, Any]]:
+    values = []
+    start_at = 0
+    while True:
+        page = api.request(endpoint, params={**params, 'startAt': str(start_at), 'maxResults': '50'}).json()
+        values.extend(page.get('values', []))
+        start_at += len(page.get('values', []))
+        if page.get('isLast', True) or not page.get('values'):
+            return values
+
+
+def fetch_transitions(api: JiraAPI, projects: List[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, str]]]:
+    # Jira Cloud only, and needs admin rights; elsewhere transitions are learned on first use
+    statuses = {status['id']: status['name'] for status in api.request('status').json()}
+
+    def target(transition: Dict[str, Any]) -> str:
+        to = transition.get('to')
+        status_id = to.get('statusReference') if isinstance(to, dict) else to
+        return statuses.get(str(status_id), '')
+
+    workflows = {}
+    for workflow in fetch_all(api, 'workflow/search', {'expand': 'transitions'}):
+        workflows[workflow['id']['name']] = {
+            transition['name'].lower(): {'id': str(transition['id']), 'name': transition['name'], 'to': target(transition)}
+            for transition in workflow.get('transitions', [])
+        }
+
+    by_id = {project['id']: project for project in projects}
+    transitions = {}
+    ids = list(by_id)
+
+    for i in range(0, len(ids), 50):
+        schemes = api.request('workflowscheme/project', params=[('projectId', pid) for pid in ids[i:i + 50]]).json()
+        for entry in schemes.get('values', []):
+            scheme = entry.get('workflowScheme', {})
+            mappings = scheme.get('issueTypeMappings', {})
+            for project_id in entry.get('projectIds', []):
+                project = by_id.get(str(project_id))
+                if project is None:
+                    continue
+                for issuetype in project['issueTypes']:
+                    workflow = mappings.get(issuetype['id'], scheme.get('defaultWorkflow'))
+                    if workflow in workflows:
+                        transitions[f"{project['key']}/{issuetype['name']}"] = workflows[workflow]
+
+    return transitions
+
+
+class JiraMetadata:
+    def __init__(self, instance: str):
+        self.instance = instance.upper()
+        self.path = metadata_path(instance)
+        self.data: Dict[str, Any] = {}
+
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                self.data = json.load(f)
+
+    @property
+    def available(self) -> bool:
+        return bool(self.data)
+
+    def is_fresh(self) -> bool:
+        ttl = self.data.get('ttl_hours', DEFAULT_TTL_HOURS)
+        return self.available and time.time() - self.data.get('fetched_at', 0) < ttl * 3600
+
+    def save(self):
+        # A unique temp file: concurrent commands may save the same instance at once
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix='.metadata-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def refresh(self, api: JiraAPI, ttl_hours: float = DEFAULT_TTL_HOURS, transitions: bool = True):
+        fields = [{
+            'id': field['id'],
+            'name': field.get('name', field['id']),
+            'custom': field.get('custom', False),
+            'type': field.get('schema', {}).get('type'),
+            'items': field.get('schema', {}).get('items')
+        } for field in api.get('field')]
+
+        issuetypes = [{'id': t['id'], 'name': t['name'], 'subtask': t.get('subtask', False)}
+                      for t in api.get('issuetype')]
+
+        projects = [{
+            'id': project['id'],
+            'key': project['key'],
+            'name': project['name'],
+            'issueTypes': [{'id': t['id'], 'name': t['name']} for t in project.get('issueTypes', [])]
+        } for project in api.get('project', params={'expand': 'issueTypes'})]
+
+        learned = self.data.get('transitions', {}) if self.data.get('transitions_source') == 'learned' else {}
+        source = 'learned'
+        if transitions:
+            try:
+                learned = {**learned, **fetch_transitions(api, projects)}
+                source = 'workflows'
+            except HttpError:
+                pass
+
+        self.data = {
+            'instance': self.instance,
+            'fetched_at': int(time.time()),
+            'ttl_hours': ttl_hours,
+            'fields': fields,
+            'issuetypes': issuetypes,
+            'projects': projects,
+            'transitions': learned,
+            'transitions_source': source
+        }
+        self.save()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'fetched_at': self.data.get('fetched_at'),
+            'ttl_hours': self.data.get('ttl_hours'),
+            'fresh': self.is_fresh(),
+            'fields': len(self.data.get('fields', [])),
+            'issuetypes': len(self.data.get('issuetypes', [])),
+            'projects': len(self.data.get('projects', [])),
+            'transition_sets': len(self.data.get('transitions', {})),
+            'transitions_source': self.data.get('transitions_source')
+        }
+
+    def field(self, key: str) -> Optional[Dict[str, Any]]:
+        fields = self.data.get('fields', [])
+        for field in fields:
+            if field['id'] == key:
+                return field
+
+        matches = [field for field in fields if field['name'].lower() == key.lower()]
+        if len(matches) > 1:
+            ids = ', '.join(field['id'] for field in matches)
+            raise MetadataError(f"Field name '{key}' is ambiguous ({ids}); use the id")
+        return matches[0] if matches else None
+
+    def project(self, key: str) -> Optional[Dict[str, Any]]:
+        for project in self.data.get('projects', []):
+            if key.upper() in (project['key'], project['id']):
+                return project
+        return None
+
+    def issuetype_id(self, name: str, project_key: Optional[str]) -> Optional[str]:
+        project = self.project(project_key) if project_key else None
+        candidates = project['issueTypes'] if project else self.data.get('issuetypes', [])
+        for issuetype in candidates:
+            if issuetype['name'].lower() == name.lower() or issuetype['id'] == name:
+                return issuetype['id']
+        return None
+
+    def shape_value(self, field: Dict[str, Any], value: Any, project_key: Optional[str]) -> Any:
+        kind = field.get('type')
+
+        if kind == 'project' and isinstance(value, str):
+            return {'key': value}
+        if kind == 'issuetype':
+            name = value if isinstance(value, str) else (value or {}).get('name')
+            issuetype_id = self.issuetype_id(name, project_key) if name else None
+            if issuetype_id:
+                return {'id': issuetype_id}
+            return {'name': value} if isinstance(value, str) else value
+        if kind == 'option' and isinstance(value, str):
+            return {'value': value}
+        if kind in NAMED_TYPES and isinstance(value, str):
+            return {'name': value}
+        if kind == 'array':
+            items = value if isinstance(value, list) else [value]
+            if field.get('items') == 'option':
+                return [{'value': v} if isinstance(v, str) else v for v in items]
+            if field.get('items') in NAMED_TYPES:
+                return [{'name': v} if isinstance(v, str) else v for v in items]
+            return items
+        return value
+
+    def resolve_key(self, key: str) -> Optional[Dict[str, Any]]:
+        field = self.field(key)
+        if field is None and not FIELD_ID.match(key):
+            raise MetadataError(f"Unknown field '{key}' (refresh with: discover --metadata {self.instance} --refresh)")
+        return field
+
+    def resolve_fields(self, fields: Dict[str, Any], project_key: Optional[str] = None) -> Dict[str, Any]:
+        if project_key is None:
+            project = fields.get('project')
+            project_key = project if isinstance(project, str) else (project or {}).get('key')
+
+        resolved = {}
+        for key, value in fields.items():
+            field = self.resolve_key(key)
+            if field is None:
+                resolved[key] = value
+            else:
+                resolved[field['id']] = self.shape_value(field, value, project_key)
+        return resolved
+
+    def resolve_update(self, update: Dict[str, Any]) -> Dict[str, Any]:
+        resolved = {}
+        for key, operations in update.items():
+            field = self.resolve_key(key)
+            resolved[field['id'] if field else key] = operations
+        return resolved
+
+    def transition(self, project_key: str, issuetype: Optional[str], name: str) -> Optional[str]:
+        sets = self.data.get('transitions', {})
+        if issuetype:
+            candidates = [sets.get(f"{project_key}/{issuetype}", {})]
+        else:
+            # Transition ids belong to one workflow, and "Done" in one can share its id with "Reopen" in another.
+            # Without the issue type an id is only safe when the complete workflow of every issue type is known
+            # (learned sets only show what was reachable from one status)
+            project = self.project(project_key)
+            if self.data.get('transitions_source') != 'workflows' or project is None:
+                return None
+            keys = [f"{project['key']}/{issuetype['name']}" for issuetype in project['issueTypes']]
+            if not keys or any(key not in sets for key in keys):
+                return None
+            candidates = [sets[key] for key in keys]
+
+        def matches(transition: Dict[str, str]) -> bool:
+            return name.lower() in (transition['name'].lower(), transition.get('to', '').lower())
+
+        ids = set()
+        for transitions in candidates:
+            match = transitions.get(name.lower()) or next(
+                (t for t in transitions.values() if t.get('to', '').lower() == name.lower()), None)
+            if match:
+                ids.add(match['id'])
+
+        if len(ids) != 1:
+            return None
+        transition_id = ids.pop()
+
+        if any(t['id'] == transition_id and not matches(t) for transitions in candidates for t in transitions.values()):
+            return None
+        return transition_id
+
+    def learn_transitions(self, project_key: str, issuetype: str, transitions: List[Dict[str, Any]]):
+        if not self.available:
+            return
+        known = self.data.setdefault('transitions', {}).setdefault(f"{project_key}/{issuetype}", {})
+        learned = {transition['name'].lower(): {
+            'id': str(transition['id']),
+            'name': transition['name'],
+            'to': transition.get('to', {}).get('name', '')
+        } for transition in transitions}
+        if any(known.get(key) != value for key, value in learned.items()):
+            known.update(learned)
+            self.save()
+
+
+def load_metadata(api: JiraAPI, instance: str) -> Optional[JiraMetadata]:
+    metadata = JiraMetadata(instance)
+    if not metadata.available:
+        return None
+    if not metadata.is_fresh():
+        metadata.refresh(api, metadata.data.get('ttl_hours', DEFAULT_TTL_HOURS),
+                         transitions=metadata.data.get('transitions_source') == 'workflows')
+    return metadata
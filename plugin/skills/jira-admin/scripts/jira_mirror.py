@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import json
+import time
+import sqlite3
+from typing import Dict, Optional, Any, List, Tuple
+from jira_api import get_cache_dir
+
+JQL_TOKEN = re.compile(
+    r'\s*(?:(?P<string>"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')'
+    r'|(?P<op>!=|>=|<=|!~|=|~|>|<|\(|\)|,)'
+    r'|(?P<word>[^\s=!~<>(),"\']+))'
+)
+
+JQL_COLUMNS = {
+    'key': 'key',
+    'issuekey': 'key',
+    'project': 'project',
+    'summary': 'summary',
+    'status': 'status',
+    'statuscategory': 'status_category',
+    'assignee': 'assignee',
+    'reporter': 'reporter',
+    'issuetype': 'issuetype',
+    'type': 'issuetype',
+    'priority': 'priority',
+    'resolution': 'resolution',
+    'labels': 'labels',
+    'created': 'created',
+    'updated': 'updated',
+    'resolved': 'resolved',
+    'resolutiondate': 'resolved',
+    'text': 'text'
+}
+
+PERSON_COLUMNS = ('assignee', 'reporter')
+SORTABLE_COLUMNS = ('key', 'project', 'summary', 'status', 'assignee', 'reporter', 'issuetype',
+                    'priority', 'resolution', 'created', 'updated', 'resolved')
+
+
+class UnsupportedJql(ValueError):
+    pass
+
+
+def person_ids(person: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str]]:
+    if not person:
+        return None, None
+    return person.get('name') or person.get('accountId') or person.get('emailAddress'), person.get('displayName')
+
+
+def named(value: Optional[Dict[str, Any]]) -> Optional[str]:
+    return value.get('name') if value else None
+
+
+def tokenize(jql: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    jql = jql.strip()
+
+    while position < len(jql):
+        match = JQL_TOKEN.match(jql, position)
+        if not match or match.end() == position:
+            raise UnsupportedJql(f"Cannot parse JQL near: {jql[position:position + 20]}")
+        position = match.end()
+
+        if match.group('string') is not None:
+            raw = match.group('string')[1:-1]
+            tokens.append(('value', re.sub(r'\\(.)', r'\1', raw)))
+        elif match.group('op') is not None:
+            tokens.append(('op', match.group('op')))
+        elif match.group('word') is not None:
+            tokens.append(('word', match.group('word')))
+
+    return tokens
+
+
+def jql_to_sql(jql: str) -> Tuple[str, List[Any], str]:
+    tokens = tokenize(jql)
+    position = 0
+
+    def peek(offset: int = 0) -> Optional[Tuple[str, str]]:
+        index = position + offset
+        return tokens[index] if index < len(tokens) else None
+
+    def take() -> Tuple[str, str]:
+        nonlocal position
+        if position >= len(tokens):
+            raise UnsupportedJql("Unexpected end of JQL")
+        token = tokens[position]
+        position += 1
+        return token
+
+    def keyword(word: str, offset: int = 0) -> bool:
+        token = peek(offset)
+        return token is not None and token[0] == 'word' and token[1].upper() == word
+
+    def value() -> str:
+        kind, text = take()
+        if kind == 'op':
+            raise UnsupportedJql(f"Expected a value, got '{text}'")
+        if kind == 'word' and peek() == ('op', '('):
+            raise UnsupportedJql(f"JQL functions are not supported with --cached: {text}()")
+        return text
+
+    def comparison(column: str, operator: str, operand: str) -> Tuple[str, List[Any]]:
+        if column == 'text' or operator in ('~', '!~'):
+            if column not in ('summary', 'text'):
+                raise UnsupportedJql("'~' is only supported on summary and text")
+            clause = "(summary LIKE ? OR description LIKE ?)" if column == 'text' else "summary LIKE ?"
+            params = [f"%{operand}%"] * clause.count('?')
+            return (f"NOT {clause}" if operator == '!~' else clause), params
+
+        if column == 'labels':
+            clause = "EXISTS (SELECT 1 FROM json_each(issues.labels) WHERE value = ?)"
+            if operator == '=':
+                return clause, [operand]
+            if operator == '!=':
+                return f"NOT {clause}", [operand]
+            raise UnsupportedJql(f"Operator '{operator}' is not supported on labels")
+
+        if column in PERSON_COLUMNS:
+            if operator not in ('=', '!='):
+                raise UnsupportedJql(f"Operator '{operator}' is not supported on {column}")
+            clause = f"({column} = ? COLLATE NOCASE OR {column}_name = ? COLLATE NOCASE)"
+            return (f"NOT {clause}" if operator == '!=' else clause), [operand, operand]
+
+        if column in ('created', 'updated', 'resolved'):
+            if operator not in ('=', '!=', '>', '>=', '<', '<='):
+                raise UnsupportedJql(f"Operator '{operator}' is not supported on {column}")
+            if not re.match(r'^\d{4}[-/]\d{2}[-/]\d{2}', operand):
+                raise UnsupportedJql(f"Only absolute dates (yyyy-MM-dd) are supported with --cached, got '{operand}'")
+            return f"substr({column}, 1, {len(operand)}) {operator} ?", [operand.replace('/', '-')]
+
+        if operator not in ('=', '!='):
+            raise UnsupportedJql(f"Operator '{operator}' is not supported on {column}")
+        return f"{column} {operator} ? COLLATE NOCASE", [operand]
+
+    def clause() -> Tuple[str, List[Any]]:
+        if peek() == ('op', '('):
+            take()
+            sql, params = expression()
+            if take() != ('op', ')'):
+                raise UnsupportedJql("Missing ')'")
+            return f"({sql})", params
+
+        if keyword('NOT'):
+            take()
+            sql, params = clause()
+            return f"NOT {sql}", params
+
+        kind, field = take()
+        column = JQL_COLUMNS.get(field.lower())
+        if kind != 'word' or column is None:
+            raise UnsupportedJql(f"Field '{field}' is not supported with --cached")
+
+        if keyword('IS'):
+            take()
+            negate = keyword('NOT')
+            if negate:
+                take()
+            if not (keyword('EMPTY') or keyword('NULL')):
+                raise UnsupportedJql("Expected EMPTY after IS")
+            take()
+            if column == 'labels':
+                return (f"{column} != '[]'" if negate else f"{column} = '[]'"), []
+            return f"{column} IS {'NOT ' if negate else ''}NULL", []
+
+        negate = keyword('NOT') and keyword('IN', 1)
+        if negate:
+            take()
+
+        if keyword('IN'):
+            take()
+            if take() != ('op', '('):
+                raise UnsupportedJql("Expected '(' after IN")
+            parts, params = [], []
+            while True:
+                sql, values = comparison(column, '=', value())
+                parts.append(sql)
+                params.extend(values)
+                kind, text = take()
+                if text == ')':
+                    break
+                if text != ',':
+                    raise UnsupportedJql("Expected ',' or ')' in IN list")
+            sql = f"({' OR '.join(parts)})"
+            return (f"NOT {sql}" if negate else sql), params
+
+        kind, operator = take()
+        if kind != 'op':
+            raise UnsupportedJql(f"Operator '{operator}' is not supported with --cached")
+        return comparison(column, operator, value())
+
+    def expression() -> Tuple[str, List[Any]]:
+        sql, params = clause()
+        while keyword('AND') or keyword('OR'):
+            joiner = take()[1].upper()
+            right, right_params = clause()
+            sql = f"{sql} {joiner} {right}"
+            params = params + right_params
+        return sql, params
+
+    where, params = ('1 = 1', [])
+    if tokens and not keyword('ORDER'):
+        where, params = expression()
+
+    order = []
+    if keyword('ORDER'):
+        take()
+        if not keyword('BY'):
+            raise UnsupportedJql("Expected BY after ORDER")
+        take()
+        while True:
+            field = take()[1]
+            column = JQL_COLUMNS.get(field.lower())
+            if column not in SORTABLE_COLUMNS:
+                raise UnsupportedJql(f"Cannot order by '{field}' with --cached")
+            direction = 'ASC'
+            if keyword('ASC') or keyword('DESC'):
+                direction = take()[1].upper()
+            order.append(f"project {direction}, key_number {direction}" if column == 'key' else f"{column} {direction}")
+            if peek() != ('op', ','):
+                break
+            take()
+
+    if position != len(tokens):
+        raise UnsupportedJql(f"Unexpected '{tokens[position][1]}' in JQL")
+
+    return where, params, ', '.join(order) or 'updated DESC'
+
+
+def project_fields(issue: Dict[str, Any], fields: Optional[str]) -> Dict[str, Any]:
+    if not fields:
+        return issue
+    wanted = [f.strip() for f in fields.split(',') if f.strip()]
+    if '*all' in wanted:
+        return issue
+    return {**issue, 'fields': {k: v for k, v in issue.get('fields', {}).items() if k in wanted}}
+
+
+class JiraMirror:
+    def __init__(self, instance: str):
+        self.instance = instance.upper()
+        self.path = os.path.join(get_cache_dir(), f"mirror-{self.instance.lower()}.sqlite")
+        self.db = sqlite3.connect(self.path, timeout=10)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS issues (
+                key TEXT PRIMARY KEY,
+                key_number INTEGER,
+                id TEXT,
+                project TEXT,
+                summary TEXT,
+                description TEXT,
+                status TEXT,
+                status_category TEXT,
+                assignee TEXT,
+                assignee_name TEXT,
+                reporter TEXT,
+                reporter_name TEXT,
+                issuetype TEXT,
+                priority TEXT,
+                resolution TEXT,
+                labels TEXT,
+                created TEXT,
+                updated TEXT,
+                resolved TEXT,
+                synced_at REAL NOT NULL,
+                issue TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS issues_project ON issues (project, updated);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                project TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                finished_at REAL NOT NULL,
+                issue_count INTEGER NOT NULL
+            );
+        """)
+
+    def upsert(self, issues: List[Dict[str, Any]], synced_at: float):
+        rows = []
+
+        for issue in issues:
+            fields = issue.get('fields', {})
+            assignee, assignee_name = person_ids(fields.get('assignee'))
+            reporter, reporter_name = person_ids(fields.get('reporter'))
+            status = fields.get('status') or {}
+            project_key = (fields.get('project') or {}).get('key') or issue['key'].rsplit('-', 1)[0]
+            key_number = issue['key'].rsplit('-', 1)[-1]
+
+            rows.append((
+                issue['key'],
+                int(key_number) if key_number.isdigit() else None,
+                issue.get('id'),
+                project_key,
+                fields.get('summary'),
+                fields.get('description') if isinstance(fields.get('description'), str) else None,
+                status.get('name'),
+                (status.get('statusCategory') or {}).get('name'),
+                assignee,
+                assignee_name,
+                reporter,
+                reporter_name,
+                named(fields.get('issuetype')),
+                named(fields.get('priority')),
+                named(fields.get('resolution')),
+                json.dumps(fields.get('labels') or []),
+                fields.get('created'),
+                fields.get('updated'),
+                fields.get('resolutiondate'),
+                synced_at,
+                json.dumps(issue, separators=(',', ':'))
+            ))
+
+        with self.db:
+            self.db.executemany(
+                f"INSERT OR REPLACE INTO issues VALUES ({', '.join(['?'] * 21)})",
+                rows
+            )
+
+    def prune(self, project: str, keep: set) -> int:
+        existing = {row[0] for row in self.db.execute("SELECT key FROM issues WHERE project = ?", (project,))}
+        stale = existing - keep
+        with self.db:
+            self.db.executemany("DELETE FROM issues WHERE key = ?", [(key,) for key in stale])
+        return len(stale)
+
+    def last_sync(self, project: str) -> Optional[float]:
+        row = self.db.execute("SELECT started_at FROM sync_state WHERE project = ?", (project,)).fetchone()
+        return row[0] if row else None
+
+    def record_sync(self, project: str, started_at: float):
+        count = self.db.execute("SELECT COUNT(*) FROM issues WHERE project = ?", (project,)).fetchone()[0]
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                (project, started_at, time.time(), count)
+            )
+        return count
+
+    def status(self) -> List[Dict[str, Any]]:
+        rows = self.db.execute("SELECT project, started_at, finished_at, issue_count FROM sync_state ORDER BY project")
+        return [{
+            'project': row[0],
+            'last_sync': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(row[1])),
+            'age_seconds': int(time.time() - row[1]),
+            'issues': row[3]
+        } for row in rows]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute("SELECT issue FROM issues WHERE key = ? COLLATE NOCASE", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def search(self, jql: str, start_at: int = 0, max_results: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        where, params, order = jql_to_sql(jql)
+
+        total = self.db.execute(f"SELECT COUNT(*) FROM issues WHERE {where}", params).fetchone()[0]
+
+        sql = f"SELECT issue FROM issues WHERE {where} ORDER BY {order}"
+        if max_results is not None:
+            sql += f" LIMIT {int(max_results)} OFFSET {int(start_at)}"
+        elif start_at:
+            sql += f" LIMIT -1 OFFSET {int(start_at)}"
+
+        return total, [json.loads(row[0]) for row in self.db.execute(sql, params)]
+
+    def close(self):
+        self.db.close()
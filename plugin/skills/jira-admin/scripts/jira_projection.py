@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+import re
+import sys
+import json
+from typing import Dict, List, Any, Optional, Tuple
+
+PROFILES = {
+    'triage': [
+        'key',
+        'summary=fields.summary',
+        'type=fields.issuetype.name',
+        'status=fields.status.name',
+        'priority=fields.priority.name',
+        'assignee=fields.assignee.displayName',
+        'reporter=fields.reporter.displayName',
+        'labels=fields.labels',
+        'components=fields.components[*].name',
+        'created=fields.created',
+        'updated=fields.updated'
+    ],
+    'review': [
+        'key',
+        'summary=fields.summary',
+        'status=fields.status.name',
+        'resolution=fields.resolution.name',
+        'assignee=fields.assignee.displayName',
+        'description=fields.description',
+        'fix_versions=fields.fixVersions[*].name',
+        'blocks=fields.issuelinks[*].outwardIssue.key',
+        'blocked_by=fields.issuelinks[*].inwardIssue.key',
+        'comment_authors=fields.comment.comments[-5:].author.displayName',
+        'comments=fields.comment.comments[-5:].body'
+    ],
+    'estimation': [
+        'key',
+        'summary=fields.summary',
+        'type=fields.issuetype.name',
+        'status=fields.status.name',
+        'original_estimate=fields.timetracking.originalEstimate',
+        'remaining_estimate=fields.timetracking.remainingEstimate',
+        'time_spent=fields.timetracking.timeSpent',
+        'parent=fields.parent.key',
+        'subtasks=fields.subtasks[*].key'
+    ]
+}
+
+SEGMENT = re.compile(r'\.?([A-Za-z_][\w-]*)|\[(\*|-?\d+|-?\d*:-?\d*)\]')
+EXPANDS = ('renderedFields', 'changelog', 'names', 'schema', 'transitions', 'editmeta')
+
+
+class InvalidSelector(ValueError):
+    pass
+
+
+def parse_path(path: str) -> List[Tuple[str, Any]]:
+    text = re.sub(r'^\$\.?', '', path)
+    steps = []
+    pos = 0
+
+    while pos < len(text):
+        match = SEGMENT.match(text, pos)
+        if not match or text.startswith('.'):
+            raise InvalidSelector(f"Invalid selector '{path}' at position {pos}")
+        name, index = match.groups()
+        if name is not None:
+            steps.append(('key', name))
+        elif index == '*':
+            steps.append(('each', slice(None)))
+        elif ':' in index:
+            start, stop = index.split(':')
+            steps.append(('each', slice(int(start) if start else None, int(stop) if stop else None)))
+        else:
+            steps.append(('index', int(index)))
+        pos = match.end()
+
+    if not steps or steps[0][0] != 'key':
+        raise InvalidSelector(f"Selector '{path}' must start with a field name")
+
+    return steps
+
+
+def select(value: Any, steps: List[Tuple[str, Any]]) -> Any:
+    for i, (kind, arg) in enumerate(steps):
+        if kind == 'key':
+            value = value.get(arg) if isinstance(value, dict) else None
+        elif kind == 'index':
+            value = value[arg] if isinstance(value, list) and -len(value) <= arg < len(value) else None
+        else:
+            if not isinstance(value, list):
+                return None
+            items = [select(item, steps[i + 1:]) for item in value[arg]]
+            return [item for item in items if item is not None]
+
+        if value is None:
+            return None
+
+    return value
+
+
+class Projection:
+    def __init__(self, selectors: List[str]):
+        self.columns: List[Tuple[str, List[Tuple[str, Any]]]] = []
+        self.fields: List[str] = []
+        self.expand: List[str] = []
+
+        for selector in selectors:
+            name, _, path = selector.partition('=')
+            if not path:
+                name, path = '', selector
+            steps = parse_path(path.strip())
+            name = name.strip() or next(arg for kind, arg in reversed(steps) if kind == 'key')
+            self.columns.append((name, steps))
+
+            root = steps[0][1]
+            if root in EXPANDS and root not in self.expand:
+                self.expand.append(root)
+            if root in ('fields', 'renderedFields') and len(steps) > 1 and steps[1][0] == 'key':
+                if steps[1][1] not in self.fields:
+                    self.fields.append(steps[1][1])
+
+    def apply(self, issue: Dict[str, Any]) -> Dict[str, Any]:
+        return {name: select(issue, steps) for name, steps in self.columns}
+
+    def request_params(self, params: Dict[str, str]) -> Dict[str, str]:
+        params = dict(params)
+        fields = [f for f in params.get('fields', '').split(',') if f] + self.fields
+        expand = [e for e in params.get('expand', '').split(',') if e] + self.expand
+        params['fields'] = ','.join(dict.fromkeys(fields)) or 'key'
+        if expand:
+            params['expand'] = ','.join(dict.fromkeys(expand))
+        return params
+
+
+def projection_from_args(args) -> Optional[Projection]:
+    selectors = []
+
+    if args.profile:
+        selectors.extend(PROFILES[args.profile])
+
+    for value in args.select or []:
+        selectors.extend(s.strip() for s in value.split(',') if s.strip())
+
+    if not selectors:
+        return None
+
+    try:
+        return Projection(selectors)
+    except InvalidSelector as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def add_projection_args(parser):
+    parser.add_argument('--profile', choices=sorted(PROFILES),
+                        help='Named field profile; output is flattened and compact')
+    parser.add_argument('--select', action='append', metavar='NAME=PATH',
+                        help="JSONPath-style selector, e.g. 'assignee=fields.assignee.displayName' (repeatable, comma-separated)")
+    parser.add_argument('--compact', action='store_true', help='Emit JSON without indentation')
+
+
+def to_json(value: Any, compact: bool) -> str:
+    if compact:
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+    return json.dumps(value, indent=2)
@@ -1,21 +1,84 @@
 #!/usr/bin/env python3
 
 import sys
-import json
 import argparse
-from jira_api import JiraAPI
+from typing import Dict, Optional
+from jira_api import JiraAPI, DEFAULT_CONCURRENCY
+from jira_mirror import JiraMirror, UnsupportedJql, project_fields
+from jira_projection import Projection, add_projection_args, projection_from_args, to_json
+
+
+def search_all(api: JiraAPI, params: Dict[str, str], start_at: int, page_size: int,
+               max_issues: Optional[int], concurrency: int, projection: Optional[Projection]):
+    total = 0
+    written = 0
+
+    for total, issues in api.search_pages(params, start_at, page_size, max_issues, concurrency):
+        for issue in issues:
+            sys.stdout.write(to_json(projection.apply(issue) if projection else issue, True))
+            sys.stdout.write('\n')
+        sys.stdout.flush()
+        written += len(issues)
+
+    print(f"Fetched {written} of {total} issues", file=sys.stderr)
+
+
+def search_cached(args, projection: Optional[Projection], compact: bool):
+    mirror = JiraMirror(args.instance)
+
+    try:
+        limit = args.max_issues if args.all else args.max_results
+        total, issues = mirror.search(args.jql, args.start_at, limit)
+    except UnsupportedJql as e:
+        print(f"Error: {e}", file=sys.stderr)
+        print("Hint: run without --cached to evaluate this JQL on the server", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        mirror.close()
+
+    issues = [project_fields(issue, args.fields) for issue in issues]
+    if projection:
+        issues = [projection.apply(issue) for issue in issues]
+
+    if args.all:
+        for issue in issues:
+            sys.stdout.write(to_json(issue, True))
+            sys.stdout.write('\n')
+        print(f"Fetched {len(issues)} of {total} issues (cached)", file=sys.stderr)
+        return
+
+    print(to_json({
+        'startAt': args.start_at,
+        'maxResults': args.max_results,
+        'total': total,
+        'issues': issues
+    }, compact))
 
 
 def main():
     parser = argparse.ArgumentParser(description='Search Jira issues using JQL')
     parser.add_argument('instance', help='Instance name (e.g., 4RA)')
     parser.add_argument('jql', help='JQL query string')
-    parser.add_argument('--max-results', type=int, default=50, help='Max results (default: 50)')
+    parser.add_argument('--max-results', type=int, default=50, help='Max results (default: 50; page size with --all)')
     parser.add_argument('--start-at', type=int, default=0, help='Start at index (default: 0)')
     parser.add_argument('--fields', help='Comma-separated fields to return')
+    parser.add_argument('--all', action='store_true', help='Fetch every page concurrently and stream issues as NDJSON')
+    parser.add_argument('--max-issues', type=int, help='Stop after N issues (with --all)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Pages fetched in parallel (with --all, default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--cached', action='store_true',
+                        help='Search the local mirror (see jira-sync); supports a JQL subset')
+    add_projection_args(parser)
 
     args = parser.parse_args()
 
+    projection = projection_from_args(args)
+    compact = args.compact or projection is not None
+
+    if args.cached:
+        search_cached(args, projection, compact)
+        return
+
     api = JiraAPI(args.instance)
 
     params = {
@@ -26,9 +89,26 @@ def main():
 
     if args.fields:
         params['fields'] = args.fields
+    if projection:
+        params = projection.request_params(params)
+
+    if args.all:
+        if args.concurrency < 1 or args.max_results < 1 or (args.max_issues is not None and args.max_issues < 1):
+            print("Error: --concurrency, --max-results and --max-issues must be positive", file=sys.stderr)
+            sys.exit(1)
+
+        search_all(api, params, args.start_at, args.max_results, args.max_issues, args.concurrency, projection)
+        return
 
     result = api.get('search', params=params)
-    print(json.dumps(result, indent=2))
+    if projection:
+        result = {
+            'startAt': result.get('startAt'),
+            'maxResults': result.get('maxResults'),
+            'total': result.get('total'),
+            'issues': [projection.apply(issue) for issue in result.get('issues', [])]
+        }
+    print(to_json(result, compact))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional
+from jira_api import JiraAPI, DEFAULT_CONCURRENCY, AGILE_API, parse_time
+
+DEFAULT_PAGE_SIZE = 50
+POINTS_FIELD_NAMES = ('story points', 'story point estimate')
+ISSUE_FIELDS = 'summary,status,assignee,issuetype,resolutiondate,statuscategorychangedate'
+
+
+def find_points_field(api: JiraAPI, sprint: Dict[str, Any]) -> Optional[str]:
+    board_id = sprint.get('originBoardId')
+    if board_id:
+        config = api.agile_get(f'board/{board_id}/configuration')
+        field = config.get('estimation', {}).get('field', {}).get('fieldId')
+        if field:
+            return field
+
+    for field in api.get('field'):
+        if field.get('name', '').lower() in POINTS_FIELD_NAMES:
+            return field['id']
+
+    return None
+
+
+def done_at(fields: Dict[str, Any]) -> Optional[float]:
+    value = fields.get('resolutiondate') or fields.get('statuscategorychangedate')
+    return parse_time(value) if value else None
+
+
+def add_to(group: Dict[str, Dict[str, float]], name: str, points: float, done: bool):
+    entry = group.setdefault(name, {'issues': 0, 'points': 0, 'completed_points': 0})
+    entry['issues'] += 1
+    entry['points'] += points
+    if done:
+        entry['completed_points'] += points
+
+
+def burndown(start: float, end: float, until: float, total: float, completions: List[tuple]) -> List[Dict[str, Any]]:
+    first = datetime.fromtimestamp(start, timezone.utc).date()
+    days = (datetime.fromtimestamp(end, timezone.utc).date() - first).days
+    shown = (datetime.fromtimestamp(until, timezone.utc).date() - first).days
+
+    completions = sorted(completions)
+    rows = []
+    completed = 0
+    index = 0
+
+    for offset in range(shown + 1):
+        day = first + timedelta(days=offset)
+        while index < len(completions) and completions[index][0] <= day:
+            completed += completions[index][1]
+            index += 1
+        rows.append({
+            'date': day.isoformat(),
+            'remaining_points': round(total - completed, 2),
+            'completed_points': round(completed, 2),
+            'ideal_points': round(max(total * (1 - offset / days), 0), 2) if days else 0
+        })
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sprint report with story point totals and burndown')
+    parser.add_argument('instance', help='Instance name (e.g., 4RA)')
+    parser.add_argument('sprint_id', help='Sprint ID')
+    parser.add_argument('--points-field', help='Story points field ID (default: from board estimation settings)')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'Issues per page (default: {DEFAULT_PAGE_SIZE})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Pages fetched in parallel (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--issues', action='store_true', help='Include a compact row per issue')
+
+    args = parser.parse_args()
+
+    api = JiraAPI(args.instance)
+
+    sprint = api.agile_get(f'sprint/{args.sprint_id}')
+    points_field = args.points_field or find_points_field(api, sprint)
+    if not points_field:
+        print("Error: Could not find a story points field", file=sys.stderr)
+        print("Hint: Pass --points-field customfield_NNNNN", file=sys.stderr)
+        sys.exit(1)
+
+    params = {'fields': f'{ISSUE_FIELDS},{points_field}'}
+    pages = api.search_pages(params, page_size=args.page_size, concurrency=args.concurrency,
+                             endpoint=f'sprint/{args.sprint_id}/issue', prefix=AGILE_API)
+
+    totals = {'issues': 0, 'points': 0, 'completed_issues': 0, 'completed_points': 0, 'unestimated': 0}
+    by_status: Dict[str, Dict[str, float]] = {}
+    by_assignee: Dict[str, Dict[str, float]] = {}
+    by_type: Dict[str, Dict[str, float]] = {}
+    completions = []
+    rows = []
+
+    for _, issues in pages:
+        for issue in issues:
+            fields = issue['fields']
+            points = fields.get(points_field)
+            if points is None:
+                totals['unestimated'] += 1
+                points = 0
+
+            done = fields['status'].get('statusCategory', {}).get('key') == 'done'
+
+            totals['issues'] += 1
+            totals['points'] += points
+            if done:
+                totals['completed_issues'] += 1
+                totals['completed_points'] += points
+                finished = done_at(fields)
+                if finished is not None and points:
+                    completions.append((datetime.fromtimestamp(finished, timezone.utc).date(), points))
+
+            assignee = (fields.get('assignee') or {}).get('displayName') or 'Unassigned'
+            add_to(by_status, fields['status']['name'], points, done)
+            add_to(by_assignee, assignee, points, done)
+            add_to(by_type, fields['issuetype']['name'], points, done)
+
+            if args.issues:
+                rows.append({
+                    'key': issue['key'],
+                    'summary': fields.get('summary'),
+                    'status': fields['status']['name'],
+                    'assignee': assignee,
+                    'points': fields.get(points_field),
+                    'done': done
+                })
+
+    totals['remaining_points'] = totals['points'] - totals['completed_points']
+
+    output = {
+        'sprint': {key: sprint.get(key) for key in
+                   ('id', 'name', 'state', 'goal', 'startDate', 'endDate', 'completeDate', 'originBoardId')},
+        'points_field': points_field,
+        'totals': totals,
+        'by_status': by_status,
+        'by_assignee': by_assignee,
+        'by_type': by_type,
+        'burndown': []
+    }
+
+    if sprint.get('startDate'):
+        start = parse_time(sprint['startDate'])
+        end = max(start, parse_time(sprint.get('completeDate') or sprint.get('endDate') or sprint['startDate']))
+        until = max(start, min(end, datetime.now(timezone.utc).timestamp()))
+        output['burndown'] = burndown(start, end, until, totals['points'], completions)
+
+    if args.issues:
+        output['issues'] = rows
+
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+import argparse
+from jira_api import JiraAPI, DEFAULT_CONCURRENCY
+from jira_mirror import JiraMirror
+
+DEFAULT_PAGE_SIZE = 100
+SYNC_OVERLAP_MINUTES = 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mirror a Jira project into a local SQLite database')
+    parser.add_argument('instance', help='Instance name (e.g., 4RA)')
+    parser.add_argument('project', nargs='?', help='Project key (e.g., DEV)')
+    parser.add_argument('--full', action='store_true', help='Re-fetch every issue and drop issues no longer in the project')
+    parser.add_argument('--status', action='store_true', help='Show mirrored projects and their last sync time')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'Issues per search page (default: {DEFAULT_PAGE_SIZE})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Pages fetched in parallel (default: {DEFAULT_CONCURRENCY})')
+
+    args = parser.parse_args()
+
+    mirror = JiraMirror(args.instance)
+
+    try:
+        if args.status:
+            print(json.dumps({'instance': args.instance.upper(), 'path': mirror.path, 'projects': mirror.status()}, indent=2))
+            return
+
+        if not args.project:
+            print("Error: project is required (or use --status)", file=sys.stderr)
+            sys.exit(1)
+
+        project = args.project.upper()
+        api = JiraAPI(args.instance)
+
+        started = time.time()
+        last_sync = None if args.full else mirror.last_sync(project)
+
+        jql = f'project = "{project}"'
+        if last_sync is not None:
+            minutes = int((started - last_sync) // 60) + SYNC_OVERLAP_MINUTES
+            jql += f' AND updated >= "-{minutes}m"'
+        jql += ' ORDER BY key ASC'
+
+        params = {'jql': jql, 'fields': '*all', 'expand': 'changelog'}
+
+        fetched = 0
+        seen = set()
+        for total, issues in api.search_pages(params, page_size=args.page_size, concurrency=args.concurrency):
+            mirror.upsert(issues, started)
+            seen.update(issue['key'] for issue in issues)
+            fetched += len(issues)
+            print(f"Synced {fetched}/{total} issues", file=sys.stderr)
+
+        pruned = mirror.prune(project, seen) if last_sync is None else 0
+        count = mirror.record_sync(project, started)
+
+        output = {
+            'status': 'success',
+            'instance': args.instance.upper(),
+            'project': project,
+            'mode': 'incremental' if last_sync is not None else 'full',
+            'fetched': fetched,
+            'pruned': pruned,
+            'issues': count,
+            'seconds': round(time.time() - started, 2),
+            'path': mirror.path
+        }
+        print(json.dumps(output, indent=2))
+
+    finally:
+        mirror.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,64 @@
 import sys
 import json
 import argparse
-from jira_api import JiraAPI
+from typing import Dict, Any, Optional
+from jira_api import JiraAPI, error_message
+from jira_metadata import JiraMetadata, load_metadata, MetadataError
+from http_client import HttpError, TransportError
+
+
+def match_transition(transitions, name: str) -> Optional[str]:
+    for transition in transitions:
+        if transition['name'].lower() == name.lower():
+            return str(transition['id'])
+    for transition in transitions:
+        if transition.get('to', {}).get('name', '').lower() == name.lower():
+            return str(transition['id'])
+    return None
+
+
+def available_transitions(api: JiraAPI, metadata: Optional[JiraMetadata], issue_key: str, project_key: str):
+    issue = api.get(f'issue/{issue_key}', params={'fields': 'issuetype', 'expand': 'transitions'})
+    transitions = issue.get('transitions', [])
+    if metadata:
+        metadata.learn_transitions(project_key, issue['fields']['issuetype']['name'], transitions)
+    return transitions
+
+
+def transition_issue(api: JiraAPI, metadata: Optional[JiraMetadata], issue_key: str, transition: Any,
+                     issuetype: Optional[str] = None) -> str:
+    if isinstance(transition, str):
+        transition = {'name': transition}
+    if 'id' in transition:
+        api.post(f'issue/{issue_key}/transitions', {'transition': {'id': str(transition['id'])}})
+        return str(transition['id'])
+
+    name = transition['name']
+    project_key = issue_key.rsplit('-', 1)[0]
+    cached_id = metadata.transition(project_key, issuetype, name) if metadata else None
+
+    if cached_id:
+        try:
+            api.request(f'issue/{issue_key}/transitions', 'POST', {'transition': {'id': cached_id}})
+            return cached_id
+        except HttpError as e:
+            # The cached id may not be reachable from the issue's current status
+            if e.status != 400:
+                print(error_message(e), file=sys.stderr)
+                sys.exit(1)
+        except TransportError as e:
+            print(f"URL Error: {e.reason}", file=sys.stderr)
+            sys.exit(1)
+
+    transitions = available_transitions(api, metadata, issue_key, project_key)
+    transition_id = match_transition(transitions, name)
+    if transition_id is None:
+        names = ', '.join(t['name'] for t in transitions) or 'none'
+        print(f"Error: Transition '{name}' is not available for {issue_key} (available: {names})", file=sys.stderr)
+        sys.exit(1)
+
+    api.post(f'issue/{issue_key}/transitions', {'transition': {'id': transition_id}})
+    return transition_id
 
 
 def main():
@@ -11,6 +68,8 @@ def main():
     parser.add_argument('instance', help='Instance name (e.g., 4RA)')
     parser.add_argument('issue_key', help='Issue key (e.g., DEV-123)')
     parser.add_argument('data', help='JSON data (use - for stdin)')
+    parser.add_argument('--no-resolve', action='store_true',
+                        help='Send field names and values as given, without the cached metadata')
 
     args = parser.parse_args()
 
@@ -21,8 +80,32 @@ def main():
     else:
         update_data = json.loads(args.data)
 
-    api.put(f'issue/{args.issue_key}', update_data)
-    print(json.dumps({'status': 'success', 'message': f'Issue {args.issue_key} updated'}))
+    metadata = None if args.no_resolve else load_metadata(api, args.instance)
+    transition = update_data.pop('transition', None)
+
+    # Learned transitions are kept per issue type, so they are only usable when the body names it
+    issuetype = update_data.get('fields', {}).get('issuetype')
+    issuetype = issuetype if isinstance(issuetype, str) else (issuetype or {}).get('name')
+
+    if metadata:
+        try:
+            if 'fields' in update_data:
+                update_data['fields'] = metadata.resolve_fields(update_data['fields'],
+                                                                args.issue_key.rsplit('-', 1)[0])
+            if 'update' in update_data:
+                update_data['update'] = metadata.resolve_update(update_data['update'])
+        except MetadataError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    if update_data:
+        api.put(f'issue/{args.issue_key}', update_data)
+
+    result: Dict[str, Any] = {'status': 'success', 'message': f'Issue {args.issue_key} updated'}
+    if transition:
+        result['transition'] = transition_issue(api, metadata, args.issue_key, transition, issuetype)
+
+    print(json.dumps(result))
 
 
 if __name__ == '__main__':
@@ -3,11 +3,13 @@
 import os
 import sys
 import json
-import urllib.request
 import urllib.parse
-import urllib.error
 from typing import Dict, Optional, Any
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '_lib'))
+from http_client import HttpClient, HttpError, TransportError
+from http_cache import open_cache
+
 REDMINE_COMMENT_MAX_LENGTH = 10000
 
 
@@ -27,6 +29,10 @@ class RedmineAPI:
             sys.exit(1)
 
         self.base_url = self.base_url.rstrip('/')
+        self.http = HttpClient(self.base_url, headers={
+            "X-Redmine-API-Key": self.api_key,
+            "Content-Type": "application/json; charset=utf-8"
+        }, cache=open_cache(f"redmine-{urllib.parse.urlsplit(self.base_url).hostname}"))
 
     def _make_request(
         self,
@@ -35,34 +41,17 @@ class RedmineAPI:
         data: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-
-        if params:
-            query_string = urllib.parse.urlencode(params)
-            url = f"{url}?{query_string}"
-
-        headers = {
-            "X-Redmine-API-Key": self.api_key,
-            "Content-Type": "application/json; charset=utf-8"
-        }
-
         req_data = None
         if data:
             req_data = json.dumps(data, ensure_ascii=False).encode('utf-8')
 
-        request = urllib.request.Request(url, data=req_data, headers=headers, method=method)
-
         try:
-            with urllib.request.urlopen(request) as response:
-                response_text = response.read().decode('utf-8')
-                if response_text:
-                    return json.loads(response_text)
-                return {}
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8')
-            print(f"HTTP Error {e.code}: {error_body}", file=sys.stderr)
+            response = self.http.request(method, endpoint, params=params, body=req_data)
+            return response.json()
+        except HttpError as e:
+            print(f"HTTP Error {e.status}: {e.text()}", file=sys.stderr)
             sys.exit(1)
-        except urllib.error.URLError as e:
+        except TransportError as e:
             print(f"URL Error: {e.reason}", file=sys.stderr)
             sys.exit(1)
         except json.JSONDecodeError as e: